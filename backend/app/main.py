@@ -9,24 +9,28 @@ from collections import OrderedDict
 import threading
 
 from app.core.config import get_data_dir
-from app.services.csv_loader import analyze_csv_file, read_csv_robust
+from app.services.csv_loader import analyze_csv_file
+from app.services.borehole_cache import read_borehole_csv
 from app.services.borehole_parser import normalize_borehole_df, add_depth_columns
-from app.services.encoding_fix import fix_csv_encoding
+from app.services.encoding_fix import normalize_csv_encodings
 from app.services.lithology_stats import compute_lithology_averages
 from app.services.pressure_steps import compute_pressure_steps
 from app.services.coords_loader import load_borehole_coords
 from app.services.interpolate import interpolate_field, compute_points_values
 from app.services.pressure_index import compute_borehole_index, interpolate_index
-from app.services.coal_seam_parser import get_all_coal_seams, get_coal_seam_data, get_overburden_lithology, get_seam_stats
+from app.services.coal_seam_parser import build_seam_dataset, get_all_coal_seams
 from app.services.seam_interpolate import interpolate_seam_property, interpolate_seam_with_overburden, compare_interpolation_methods_for_seam
 from app.services.pipeline import run_pipeline
 from app.services.grid_export import grid_to_csv_bytes
 from app.services.interpolation_eval import evaluate_methods
 from app.services.pressure_steps_batch import compute_pressure_steps_boreholes
 from app.services.interpolate import interpolate_from_points
-from app.services.workface import compute_workface_adjusted_grid
+from app.services.workface import compute_workface_adjusted_grid, workface_result_to_json
+from app.services.workface_parser import parse_workface_file
+from app.services.workface_raster import face_statistics
 from app.services.summary import summarize_grid
 from app.services.contour_generator import generate_matplotlib_contour_image, generate_dual_contour_images
+from app.services.tracing import TracedJSONResponse, TracingMiddleware, render_prometheus
 from app.routes.mpi import router as mpi_router
 from app.routes.rock_params import router as rock_params_router
 from app.routes.algorithm_validation import router as validation_router
@@ -34,7 +38,7 @@ from app.routes.research import router as research_router
 from app.routes.geomodel import router as geomodel_router
 from app.routes.geomodel_integration import router as geomodel_integration_router
 
-app = FastAPI(title="Mining Pressure System API", version="0.1.0")
+app = FastAPI(title="Mining Pressure System API", version="0.1.0", default_response_class=TracedJSONResponse)
 
 # Include routers
 app.include_router(mpi_router)
@@ -50,7 +54,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(TracingMiddleware)
 
 # Lightweight in-memory cache for expensive seam contour image generation.
 _CONTOUR_CACHE_MAXSIZE = 24
@@ -98,6 +104,12 @@ def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/api/metrics")
+def metrics() -> Response:
+    """Per-route request and stage duration histograms (Prometheus text format)."""
+    return Response(content=render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 def _clip01_100(value: float) -> float:
     return max(0.0, min(100.0, float(value)))
 
@@ -134,18 +146,17 @@ def get_scene3d_data_api(seam: str, resolution: int = 50) -> dict:
     coords = load_borehole_coords(coord_path)
     files = sorted([p for p in data_dir.glob("*.csv") if p.is_file() and p.name != "zuobiao.csv"])
 
-    seam_data = get_coal_seam_data(files, coords, seam)
-    if (seam_data.get("point_count") or 0) <= 0:
+    dataset = build_seam_dataset(files, coords, seam)
+    if dataset.point_count <= 0:
         raise HTTPException(status_code=404, detail=f"no seam data found: {seam}")
 
-    overburden = get_overburden_lithology(files, coords, seam)
-    boreholes = overburden.get("boreholes", [])
+    boreholes = dataset.boreholes
 
     if boreholes:
         xs = [float(bh.get("x", 0.0)) for bh in boreholes]
         ys = [float(bh.get("y", 0.0)) for bh in boreholes]
     else:
-        points = seam_data.get("points", [])
+        points = dataset.points
         xs = [float(p.get("x", 0.0)) for p in points]
         ys = [float(p.get("y", 0.0)) for p in points]
 
@@ -207,7 +218,7 @@ def get_scene3d_data_api(seam: str, resolution: int = 50) -> dict:
 
     thickness_values = []
     depth_values = []
-    for p in seam_data.get("points", []):
+    for p in dataset.points:
         t = p.get("thickness")
         d = p.get("burial_depth")
         if isinstance(t, (int, float)):
@@ -216,7 +227,7 @@ def get_scene3d_data_api(seam: str, resolution: int = 50) -> dict:
             depth_values.append(float(d))
 
     point_scores = {"rsi": [], "bri": [], "asi": [], "mpi": []}
-    points = seam_data.get("points", [])
+    points = dataset.points
     if points:
         depth_ref = (sum(depth_values) / len(depth_values)) if depth_values else 500.0
         for p in points:
@@ -249,7 +260,7 @@ def get_scene3d_data_api(seam: str, resolution: int = 50) -> dict:
         "scene": {
             "seam": seam,
             "resolution": int(resolution),
-            "pointCount": int(seam_data.get("point_count") or 0),
+            "pointCount": dataset.point_count,
         },
         "layers": layers_payload,
         "indicators": indicators,
@@ -281,7 +292,7 @@ def preview_borehole(file: str, limit: int = 20) -> dict:
     if path.suffix.lower() != ".csv":
         raise HTTPException(status_code=400, detail="only csv supported")
 
-    df = read_csv_robust(path)
+    df = read_borehole_csv(path)
     df = normalize_borehole_df(df)
     df = add_depth_columns(df)
 
@@ -321,11 +332,9 @@ def fix_encoding() -> dict:
         raise HTTPException(status_code=404, detail=f"data dir not found: {data_dir}")
 
     files = sorted([p for p in data_dir.glob("*.csv") if p.is_file()])
-    results = []
-    for p in files:
-        result = fix_csv_encoding(p)
-        results.append(result)
-    _clear_contour_cache()
+    results = normalize_csv_encodings(files)
+    if any(result["changed"] for result in results):
+        _clear_contour_cache()
     return {"data_dir": str(data_dir), "files": results}
 
 
@@ -423,20 +432,34 @@ def pressure_steps_grid(model: str = "fixed", target: str = "initial", h_mode: s
     }
 
 
-@app.get("/pressure/steps/workfaces")
-def pressure_steps_workfaces(
-    model: str = "fixed",
-    target: str = "initial",
-    h_mode: str = "total",
-    q_mode: str = "density_thickness",
-    default_q: float = 1.0,
-    grid_size: int = 60,
-    axis: str = "x",
-    count: int = 3,
-    direction: str = "ascending",
-    mode: str = "decrease",
-    decay: float = 0.08,
+def _parse_workfaces_param(workfaces: Optional[str]) -> Optional[list]:
+    """`workfaces` query value: JSON of /api/mpi/workfaces/parse items (polygons or rects)."""
+    if not workfaces or not workfaces.strip():
+        return None
+    try:
+        items = parse_workface_file(workfaces, "workfaces.json")
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"invalid workfaces: {exc}") from exc
+    if not items:
+        raise HTTPException(status_code=400, detail="no valid workfaces")
+    return items
+
+
+def _pressure_steps_workfaces(
+    model: str,
+    target: str,
+    h_mode: str,
+    q_mode: str,
+    default_q: float,
+    grid_size: int,
+    axis: str,
+    count: int,
+    direction: str,
+    mode: str,
+    decay: float,
+    workfaces: Optional[str],
 ) -> dict:
+    faces = _parse_workfaces_param(workfaces)
     grid_data = pressure_steps_grid(
         model=model,
         target=target,
@@ -455,10 +478,34 @@ def pressure_steps_workfaces(
         direction=direction,
         mode=mode,
         decay=decay,
+        workfaces=faces,
     )
     return {"grid": grid_data, "workfaces": adjusted}
 
 
+@app.get("/pressure/steps/workfaces")
+def pressure_steps_workfaces(
+    model: str = "fixed",
+    target: str = "initial",
+    h_mode: str = "total",
+    q_mode: str = "density_thickness",
+    default_q: float = 1.0,
+    grid_size: int = 60,
+    axis: str = "x",
+    count: int = 3,
+    direction: str = "ascending",
+    mode: str = "decrease",
+    decay: float = 0.08,
+    workfaces: Optional[str] = None,
+) -> dict:
+    data = _pressure_steps_workfaces(
+        model, target, h_mode, q_mode, default_q, grid_size, axis, count, direction, mode, decay, workfaces
+    )
+    if "error" in data:
+        return data
+    return {"grid": data["grid"], "workfaces": workface_result_to_json(data["workfaces"])}
+
+
 @app.get("/export/pressure-steps-grid")
 def export_pressure_steps_grid(model: str = "fixed", target: str = "initial", h_mode: str = "total", q_mode: str = "density_thickness", default_q: float = 1.0, grid_size: int = 60) -> Response:
     data = pressure_steps_grid(model=model, target=target, h_mode=h_mode, q_mode=q_mode, default_q=default_q, grid_size=grid_size)
@@ -482,19 +529,10 @@ def export_pressure_steps_workfaces(
     direction: str = "ascending",
     mode: str = "decrease",
     decay: float = 0.08,
+    workfaces: Optional[str] = None,
 ) -> Response:
-    data = pressure_steps_workfaces(
-        model=model,
-        target=target,
-        h_mode=h_mode,
-        q_mode=q_mode,
-        default_q=default_q,
-        grid_size=grid_size,
-        axis=axis,
-        count=count,
-        direction=direction,
-        mode=mode,
-        decay=decay,
+    data = _pressure_steps_workfaces(
+        model, target, h_mode, q_mode, default_q, grid_size, axis, count, direction, mode, decay, workfaces
     )
     if "error" in data:
         raise HTTPException(status_code=400, detail=data["error"])
@@ -601,8 +639,7 @@ def pressure_index_grid(method: str = "idw", grid_size: int = 50, elastic_modulu
     return {"base": base, "grid": grid}
 
 
-@app.get("/pressure/index/workfaces")
-def pressure_index_workfaces(
+def _pressure_index_workfaces(
     method: str = "idw",
     grid_size: int = 60,
     axis: str = "x",
@@ -613,7 +650,9 @@ def pressure_index_workfaces(
     elastic_modulus: float | None = None,
     density: float | None = None,
     tensile_strength: float | None = None,
+    workfaces: Optional[str] = None,
 ) -> dict:
+    faces = _parse_workfaces_param(workfaces)
     data_dir = get_data_dir()
     coord_path = data_dir / "zuobiao.csv"
     if not coord_path.exists():
@@ -643,11 +682,44 @@ def pressure_index_workfaces(
         direction=direction,
         mode=mode,
         decay=decay,
+        workfaces=faces,
     )
 
     return {"base": base, "grid": grid, "workfaces": adjusted}
 
 
+@app.get("/pressure/index/workfaces")
+def pressure_index_workfaces(
+    method: str = "idw",
+    grid_size: int = 60,
+    axis: str = "x",
+    count: int = 3,
+    direction: str = "ascending",
+    mode: str = "decrease",
+    decay: float = 0.08,
+    elastic_modulus: float | None = None,
+    density: float | None = None,
+    tensile_strength: float | None = None,
+    workfaces: Optional[str] = None,
+) -> dict:
+    data = _pressure_index_workfaces(
+        method=method,
+        grid_size=grid_size,
+        axis=axis,
+        count=count,
+        direction=direction,
+        mode=mode,
+        decay=decay,
+        elastic_modulus=elastic_modulus,
+        density=density,
+        tensile_strength=tensile_strength,
+        workfaces=workfaces,
+    )
+    if "error" in data:
+        return data
+    return {**data, "workfaces": workface_result_to_json(data["workfaces"])}
+
+
 @app.get("/export/pressure-index-workfaces")
 def export_pressure_index_workfaces(
     method: str = "idw",
@@ -660,8 +732,9 @@ def export_pressure_index_workfaces(
     elastic_modulus: float | None = None,
     density: float | None = None,
     tensile_strength: float | None = None,
+    workfaces: Optional[str] = None,
 ) -> Response:
-    data = pressure_index_workfaces(
+    data = _pressure_index_workfaces(
         method=method,
         grid_size=grid_size,
         axis=axis,
@@ -672,6 +745,7 @@ def export_pressure_index_workfaces(
         elastic_modulus=elastic_modulus,
         density=density,
         tensile_strength=tensile_strength,
+        workfaces=workfaces,
     )
     if "error" in data:
         raise HTTPException(status_code=400, detail=data["error"])
@@ -688,6 +762,12 @@ def summary_index(method: str = "idw", grid_size: int = 60) -> dict:
     return {"grid": summarize_grid(data["grid"]["values"])}
 
 
+def _workface_summary(adjusted: dict) -> dict:
+    """Whole-grid summary plus per-face statistics keyed by face_map index."""
+    faces = face_statistics(adjusted["adjusted"], adjusted["face_map"], adjusted["count"])
+    return {"grid": summarize_grid(adjusted["adjusted"]), "faces": faces}
+
+
 @app.get("/summary/index-workfaces")
 def summary_index_workfaces(
     method: str = "idw",
@@ -697,8 +777,9 @@ def summary_index_workfaces(
     direction: str = "ascending",
     mode: str = "decrease",
     decay: float = 0.08,
+    workfaces: Optional[str] = None,
 ) -> dict:
-    data = pressure_index_workfaces(
+    data = _pressure_index_workfaces(
         method=method,
         grid_size=grid_size,
         axis=axis,
@@ -706,10 +787,11 @@ def summary_index_workfaces(
         direction=direction,
         mode=mode,
         decay=decay,
+        workfaces=workfaces,
     )
     if "error" in data:
         return data
-    return {"grid": summarize_grid(data["workfaces"]["adjusted"])}
+    return _workface_summary(data["workfaces"])
 
 
 @app.get("/summary/steps")
@@ -730,20 +812,14 @@ def summary_steps_workfaces(
     direction: str = "ascending",
     mode: str = "decrease",
     decay: float = 0.08,
+    workfaces: Optional[str] = None,
 ) -> dict:
-    data = pressure_steps_workfaces(
-        model=model,
-        target=target,
-        grid_size=grid_size,
-        axis=axis,
-        count=count,
-        direction=direction,
-        mode=mode,
-        decay=decay,
+    data = _pressure_steps_workfaces(
+        model, target, "total", "density_thickness", 1.0, grid_size, axis, count, direction, mode, decay, workfaces
     )
     if "error" in data:
         return data
-    return {"grid": summarize_grid(data["workfaces"]["adjusted"])}
+    return _workface_summary(data["workfaces"])
 
 
 @app.get("/export/interpolation")
@@ -853,7 +929,7 @@ def get_seam_stats_api(seam_name: str) -> dict:
     coords = load_borehole_coords(coord_path)
     files = sorted([p for p in data_dir.glob("*.csv") if p.is_file() and p.name != "zuobiao.csv"])
 
-    result = get_seam_stats(files, coords, seam_name)
+    result = build_seam_dataset(files, coords, seam_name).stats()
 
     if not result.get("borehole_count") or result["borehole_count"] == 0:
         raise HTTPException(status_code=404, detail=f"Coal seam '{seam_name}' not found in any borehole data")
@@ -954,7 +1030,7 @@ def get_seam_overburden_api(
     if not seam_key:
         raise HTTPException(status_code=422, detail="missing required query param: seam_name or seam")
 
-    result = get_overburden_lithology(files, coords, seam_key)
+    result = build_seam_dataset(files, coords, seam_key).overburden()
 
     if borehole:
         # Filter to specific borehole if requested
@@ -1067,35 +1143,17 @@ def get_seam_contour_images_api(
     coords = load_borehole_coords(coord_path)
     files = sorted([p for p in data_dir.glob("*.csv") if p.is_file() and p.name != "zuobiao.csv"])
 
-    # Get seam data (includes both thickness and burial depth)
-    seam_data = get_coal_seam_data(files, coords, seam_name)
-
-    if "error" in seam_data:
-        raise HTTPException(status_code=404, detail=seam_data.get("error", f"Coal seam '{seam_name}' not found"))
-
-    # Extract points and values for interpolation
-    points_list = seam_data.get("points", [])
-    if not points_list:
+    # One scan gives both thickness and burial depth
+    dataset = build_seam_dataset(files, coords, seam_name)
+    if dataset.point_count == 0:
         raise HTTPException(status_code=404, detail=f"No data found for seam '{seam_name}'")
 
     # Interpolate both properties
     import numpy as np
     from app.services.interpolate import interpolate_from_points
 
-    # Prepare thickness data
-    thickness_pts = []
-    thickness_vals = []
-    depth_pts = []
-    depth_vals = []
-
-    for p in points_list:
-        if p.get("x") is not None and p.get("y") is not None:
-            if p.get("thickness") is not None:
-                thickness_pts.append([p["x"], p["y"]])
-                thickness_vals.append(p["thickness"])
-            if p.get("burial_depth") is not None:
-                depth_pts.append([p["x"], p["y"]])
-                depth_vals.append(p["burial_depth"])
+    thickness_pts, thickness_vals = dataset.property_points("thickness")
+    depth_pts, depth_vals = dataset.property_points("burial_depth")
 
     if len(thickness_pts) < 3:
         raise HTTPException(status_code=400, detail="Not enough thickness data points for interpolation")
@@ -1104,16 +1162,16 @@ def get_seam_contour_images_api(
 
     # Thickness interpolation
     thickness_grid = interpolate_from_points(
-        points=np.array(thickness_pts),
-        values=np.array(thickness_vals),
+        points=thickness_pts,
+        values=thickness_vals,
         method=method,
         grid_size=grid_size
     )
 
     # Burial depth interpolation
     depth_grid = interpolate_from_points(
-        points=np.array(depth_pts),
-        values=np.array(depth_vals),
+        points=depth_pts,
+        values=depth_vals,
         method=method,
         grid_size=grid_size
     )
@@ -1143,11 +1201,11 @@ def get_seam_contour_images_api(
         "seam_name": seam_name,
         "method": method,
         "grid_size": grid_size,
-        "borehole_count": seam_data.get("point_count", 0),
+        "borehole_count": dataset.point_count,
         "bounds": thickness_grid.get("bounds"),
         "thickness": images["thickness"],
         "depth": images["depth"],
-        "boreholes": seam_data.get("points", [])
+        "boreholes": list(dataset.points)
     }
     _set_cached_contour_response(cache_key, response_payload)
     return response_payload
@@ -1,30 +1,37 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from datetime import datetime, timezone
 from functools import lru_cache
+import hashlib
 from io import BytesIO
+import os
 from pathlib import Path
 import json
+import threading
 import zipfile
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from uuid import uuid4
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 import pandas as pd
 import numpy as np
 
 from app.core.config import get_data_dir
+from app.services.borehole_cache import source_digest
 from app.services.coords_loader import load_borehole_coords
 from app.services.coal_seam_parser import get_overburden_lithology
 from app.services.csv_loader import read_csv_robust
+from app.services.indicator_pool import evaluate_points
 from app.services.interpolate import interpolate_from_points
+from app.services.job_queue import JobQueue, JobQueueFull
 from app.services.mpi_calculator import (
     PointData,
     RockLayer,
 )
-from app.services.mpi_new_algorithm import calc_all_indicators_new
+from app.services.mpi_new_algorithm import calc_all_indicators_new, combine_mpi
 from app.services.rock_params_db import get_database, get_default_params
 
 
@@ -202,35 +209,81 @@ def _build_lithology_median_profiles() -> Dict[str, Dict[str, Dict[str, float]]]
     return {"by_lithology": by_lithology, "global": global_median}
 
 
-def _resolve_mech_params(lithology: str, measured: Dict[str, Any]) -> Dict[str, float]:
-    profiles = _build_lithology_median_profiles()
-    by_lithology = profiles.get("by_lithology", {})
-    global_median = profiles.get("global", {})
-    defaults = get_default_params(lithology)
+def _profile_values(profile: Dict[str, Any]) -> tuple:
+    values = []
+    for key in _MECH_PARAM_KEYS:
+        value = _to_float_or_none(profile.get(key))
+        values.append(np.nan if value is None else value)
+    return tuple(values)
+
+
+@lru_cache(maxsize=4096)
+def _candidate_profile(lithology: str) -> tuple:
+    """Per-key median from the first lithology candidate that has one."""
+    by_lithology = _build_lithology_median_profiles().get("by_lithology", {})
+    rows = [by_lithology.get(candidate, {}) for candidate in _build_lithology_candidates(lithology)]
+    merged: Dict[str, Any] = {}
+    for row in rows:
+        for key, value in row.items():
+            merged.setdefault(key, value)
+    return _profile_values(merged)
+
+
+@lru_cache(maxsize=4096)
+def _default_profile(lithology: str) -> tuple:
+    return _profile_values(get_default_params(lithology))
+
+
+def _resolve_mech_params_frame(strata: pd.DataFrame) -> pd.DataFrame:
+    """
+    Resolve mechanical parameters for a whole strata table.
+
+    Fallback tiers per key: measured -> lithology median -> global median ->
+    lithology defaults -> emergency values. Candidate and default profiles are
+    built once per distinct lithology and broadcast to every layer.
+    """
+    keys = list(_MECH_PARAM_KEYS)
+    names = strata["name"].astype(str)
+    unique = pd.unique(names)
+
+    lithology_tier = pd.DataFrame([_candidate_profile(n) for n in unique], index=unique, columns=keys)
+    default_tier = pd.DataFrame([_default_profile(n) for n in unique], index=unique, columns=keys)
+    lithology_tier = lithology_tier.reindex(names).set_axis(strata.index)
+    default_tier = default_tier.reindex(names).set_axis(strata.index)
+    global_median = _build_lithology_median_profiles().get("global", {})
+
+    measured = strata.reindex(columns=keys).apply(pd.to_numeric, errors="coerce")
+    resolved = (
+        measured.combine_first(lithology_tier)
+        .fillna(value={k: v for k, v in global_median.items() if k in keys})
+        .combine_first(default_tier)
+        .fillna(value=_EMERGENCY_PARAMS)
+    )
+    return resolved[keys].astype(float)
 
-    candidate_rows = [
-        by_lithology.get(candidate, {})
-        for candidate in _build_lithology_candidates(lithology)
-    ]
 
-    resolved: Dict[str, float] = {}
+def _strata_frame(
+    df: pd.DataFrame,
+    name_col: str,
+    thickness_col: str,
+    measured_cols: Dict[str, Optional[str]],
+) -> pd.DataFrame:
+    """Valid strata rows (named, positive thickness) with resolved parameters."""
+    frame = pd.DataFrame(index=df.index)
+    frame["name"] = df[name_col].astype(str).str.strip()
+    frame["thickness"] = pd.to_numeric(df[thickness_col], errors="coerce")
     for key in _MECH_PARAM_KEYS:
-        value = _to_float_or_none(measured.get(key))
-        if value is None:
-            for row in candidate_rows:
-                row_val = _to_float_or_none(row.get(key))
-                if row_val is not None:
-                    value = row_val
-                    break
-        if value is None:
-            value = _to_float_or_none(global_median.get(key))
-        if value is None:
-            value = _to_float_or_none(defaults.get(key))
-        if value is None:
-            value = _EMERGENCY_PARAMS[key]
-        resolved[key] = float(value)
+        col = measured_cols.get(key)
+        frame[key] = pd.to_numeric(df[col], errors="coerce") if col else np.nan
 
-    return resolved
+    frame = frame[(frame["name"] != "") & (frame["thickness"] > 0)].copy()
+    frame[list(_MECH_PARAM_KEYS)] = _resolve_mech_params_frame(frame)
+    return frame
+
+
+def _layers_from_frame(frame: pd.DataFrame) -> List[ValidationLayer]:
+    columns = ["name", "thickness", *_MECH_PARAM_KEYS]
+    return [ValidationLayer(**record) for record in frame[columns].to_dict("records")]
 
 
 def _clamp(value: float, lo: float, hi: float) -> float:
@@ -389,7 +442,10 @@ def _run_file(run_id: str) -> Path:
 
 
 def _save_result(run_id: str, result: Dict[str, Any]) -> None:
-    _run_file(run_id).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    path = _run_file(run_id)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
 
 
 def _load_result(run_id: str) -> Optional[Dict[str, Any]]:
@@ -471,33 +527,20 @@ def _load_strata_from_dataset(dataset_id: str) -> List[ValidationLayer]:
     if not name_col or not thickness_col:
         raise HTTPException(status_code=400, detail="dataset missing required columns for strata parsing")
 
-    layers: List[ValidationLayer] = []
-    for _, row in df.iterrows():
-        name = str(row.get(name_col, "")).strip()
-        thickness = _to_float_or_none(row.get(thickness_col))
-        if not name or thickness is None or thickness <= 0:
-            continue
-
-        measured = {
-            "density": _to_float_or_none(row.get(density_col)) if density_col else None,
-            "cohesion": _to_float_or_none(row.get(cohesion_col)) if cohesion_col else None,
-            "tensile_strength": _to_float_or_none(row.get(tensile_col)) if tensile_col else None,
-            "elastic_modulus": _to_float_or_none(row.get(elastic_col)) if elastic_col else None,
-            "compressive_strength": _to_float_or_none(row.get(compressive_col)) if compressive_col else None,
-            "friction_angle": _to_float_or_none(row.get(friction_col)) if friction_col else None,
-        }
-        resolved = _resolve_mech_params(name, measured)
-        layer = ValidationLayer(
-            name=name,
-            thickness=float(thickness),
-            density=resolved["density"],
-            cohesion=resolved["cohesion"],
-            tensile_strength=resolved["tensile_strength"],
-            elastic_modulus=resolved["elastic_modulus"],
-            compressive_strength=resolved["compressive_strength"],
-            friction_angle=resolved["friction_angle"],
-        )
-        layers.append(layer)
+    strata = _strata_frame(
+        df,
+        name_col,
+        thickness_col,
+        {
+            "density": density_col,
+            "cohesion": cohesion_col,
+            "tensile_strength": tensile_col,
+            "elastic_modulus": elastic_col,
+            "compressive_strength": compressive_col,
+            "friction_angle": friction_col,
+        },
+    )
+    layers = _layers_from_frame(strata)
 
     if not layers:
         raise HTTPException(status_code=400, detail=f"dataset {dataset_id} has no valid strata rows")
@@ -743,7 +786,13 @@ def _build_export_zip(run_id: str, result: Dict[str, Any]) -> bytes:
     return buffer.getvalue()
 
 
-def _build_validation_result(run_id: str, payload: ValidationRunRequest) -> Dict[str, Any]:
+def _build_validation_result(
+    run_id: str,
+    payload: ValidationRunRequest,
+    progress: Optional[Callable[[float, str], None]] = None,
+) -> Dict[str, Any]:
+    report = progress or (lambda value, stage: None)
+    report(0.05, "loading_inputs")
     if payload.strata:
         layers = payload.strata
     else:
@@ -765,12 +814,14 @@ def _build_validation_result(run_id: str, payload: ValidationRunRequest) -> Dict
         }
         for evt in events
     ]
+    report(0.2, "computing_indicators")
     indicator_payload = calc_all_indicators_new(
         point=point,
         weights=weights,
         microseismic_events=event_payloads,
         config=payload.params if isinstance(payload.params, dict) else {},
     )
+    report(0.8, "assembling_result")
     rsi = _clamp(float(indicator_payload["rsi"]), 0.0, 100.0)
     bri = _clamp(float(indicator_payload["bri"]), 0.0, 100.0)
     asi = _clamp(float(indicator_payload["asi"]), 0.0, 100.0)
@@ -934,6 +985,93 @@ def list_algorithm_validation_datasets() -> Dict[str, Any]:
     return {"datasets": datasets, "count": len(datasets)}
 
 
+# Spatial overview caches. Level 1 holds weight-independent indicator records
+# per (seam, borehole file content, coordinates, algorithm); level 2 holds
+# interpolated grids per (level-1 key set, method, resolution, metric), with
+# weights in the key only for the mpi grid. File digests are re-hashed when a
+# CSV's size/mtime changes, so edited boreholes simply miss the cache.
+_SPATIAL_ALGORITHM_KEY = "advanced_v2"
+_SPATIAL_L1_MAXSIZE = 4096
+_SPATIAL_L2_MAXSIZE = 128
+_spatial_borehole_cache: OrderedDict[tuple, Dict[str, Any]] = OrderedDict()
+_spatial_grid_cache: OrderedDict[tuple, np.ndarray] = OrderedDict()
+_spatial_cache_lock = threading.Lock()
+
+
+def _spatial_cache_get(cache: OrderedDict, key: tuple) -> Any:
+    with _spatial_cache_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _spatial_cache_put(cache: OrderedDict, key: tuple, value: Any, maxsize: int) -> None:
+    with _spatial_cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > maxsize:
+            cache.popitem(last=False)
+
+
+def _clear_spatial_cache() -> None:
+    with _spatial_cache_lock:
+        _spatial_borehole_cache.clear()
+        _spatial_grid_cache.clear()
+
+
+def _spatial_borehole_key(seam_name: str, path: Path, coord: Dict[str, float]) -> tuple:
+    return (
+        seam_name,
+        str(path.resolve()),
+        source_digest(path),
+        tuple(sorted(coord.items())),
+        _SPATIAL_ALGORITHM_KEY,
+    )
+
+
+def _prepare_spatial_points(raw_boreholes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Overburden records -> PointData per borehole with resolved strata."""
+    located = []
+    layer_rows: List[Dict[str, Any]] = []
+    for raw in raw_boreholes:
+        x = _to_float_or_none(raw.get("x"))
+        y = _to_float_or_none(raw.get("y"))
+        if x is None or y is None:
+            continue
+        for layer in raw.get("layers", []):
+            row = {key: layer.get(key) for key in _MECH_PARAM_KEYS}
+            row.update(borehole=len(located), name=layer.get("name", ""), thickness=layer.get("thickness"))
+            layer_rows.append(row)
+        located.append((raw, x, y))
+
+    layers_by_borehole: Dict[int, List[ValidationLayer]] = {}
+    if layer_rows:
+        layer_df = pd.DataFrame(layer_rows)
+        strata = _strata_frame(layer_df, "name", "thickness", {key: key for key in _MECH_PARAM_KEYS})
+        for position, group in strata.groupby(layer_df.loc[strata.index, "borehole"], sort=False):
+            layers_by_borehole[int(position)] = _layers_from_frame(group)
+
+    pending: List[Dict[str, Any]] = []
+    for position, (raw, x, y) in enumerate(located):
+        layers = layers_by_borehole.get(position, [])
+        if not layers:
+            continue
+
+        borehole_name = str(raw.get("name", "")).strip()
+        point = _build_point(layers, borehole_name)
+        point.x = float(x)
+        point.y = float(y)
+        point.borehole = borehole_name
+
+        seam_depth = _to_float_or_none(raw.get("seam_top_depth"))
+        if seam_depth is not None and seam_depth > 0:
+            point.burial_depth = seam_depth
+
+        pending.append({"name": str(raw.get("name", "")), "x": float(x), "y": float(y), "point": point})
+    return pending
+
+
 @router.get("/spatial-overview")
 def get_algorithm_validation_spatial_overview(
     seam_name: str = "16-3煤",
@@ -943,6 +1081,8 @@ def get_algorithm_validation_spatial_overview(
     weight_rsi: Optional[float] = None,
     weight_bri: Optional[float] = None,
     weight_asi: Optional[float] = None,
+    max_workers: Optional[int] = None,
+    time_budget_s: Optional[float] = None,
 ) -> Dict[str, Any]:
     if resolution < 20 or resolution > 200:
         raise HTTPException(status_code=400, detail="resolution must be between 20 and 200")
@@ -966,87 +1106,94 @@ def get_algorithm_validation_spatial_overview(
         and p.stem != "validation_labels"
     )
 
-    overburden = get_overburden_lithology(files, coords, seam_name)
-    raw_boreholes = overburden.get("boreholes", [])
-    if len(raw_boreholes) < 3:
+    norm_weights = _parse_spatial_weights(weights, weight_rsi, weight_bri, weight_asi)
+    keys: Dict[str, tuple] = {}
+    entries: Dict[str, Dict[str, Any]] = {}
+    missing: List[Path] = []
+    for path in files:
+        if path.stem not in coords:
+            continue
+        try:
+            key = _spatial_borehole_key(seam_name, path, coords[path.stem])
+        except OSError:
+            continue
+        keys[path.stem] = key
+        entry = _spatial_cache_get(_spatial_borehole_cache, key)
+        if entry is None:
+            missing.append(path)
+        else:
+            entries[path.stem] = entry
+
+    pending: List[Dict[str, Any]] = []
+    if missing:
+        overburden = get_overburden_lithology(missing, coords, seam_name)
+        raw_boreholes = overburden.get("boreholes", [])
+        found = {str(raw.get("name", "")) for raw in raw_boreholes}
+        for path in missing:
+            entries[path.stem] = {"found": path.stem in found, "record": None}
+        pending = _prepare_spatial_points(raw_boreholes)
+
+    pending_names = {item["name"] for item in pending}
+    for path in missing:
+        if path.stem not in pending_names:
+            _spatial_cache_put(_spatial_borehole_cache, keys[path.stem], entries[path.stem], _SPATIAL_L1_MAXSIZE)
+
+    found_count = sum(1 for entry in entries.values() if entry["found"])
+    if found_count < 3:
         raise HTTPException(
             status_code=404,
-            detail=f"seam '{seam_name}' has only {len(raw_boreholes)} boreholes, need at least 3",
+            detail=f"seam '{seam_name}' has only {found_count} boreholes, need at least 3",
         )
 
-    norm_weights = _parse_spatial_weights(weights, weight_rsi, weight_bri, weight_asi)
+    indicators = evaluate_points(
+        [item["point"] for item in pending],
+        max_workers=max_workers,
+        time_budget_s=time_budget_s,
+    )
+    try:
+        for item, indicator in zip(pending, indicators):
+            entry = entries[item["name"]]
+            entry["record"] = {
+                "borehole_name": item["point"].borehole,
+                "x": item["x"],
+                "y": item["y"],
+                "rsi": float(indicator["rsi"]),
+                "bri": float(indicator["bri"]),
+                "asi": float(indicator["asi"]),
+                "diagnostics": indicator.get("diagnostics", {}),
+            }
+            _spatial_cache_put(_spatial_borehole_cache, keys[item["name"]], entry, _SPATIAL_L1_MAXSIZE)
+    except TimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
+
     points: List[List[float]] = []
     metrics: Dict[str, List[float]] = {"rsi": [], "bri": [], "asi": [], "mpi": []}
     boreholes: List[Dict[str, Any]] = []
+    used_keys: List[tuple] = []
 
-    for raw in raw_boreholes:
-        x = _to_float_or_none(raw.get("x"))
-        y = _to_float_or_none(raw.get("y"))
-        if x is None or y is None:
+    for path in files:
+        entry = entries.get(path.stem)
+        cached_record = entry.get("record") if entry else None
+        if not cached_record:
             continue
 
-        layers: List[ValidationLayer] = []
-        for layer in raw.get("layers", []):
-            name = str(layer.get("name", "")).strip()
-            thickness = _to_float_or_none(layer.get("thickness"))
-            if not name or thickness is None or thickness <= 0:
-                continue
-            measured = {
-                "density": _to_float_or_none(layer.get("density")),
-                "cohesion": _to_float_or_none(layer.get("cohesion")),
-                "tensile_strength": _to_float_or_none(layer.get("tensile_strength")),
-                "elastic_modulus": _to_float_or_none(layer.get("elastic_modulus")),
-                "compressive_strength": _to_float_or_none(layer.get("compressive_strength")),
-                "friction_angle": _to_float_or_none(layer.get("friction_angle")),
-            }
-            resolved = _resolve_mech_params(name, measured)
-            layers.append(
-                ValidationLayer(
-                    name=name,
-                    thickness=float(thickness),
-                    density=resolved["density"],
-                    cohesion=resolved["cohesion"],
-                    tensile_strength=resolved["tensile_strength"],
-                    elastic_modulus=resolved["elastic_modulus"],
-                    compressive_strength=resolved["compressive_strength"],
-                    friction_angle=resolved["friction_angle"],
-                )
-            )
-
-        if not layers:
-            continue
-
-        borehole_name = str(raw.get("name", "")).strip() or f"bh_{len(boreholes) + 1}"
-        point = _build_point(layers, borehole_name)
-        point.x = float(x)
-        point.y = float(y)
-        point.borehole = borehole_name
-
-        seam_depth = _to_float_or_none(raw.get("seam_top_depth"))
-        if seam_depth is not None and seam_depth > 0:
-            point.burial_depth = seam_depth
-
-        indicator = calc_all_indicators_new(
-            point=point,
-            weights=norm_weights,
-            microseismic_events=[],
-        )
-        risk_level = _risk_level(indicator["mpi"])
-
+        mpi = float(combine_mpi(cached_record, norm_weights))
+        risk_level = _risk_level(mpi)
         record = {
-            "borehole_name": borehole_name,
-            "x": float(x),
-            "y": float(y),
-            "rsi": float(indicator["rsi"]),
-            "bri": float(indicator["bri"]),
-            "asi": float(indicator["asi"]),
-            "mpi": float(indicator["mpi"]),
+            "borehole_name": cached_record["borehole_name"] or f"bh_{len(boreholes) + 1}",
+            "x": cached_record["x"],
+            "y": cached_record["y"],
+            "rsi": cached_record["rsi"],
+            "bri": cached_record["bri"],
+            "asi": cached_record["asi"],
+            "mpi": mpi,
             "risk_level": risk_level,
             "risk_label": _risk_label(risk_level),
-            "diagnostics": indicator.get("diagnostics", {}),
+            "diagnostics": cached_record["diagnostics"],
         }
 
         boreholes.append(record)
+        used_keys.append(keys[path.stem])
         points.append([record["x"], record["y"]])
         for metric in metrics:
             metrics[metric].append(float(record[metric]))
@@ -1060,17 +1207,27 @@ def get_algorithm_validation_spatial_overview(
     grids: Dict[str, Any] = {}
     stats: Dict[str, Any] = {}
     method_key = method.strip().lower()
+    grid_hits = 0
     for metric, values in metrics.items():
-        interp = interpolate_from_points(
-            points=points_np,
-            values=np.asarray(values, dtype=float),
-            method=method_key,
-            grid_size=resolution,
-            bounds=bounds,
-        )
-        if "error" in interp:
-            raise HTTPException(status_code=400, detail=f"{metric} interpolation failed: {interp['error']}")
-        grids[metric] = interp["grid"].tolist()
+        grid_key: tuple = (tuple(used_keys), method_key, resolution, metric)
+        if metric == "mpi":
+            grid_key += (tuple(sorted(norm_weights.items())),)
+        grid = _spatial_cache_get(_spatial_grid_cache, grid_key)
+        if grid is None:
+            interp = interpolate_from_points(
+                points=points_np,
+                values=np.asarray(values, dtype=float),
+                method=method_key,
+                grid_size=resolution,
+                bounds=bounds,
+            )
+            if "error" in interp:
+                raise HTTPException(status_code=400, detail=f"{metric} interpolation failed: {interp['error']}")
+            grid = interp["grid"]
+            _spatial_cache_put(_spatial_grid_cache, grid_key, grid, _SPATIAL_L2_MAXSIZE)
+        else:
+            grid_hits += 1
+        grids[metric] = grid.tolist()
         stats[metric] = _summary_stats(values)
 
     label_stream = _load_spatial_label_stream(
@@ -1113,20 +1270,106 @@ def get_algorithm_validation_spatial_overview(
             "y_true": label_stream.get("y_true", []),
             "y_prob": label_stream.get("y_prob", []),
         },
+        "cache": {
+            "boreholes_cached": len(entries) - len(missing),
+            "boreholes_computed": len(pending),
+            "grids_cached": grid_hits,
+        },
     }
 
 
+def _run_queue_settings() -> Dict[str, int]:
+    def _env_int(name: str, default: int) -> int:
+        try:
+            return max(1, int(os.getenv(name, "") or default))
+        except ValueError:
+            return default
+
+    return {
+        "max_workers": _env_int("VALIDATION_MAX_WORKERS", 2),
+        "max_pending": _env_int("VALIDATION_MAX_PENDING", 64),
+    }
+
+
+# Validation runs execute on a bounded background pool; job state lives next
+# to the run results so GET /result/{run_id} can poll it.
+_RUN_QUEUE = JobQueue(_runs_dir, **_run_queue_settings())
+_RESULT_WAIT_MAX_S = 30.0
+
+
+def _new_run_id() -> str:
+    return f"run_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:8]}"
+
+
+def _run_content_key(payload: ValidationRunRequest) -> str:
+    """Hash of the payload plus the dataset files it may read."""
+    digest = hashlib.sha256(
+        json.dumps(payload.model_dump(mode="json"), sort_keys=True, ensure_ascii=False).encode("utf-8")
+    )
+    data_dir = get_data_dir()
+    for name in (
+        f"{payload.dataset_id}.csv",
+        f"{payload.dataset_id}_events.csv",
+        f"{payload.dataset_id}_labels.csv",
+        "validation_labels.csv",
+    ):
+        path = data_dir / name
+        if path.is_file():
+            digest.update(f"{name}:{source_digest(path)}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _execute_validation_run(payload: ValidationRunRequest) -> Callable[[str, Callable[[float, str], None]], None]:
+    def _run(run_id: str, progress: Callable[[float, str], None]) -> None:
+        result = _build_validation_result(run_id, payload, progress=progress)
+        progress(0.95, "saving")
+        _RUN_RESULTS[run_id] = result
+        _save_result(run_id, result)
+
+    return _run
+
+
+def _run_status_payload(state: Dict[str, Any]) -> Dict[str, Any]:
+    payload = {
+        "run_id": state.get("job_id"),
+        "status": state.get("status"),
+        "stage": state.get("stage"),
+        "progress": state.get("progress", 0.0),
+        "submitted_at": state.get("submitted_at"),
+        "updated_at": state.get("updated_at"),
+    }
+    if state.get("status") == "failed":
+        payload["error"] = state.get("error")
+        payload["error_status"] = state.get("error_status", 500)
+    return payload
+
+
 @router.post("/run")
 def run_algorithm_validation(payload: ValidationRunRequest) -> Dict[str, Any]:
-    run_id = f"run_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:8]}"
-    result = _build_validation_result(run_id, payload)
-    _RUN_RESULTS[run_id] = result
-    _save_result(run_id, result)
-    return {"run_id": run_id, "status": "completed"}
+    if not payload.strata and not (get_data_dir() / f"{payload.dataset_id}.csv").exists():
+        raise HTTPException(status_code=404, detail=f"dataset csv not found: {payload.dataset_id}.csv")
+
+    content_key = _run_content_key(payload)
+    try:
+        state, deduplicated = _RUN_QUEUE.submit(content_key, _execute_validation_run(payload), job_id=_new_run_id())
+        if deduplicated and state.get("status") == "completed" and _load_result(state["job_id"]) is None:
+            _RUN_QUEUE.forget(content_key)
+            state, deduplicated = _RUN_QUEUE.submit(content_key, _execute_validation_run(payload), job_id=_new_run_id())
+    except JobQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "5"}) from exc
+
+    return {**_run_status_payload(state), "deduplicated": deduplicated}
 
 
 @router.get("/result/{run_id}")
-def get_algorithm_validation_result(run_id: str) -> Dict[str, Any]:
+def get_algorithm_validation_result(run_id: str, wait: float = 0.0) -> Any:
+    state = _RUN_QUEUE.wait(run_id, min(max(wait, 0.0), _RESULT_WAIT_MAX_S))
+    if state is not None and state.get("status") == "running":
+        return JSONResponse(status_code=202, content=_run_status_payload(state))
+    if state is not None and state.get("status") == "failed":
+        # Keep the status code the validation would have failed with synchronously.
+        return JSONResponse(status_code=state.get("error_status", 500), content=_run_status_payload(state))
+
     result = _load_result(run_id)
     if not result:
         raise HTTPException(status_code=404, detail=f"run_id not found: {run_id}")
@@ -1179,6 +1422,9 @@ def evaluate_algorithm_validation(payload: ValidationEvaluateRequest) -> Dict[st
 
 @router.get("/export/{run_id}")
 def export_algorithm_validation(run_id: str) -> Response:
+    state = _RUN_QUEUE.get_state(run_id)
+    if state is not None and state.get("status") != "completed":
+        raise HTTPException(status_code=409, detail=f"run {run_id} is {state.get('status')}")
     result = _load_result(run_id)
     if not result:
         raise HTTPException(status_code=404, detail=f"run_id not found: {run_id}")
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
 
 from app.schemas.geomodel import (
     GeomodelArtifactsResponse,
     GeomodelJobCreate,
     GeomodelJobResponse,
 )
+from app.services.file_transfer import file_download_response
 from app.services.geomodel_service import geomodel_service
 
 
@@ -30,6 +31,16 @@ def get_geomodel_job(job_id: str) -> GeomodelJobResponse:
         raise HTTPException(status_code=404, detail=f"job not found: {job_id}") from exc
 
 
+@router.delete("/jobs/{job_id}", response_model=GeomodelJobResponse, summary="取消地质建模任务")
+def cancel_geomodel_job(job_id: str) -> GeomodelJobResponse:
+    try:
+        return geomodel_service.cancel_job(job_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"job not found: {job_id}") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+
 @router.get("/jobs/{job_id}/artifacts", response_model=GeomodelArtifactsResponse, summary="列出任务产物")
 def list_geomodel_artifacts(job_id: str) -> GeomodelArtifactsResponse:
     try:
@@ -46,7 +57,7 @@ def list_geomodel_artifacts(job_id: str) -> GeomodelArtifactsResponse:
 
 
 @router.get("/jobs/{job_id}/artifacts/{artifact_name}", summary="下载任务产物")
-def download_geomodel_artifact(job_id: str, artifact_name: str):
+def download_geomodel_artifact(job_id: str, artifact_name: str, request: Request) -> Response:
     try:
         artifact_path = geomodel_service.get_artifact_path(job_id, artifact_name)
     except KeyError as exc:
@@ -54,8 +65,5 @@ def download_geomodel_artifact(job_id: str, artifact_name: str):
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=f"artifact not found: {artifact_name}") from exc
 
-    return FileResponse(
-        path=str(artifact_path),
-        filename=artifact_path.name,
-        media_type="application/octet-stream",
-    )
+    # Supports Range requests and gzip transfer encoding for large models.
+    return file_download_response(request, artifact_path, filename=artifact_path.name)
@@ -11,9 +11,10 @@ from typing import Dict, List, Optional, Any
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 
+from app.services.compute_executor import run_compute
 from app.services.geomodel_service import geomodel_service
-from app.services.pressure_index import calculate_pressure_index_grid
-from app.services.seam_interpolate import get_seam_overburden
+from app.services.pressure_index import build_pressure_index_grid
+from app.services.seam_interpolate import load_seam_overburden
 from app.schemas.geomodel import GeomodelJobResponse
 
 
@@ -120,9 +121,6 @@ async def calculate_mpi_with_geomodel(request: GeomodelMpiRequest) -> Dict[str,
     with the standard MPI calculation to provide geo-aware results.
     """
     try:
-        # Get seam overburden data
-        overburden_data = await get_seam_overburden(request.seam_name)
-
         # Get geomodel context if job_id provided
         geomodel_context = None
         if request.geomodel_job_id:
@@ -136,11 +134,13 @@ async def calculate_mpi_with_geomodel(request: GeomodelMpiRequest) -> Dict[str,
             except:
                 pass
 
-        # Calculate pressure index grid
-        mpi_grid = await calculate_pressure_index_grid(
-            seam_name=request.seam_name,
-            resolution=request.resolution,
-            points=overburden_data.get('boreholes', []),
+        # Overburden parsing and MPI gridding run on the compute executor
+        mpi_grid = await run_compute(
+            _seam_mpi_grid,
+            request.seam_name,
+            request.resolution,
+            endpoint="geomodel_integration.mpi_with_geomodel",
+            limit=2,
         )
 
         # Prepare response
@@ -160,6 +160,8 @@ async def calculate_mpi_with_geomodel(request: GeomodelMpiRequest) -> Dict[str,
 
         return response
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -177,11 +179,12 @@ async def get_combined_visualization(job_id: str, seam: str = Query(...)) -> Com
         geomodel_data = await get_geomodel_visualization_data(job_id)
 
         # Get MPI data
-        overburden_data = await get_seam_overburden(seam)
-        mpi_grid = await calculate_pressure_index_grid(
-            seam_name=seam,
-            resolution=50,
-            points=overburden_data.get('boreholes', []),
+        mpi_grid = await run_compute(
+            _seam_mpi_grid,
+            seam,
+            50,
+            endpoint="geomodel_integration.combined_visualization",
+            limit=2,
         )
 
         # Calculate combined quality metrics
@@ -196,12 +199,24 @@ async def get_combined_visualization(job_id: str, seam: str = Query(...)) -> Com
             combined_quality=combined_quality,
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Helper functions
 
+def _seam_mpi_grid(seam_name: str, resolution: int) -> List[List[float]]:
+    """Load seam overburden and grid its MPI (CPU-bound, runs off the event loop)."""
+    overburden_data = load_seam_overburden(seam_name)
+    return build_pressure_index_grid(
+        seam_name=seam_name,
+        resolution=resolution,
+        points=overburden_data.get('boreholes', []),
+    )
+
+
 def _build_layer_list(artifacts: List, quality: Dict) -> List[Dict]:
     """Build layer list from artifacts and quality data"""
     layers = []
@@ -14,6 +14,7 @@ from __future__ import annotations
 from fastapi import APIRouter, HTTPException, Query, UploadFile, File
 from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, List, Optional, Any
+import json
 import numpy as np
 
 from app.services.mpi_calculator import (
@@ -30,6 +31,7 @@ from app.services.mpi_calculator import (
 from app.services.interpolate import interpolate_from_points
 from app.services.contour_generator import generate_matplotlib_contour_image
 from app.services.workface_parser import parse_workface_file
+from app.services.workface_raster import face_statistics, rasterize_workfaces
 from app.services.geomodel_features import DEFAULT_GEOMODEL_FEATURES, extract_geomodel_features
 from app.services.mpi_new_algorithm import calc_mpi_geology_aware
 
@@ -256,6 +258,14 @@ class MPIHeatmapImageRequest(BaseModel):
     colormap: Optional[str] = Field("odi", description="色带名称（odi或matplotlib色带名）")
 
 
+class WorkfaceStatsRequest(BaseModel):
+    """工作面分区统计请求"""
+    grid: List[List[Optional[float]]] = Field(..., description="指标网格值（MPI、步距等，空值忽略）")
+    bounds: Dict[str, float] = Field(..., description="边界范围 {min_x, max_x, min_y, max_y}")
+    workfaces: List[Dict[str, Any]] = Field(..., description="工作面列表（/workfaces/parse 的输出）")
+    percentiles: List[float] = Field(default_factory=lambda: [10.0, 50.0, 90.0], description="分位数")
+
+
 class KeyLayersRequest(BaseModel):
     """关键层识别请求"""
     strata: List[RockLayerModel] = Field(..., description="岩层数据")
@@ -858,6 +868,52 @@ async def parse_workfaces(file: UploadFile = File(...)) -> Dict[str, Any]:
     }
 
 
+@router.post("/workfaces/stats", summary="工作面分区统计")
+def workface_stats(request: WorkfaceStatsRequest) -> Dict[str, Any]:
+    """
+    按工作面多边形统计任意指标网格。
+
+    多边形栅格化为网格标签图（按多边形集合、边界和分辨率缓存），
+    各工作面的 cells/min/max/mean/std/分位数一次归约得到；
+    工作面重叠时后者优先。
+    """
+    try:
+        workfaces = parse_workface_file(json.dumps(request.workfaces), "workfaces.json")
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=f"工作面数据无效: {exc}") from exc
+    if not workfaces:
+        raise HTTPException(status_code=400, detail="未解析到有效工作面")
+    if any(not 0 <= p <= 100 for p in request.percentiles):
+        raise HTTPException(status_code=400, detail="分位数需在0-100之间")
+
+    if not {"min_x", "max_x", "min_y", "max_y"} <= request.bounds.keys():
+        raise HTTPException(status_code=400, detail="边界需包含 min_x, max_x, min_y, max_y")
+    # 栅格化假定网格坐标轴递增
+    bounds = request.bounds
+    if not (bounds["min_x"] <= bounds["max_x"] and bounds["min_y"] <= bounds["max_y"]):
+        raise HTTPException(status_code=400, detail="边界需满足 min_x <= max_x 且 min_y <= max_y")
+
+    try:
+        grid = np.asarray(request.grid, dtype=float)
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="网格必须为非空二维数组") from exc
+    if grid.ndim != 2 or grid.size == 0:
+        raise HTTPException(status_code=400, detail="网格必须为非空二维数组")
+    rows, cols = grid.shape
+    labels = rasterize_workfaces(workfaces, request.bounds, rows, cols)
+    stats = face_statistics(grid, labels, len(workfaces), request.percentiles)
+    for item, face in zip(stats, workfaces):
+        item["name"] = face.get("name")
+
+    return {
+        "count": len(workfaces),
+        "rows": rows,
+        "cols": cols,
+        "outside_cells": int(np.count_nonzero(labels < 0)),
+        "faces": stats,
+    }
+
+
 @router.post("/key-layers", response_model=KeyLayersResponse, summary="关键层识别")
 def identify_key_layers_endpoint(request: KeyLayersRequest) -> KeyLayersResponse:
     """
@@ -13,6 +13,7 @@ from fastapi.responses import FileResponse, Response
 from pydantic import BaseModel, Field, field_validator, model_validator
 
 from app.services.research_manager import (
+    DEFAULT_BOOTSTRAP_ROUNDS,
     create_split_manifest,
     dataset_manifest_path,
     get_experiment_artifact_path,
@@ -24,6 +25,7 @@ from app.services.research_manager import (
     get_research_paths,
 )
 from app.services.experiment_runner import run_experiment_suite, DEFAULT_EXPERIMENT_TEMPLATES
+from app.services.experiment_index import query_experiments, rebuild_experiment_index
 
 
 router = APIRouter(prefix="/api/research", tags=["Research"])
@@ -149,6 +151,7 @@ class ExperimentSpec(BaseModel):
     params: Dict[str, Any] = Field(default_factory=dict)
     metrics: List[str] = Field(default_factory=lambda: ["auc", "pr_auc", "brier", "ece", "f1", "mae", "rmse"])
     seed: int = 42
+    n_bootstrap: int = Field(default=DEFAULT_BOOTSTRAP_ROUNDS, ge=1, le=100000)
 
     @field_validator("dataset_id", "dataset_version", "experiment_name")
     @classmethod
@@ -186,6 +189,7 @@ class ExperimentSuiteRequest(BaseModel):
     dataset_version: str
     split_id: str
     seed: int = 42
+    n_bootstrap: int = Field(default=DEFAULT_BOOTSTRAP_ROUNDS, ge=1, le=100000)
 
 
 @router.post("/dataset/register")
@@ -258,6 +262,7 @@ def run_research_experiment_suite(payload: ExperimentSuiteRequest) -> Dict[str,
             dataset_version=payload.dataset_version,
             split_id=payload.split_id,
             seed=payload.seed,
+            n_bootstrap=payload.n_bootstrap,
         )
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
@@ -267,6 +272,12 @@ def run_research_experiment_suite(payload: ExperimentSuiteRequest) -> Dict[str,
 
 
 
+@router.post("/leaderboard/rebuild-index")
+def rebuild_research_experiment_index() -> Dict[str, Any]:
+    count = rebuild_experiment_index(get_research_paths().experiments_dir)
+    return {"indexed": count}
+
+
 @router.get("/experiments/{exp_id}")
 def get_research_experiment(exp_id: str) -> Dict[str, Any]:
     try:
@@ -408,35 +419,42 @@ def download_research_paper_bundle(paper_id: str) -> Response:
 
 
 @router.get("/leaderboard/experiments")
-def get_research_experiment_leaderboard(metric: str = "auc", limit: int = 20) -> Dict[str, Any]:
+def get_research_experiment_leaderboard(
+    metric: str = "auc",
+    limit: int = 20,
+    dataset_id: Optional[str] = None,
+    model_type: Optional[str] = None,
+    split_id: Optional[str] = None,
+) -> Dict[str, Any]:
     metric_key = str(metric).strip()
     if not metric_key:
         raise HTTPException(status_code=400, detail="metric is required")
     if limit <= 0 or limit > 200:
         raise HTTPException(status_code=400, detail="limit must be in [1, 200]")
 
-    exp_dir = get_research_paths().experiments_dir
+    entries = query_experiments(
+        get_research_paths().experiments_dir,
+        dataset_id=dataset_id,
+        model_type=model_type,
+        split_id=split_id,
+    )
     rows: List[Dict[str, Any]] = []
-    for path in sorted(exp_dir.glob("*/result.json")):
-        try:
-            payload = json.loads(path.read_text(encoding="utf-8"))
-        except Exception:
-            continue
-        value = _metric_value(payload, metric_key)
+    for entry in entries:
+        value = _metric_value(entry, metric_key)
         if value is None:
             continue
         rows.append(
             {
-                "exp_id": payload.get("exp_id", path.parent.name),
-                "experiment_name": (payload.get("spec") or {}).get("experiment_name", ""),
-                "model_type": (payload.get("spec") or {}).get("model_type", ""),
-                "dataset_id": payload.get("dataset_id", ""),
-                "dataset_version": payload.get("dataset_version", ""),
-                "split_id": payload.get("split_id", ""),
-                "created_at": payload.get("created_at", ""),
+                "exp_id": entry.get("exp_id", ""),
+                "experiment_name": entry.get("experiment_name", ""),
+                "model_type": entry.get("model_type", ""),
+                "dataset_id": entry.get("dataset_id", ""),
+                "dataset_version": entry.get("dataset_version", ""),
+                "split_id": entry.get("split_id", ""),
+                "created_at": entry.get("created_at", ""),
                 "metric": metric_key,
                 "value": value,
-                "ci95": (payload.get("ci95") or {}).get(metric_key),
+                "ci95": (entry.get("ci95") or {}).get(metric_key),
             }
         )
 
@@ -22,6 +22,7 @@ from app.services.rock_params_db import (
     get_default_params,
     estimate_missing_params,
     LITHOLOGY_SYNONYMS,
+    CANONICAL_NAMES,
 )
 
 
@@ -336,14 +337,10 @@ def _get_standard_name(lithology: str) -> Optional[str]:
     """获取岩性的标准名称"""
     lithology_stripped = lithology.strip()
 
-    # 精确匹配
-    if lithology_stripped in LITHOLOGY_SYNONYMS:
-        return lithology_stripped
-
-    # 同义词匹配
-    for standard_name, synonyms in LITHOLOGY_SYNONYMS.items():
-        if lithology_stripped in synonyms:
-            return standard_name
+    # 精确匹配 / 同义词匹配
+    standard_name = CANONICAL_NAMES.get(lithology_stripped)
+    if standard_name is not None:
+        return standard_name
 
     # 关键词匹配
     if "砂" in lithology_stripped and "泥" in lithology_stripped:
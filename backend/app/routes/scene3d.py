@@ -12,6 +12,8 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 import numpy as np
 
+from app.services.compute_executor import run_compute
+
 
 router = APIRouter(
     prefix="/api/scene3d",
@@ -171,6 +173,18 @@ async def get_scene_3d_data(
     - 指标值（用于热力图叠加）
     - 边界和统计
     """
+    # 解析与网格生成在计算线程池中执行，避免阻塞事件循环
+    return await run_compute(
+        _build_scene_3d_data,
+        seam_name,
+        indicator,
+        resolution,
+        endpoint="scene3d.data",
+        limit=4,
+    )
+
+
+def _build_scene_3d_data(seam_name: str, indicator: str, resolution: int) -> Scene3DResponse:
     from app.services.coal_seam_parser import get_all_coal_seams, get_coal_seam_data
     from app.core.config import get_data_dir
     from pathlib import Path
@@ -18,6 +18,7 @@ class GeomodelJobStatus(str, Enum):
     running = "running"
     completed = "completed"
     failed = "failed"
+    cancelled = "cancelled"
 
 
 class GeomodelJobCreate(BaseModel):
@@ -31,6 +32,7 @@ class GeomodelJobCreate(BaseModel):
         description="产物格式列表",
     )
     params: Dict[str, float | int | str | bool] = Field(default_factory=dict, description="附加参数")
+    priority: int = Field(default=0, ge=-10, le=10, description="调度优先级（越大越先执行）")
 
     model_config = ConfigDict(
         json_schema_extra={
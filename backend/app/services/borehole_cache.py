@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import threading
+from typing import Any, Dict, Optional, Tuple
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_data_dir
+from app.services.csv_loader import read_csv_with_info
+from app.services.tracing import traced
+
+# Parsed borehole tables are stored under DATA_DIR as one directory per source
+# content hash: meta.json (detected encoding/delimiter, column specs) plus one
+# .npy per column, so a restart memory-maps columns instead of re-sniffing CSVs.
+CACHE_DIRNAME = "_borehole_cache"
+CACHE_VERSION = 1
+# One small pointer file per source names its current entry, so replacing an
+# entry only touches that source's previous one.
+SOURCES_DIRNAME = "_sources"
+
+_digest_memo: Dict[str, Tuple[int, int, str]] = {}
+_digest_lock = threading.Lock()
+_pruned_roots: set = set()
+
+
+def _cache_enabled() -> bool:
+    return os.getenv("BOREHOLE_CACHE", "1").strip().lower() not in {"0", "false", "off"}
+
+
+def get_cache_root() -> Path:
+    return get_data_dir() / CACHE_DIRNAME
+
+
+def source_digest(path: Path) -> str:
+    """Content hash of the source; re-hashes only when size/mtime changed."""
+    stat = path.stat()
+    key = str(path.resolve())
+    with _digest_lock:
+        memo = _digest_memo.get(key)
+    if memo and memo[0] == stat.st_size and memo[1] == stat.st_mtime_ns:
+        return memo[2]
+
+    digest = hashlib.sha1(path.read_bytes()).hexdigest()
+    with _digest_lock:
+        _digest_memo[key] = (stat.st_size, stat.st_mtime_ns, digest)
+    return digest
+
+
+def _entry_dir(digest: str) -> Path:
+    return get_cache_root() / f"v{CACHE_VERSION}-{digest}"
+
+
+def _load_entry(entry: Path) -> Optional[pd.DataFrame]:
+    meta_path = entry / "meta.json"
+    if not meta_path.exists():
+        return None
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        columns: Dict[int, Any] = {}
+        for i, spec in enumerate(meta["columns"]):
+            values = np.load(entry / f"c{i}.npy", mmap_mode="r")
+            if spec["kind"] == "text":
+                mask = np.load(entry / f"m{i}.npy")
+                text = values.astype(object)
+                text[mask] = np.nan
+                columns[i] = text
+            else:
+                columns[i] = values
+        df = pd.DataFrame(columns, index=pd.RangeIndex(int(meta["rows"])))
+        df.columns = [spec["name"] for spec in meta["columns"]]
+        return df
+    except Exception:
+        return None
+
+
+def _column_specs(df: pd.DataFrame) -> Optional[list]:
+    specs = []
+    for i, name in enumerate(df.columns):
+        if not isinstance(name, str):
+            return None
+        series = df.iloc[:, i]
+        if series.dtype.kind in "biuf":
+            specs.append({"name": name, "kind": "numeric", "dtype": str(series.dtype)})
+        elif series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) in {"string", "empty"}:
+            specs.append({"name": name, "kind": "text"})
+        else:
+            return None
+    return specs
+
+
+def _write_entry(entry: Path, df: pd.DataFrame, source: Path, digest: str, info: Dict[str, str]) -> None:
+    specs = _column_specs(df)
+    if specs is None:
+        return
+
+    tmp = entry.with_name(f".{entry.name}.{uuid4().hex[:8]}.tmp")
+    tmp.mkdir(parents=True, exist_ok=True)
+    try:
+        for i, spec in enumerate(specs):
+            series = df.iloc[:, i]
+            if spec["kind"] == "text":
+                mask = series.isna().to_numpy()
+                np.save(tmp / f"m{i}.npy", mask)
+                np.save(tmp / f"c{i}.npy", series.where(~mask, "").astype(str).to_numpy(dtype=str))
+            else:
+                np.save(tmp / f"c{i}.npy", series.to_numpy())
+        meta = {
+            "version": CACHE_VERSION,
+            "source": str(source.resolve()),
+            "sha1": digest,
+            "encoding": info.get("encoding"),
+            "delimiter": info.get("delimiter"),
+            "rows": int(df.shape[0]),
+            "columns": specs,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, entry)
+    except OSError:
+        # Another worker may have published the same entry first.
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+
+    _set_source_entry(source, entry)
+
+
+def _pointer_path(source_key: str) -> Path:
+    name = hashlib.sha1(source_key.encode("utf-8")).hexdigest()[:20]
+    return get_cache_root() / SOURCES_DIRNAME / f"{name}.json"
+
+
+def _read_pointer(path: Path) -> Optional[Dict[str, str]]:
+    try:
+        pointer = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return pointer if isinstance(pointer, dict) and "source" in pointer and "entry" in pointer else None
+
+
+def _write_pointer(source_key: str, entry_name: str) -> None:
+    path = _pointer_path(source_key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid4().hex[:8]}.tmp")
+    tmp.write_text(json.dumps({"source": source_key, "entry": entry_name}, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _set_source_entry(source: Path, entry: Path) -> None:
+    """Point `source` at `entry` and drop the entry it pointed at before (O(1) per write)."""
+    source_key = str(source.resolve())
+    previous = _read_pointer(_pointer_path(source_key))
+    if previous and previous["entry"] != entry.name:
+        shutil.rmtree(get_cache_root() / previous["entry"], ignore_errors=True)
+    try:
+        _write_pointer(source_key, entry.name)
+    except OSError:
+        pass
+
+
+def prune_orphaned_entries() -> None:
+    """
+    Remove entries no live source points at, e.g. because the source was deleted.
+
+    O(entries); read_borehole_csv runs it once per process and cache root.
+    Entries written before the pointer files existed are adopted by their source.
+    """
+    root = get_cache_root()
+    live = set()
+    for path in (root / SOURCES_DIRNAME).glob("*.json"):
+        pointer = _read_pointer(path)
+        if pointer is None or not Path(pointer["source"]).exists():
+            path.unlink(missing_ok=True)
+            continue
+        live.add(pointer["entry"])
+    for entry in root.glob(f"v{CACHE_VERSION}-*"):
+        if entry.name in live:
+            continue
+        try:
+            source_key = json.loads((entry / "meta.json").read_text(encoding="utf-8")).get("source")
+        except (OSError, ValueError):
+            source_key = None
+        if source_key and Path(source_key).exists() and not _pointer_path(source_key).exists():
+            try:
+                _write_pointer(source_key, entry.name)
+                live.add(entry.name)
+                continue
+            except OSError:
+                pass
+        shutil.rmtree(entry, ignore_errors=True)
+
+
+def _prune_once() -> None:
+    root = str(get_cache_root())
+    with _digest_lock:
+        if root in _pruned_roots:
+            return
+        _pruned_roots.add(root)
+    try:
+        prune_orphaned_entries()
+    except OSError:
+        pass
+
+
+def read_cache_meta(path: Path) -> Optional[Dict[str, Any]]:
+    """Cached metadata (encoding, delimiter, columns) for a source file, if present."""
+    try:
+        digest = source_digest(path)
+        return json.loads((_entry_dir(digest) / "meta.json").read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+@traced("parse")
+def read_borehole_csv(path: Path) -> pd.DataFrame:
+    """
+    Drop-in replacement for read_csv_robust backed by the persistent cache.
+
+    Entries are keyed by the source content hash, so an edited CSV is simply
+    re-parsed into a new entry and the stale one is removed; entries of
+    deleted sources are swept once per process.
+    """
+    if not _cache_enabled():
+        return read_csv_with_info(path)[0]
+
+    _prune_once()
+    digest = source_digest(path)
+    entry = _entry_dir(digest)
+    cached = _load_entry(entry)
+    if cached is not None:
+        return cached
+
+    df, info = read_csv_with_info(path)
+    try:
+        get_cache_root().mkdir(parents=True, exist_ok=True)
+        _write_entry(entry, df, path, digest, info)
+    except OSError:
+        pass
+    return df
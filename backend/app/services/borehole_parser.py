@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 from typing import Dict, List
+
+import numpy as np
 import pandas as pd
 
+from app.services.tracing import traced
+
 COLUMN_MAP = {
     "名称": "name",
     "岩性": "name",
@@ -26,12 +30,14 @@ def _normalize_column(col: str) -> str:
     return COLUMN_MAP.get(key, key)
 
 
+@traced("normalize")
 def normalize_borehole_df(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     df.columns = [_normalize_column(c) for c in df.columns]
     return df
 
 
+@traced("normalize")
 def add_depth_columns(df: pd.DataFrame) -> pd.DataFrame:
     if "thickness" not in df.columns:
         return df
@@ -45,18 +51,80 @@ def add_depth_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def fill_missing_by_lithology(df: pd.DataFrame, lith_avg_map: Dict) -> pd.DataFrame:
+FILL_FIELDS = ["thickness", "elastic_modulus", "density", "tensile_strength", "shear_strength"]
+
+
+def lithology_average_table(lith_avg_map: Dict | pd.DataFrame) -> pd.DataFrame:
+    """Per-lithology averages indexed by name; build once and reuse across boreholes."""
+    if isinstance(lith_avg_map, pd.DataFrame):
+        return lith_avg_map
+    if not lith_avg_map:
+        return pd.DataFrame()
+    return pd.DataFrame.from_dict(lith_avg_map, orient="index")
+
+
+def _missing_mask(column: pd.Series) -> pd.Series:
+    missing = column.isna()
+    if column.dtype == object:
+        missing |= column.astype(str).str.strip().eq("")
+    return missing
+
+
+@traced("normalize")
+def fill_missing_by_lithology(df: pd.DataFrame, lith_avg_map: Dict | pd.DataFrame) -> pd.DataFrame:
     if "name" not in df.columns:
         return df
 
     df = df.copy()
-    for idx, row in df.iterrows():
-        name = row.get("name")
-        if name not in lith_avg_map:
+    table = lithology_average_table(lith_avg_map)
+    if table.empty:
+        return df
+
+    known = df["name"].isin(table.index)
+    for key in FILL_FIELDS:
+        if key not in df.columns or key not in table.columns:
             continue
-        averages = lith_avg_map[name]
-        for key in ["thickness", "elastic_modulus", "density", "tensile_strength", "shear_strength"]:
-            if key in df.columns:
-                if pd.isna(row.get(key)) or str(row.get(key)).strip() == "":
-                    df.at[idx, key] = averages.get(key, row.get(key))
+        fill = df["name"].map(table[key])
+        # Lithologies without an average for this field keep the original cell.
+        target = _missing_mask(df[key]) & known & fill.notna()
+        if target.any():
+            df[key] = df[key].mask(target, fill)
     return df
+
+
+@traced("normalize")
+def fill_missing_by_lithology_batch(frames: List[pd.DataFrame], lith_avg_map: Dict | pd.DataFrame) -> List[pd.DataFrame]:
+    """
+    Fill a whole borehole corpus in one pass.
+
+    Missing masks and lithology lookups run once over the concatenated
+    frames; results are split back in input order and equal calling
+    fill_missing_by_lithology on each frame.
+    """
+    table = lithology_average_table(lith_avg_map)
+    named = [i for i, df in enumerate(frames) if "name" in df.columns]
+    named_set = set(named)
+    results = [df.copy() if i in named_set else df for i, df in enumerate(frames)]
+    if table.empty or not named:
+        return results
+
+    fields = [key for key in FILL_FIELDS if key in table.columns]
+    parts = [frames[i].loc[:, ["name"] + [k for k in fields if k in frames[i].columns]] for i in named]
+    corpus = pd.concat(parts, ignore_index=True)
+    offsets = np.cumsum([0] + [len(part) for part in parts])
+    known = corpus["name"].isin(table.index).to_numpy()
+
+    for key in fields:
+        if key not in corpus.columns:
+            continue
+        fill = corpus["name"].map(table[key])
+        target = _missing_mask(corpus[key]).to_numpy() & known & fill.notna().to_numpy()
+        if not target.any():
+            continue
+        fill = fill.to_numpy()
+        for pos, i in enumerate(named):
+            start, stop = offsets[pos], offsets[pos + 1]
+            if key in frames[i].columns and target[start:stop].any():
+                column = results[i][key]
+                results[i][key] = column.mask(target[start:stop], fill[start:stop])
+    return results
@@ -9,14 +9,13 @@ This module provides functions to:
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
 import numpy as np
-import pandas as pd
 
-from app.services.csv_loader import read_csv_robust
-from app.services.borehole_parser import normalize_borehole_df, add_depth_columns
+from app.services.seam_index import MECHANICAL_FIELDS, NUMERIC_FIELDS, SeamIndex, get_seam_index
 
 
 # Lithology color mapping for visualization
@@ -34,14 +33,6 @@ LITHOLOGY_COLORS = {
 }
 
 
-def _float_or_none(value: object) -> Optional[float]:
-    """Safely convert values from CSV rows to float."""
-    parsed = pd.to_numeric(value, errors="coerce")
-    if pd.isna(parsed):
-        return None
-    return float(parsed)
-
-
 def is_coal_seam(name: str) -> bool:
     """Check if a layer name indicates a coal seam."""
     if not name or not isinstance(name, str):
@@ -75,70 +66,198 @@ def get_all_coal_seams(files: List[Path], coords: Optional[Dict[str, Dict[str, f
             "unique_seams": N
         }
     """
-    seam_data: Dict[str, List[Dict]] = {}
+    return get_seam_index(files).seam_summary()
+
+
+def _layer_records(index: SeamIndex, rows: np.ndarray, name: Optional[str] = None, color: Optional[str] = None) -> List[Dict]:
+    """Column-chart layers for corpus rows (mechanical properties may be missing)."""
+    values = {key: index.values(key, rows) for key in NUMERIC_FIELDS}
+    layers = []
+    for i, label in enumerate(index.columns["label"][rows].tolist()):
+        layer_name = label if name is None else name
+        layer = {
+            "name": layer_name,
+            "thickness": values["thickness"][i] if values["thickness"][i] is not None else 0.0,
+            "z_top": values["z_top"][i] if values["z_top"][i] is not None else 0.0,
+            "z_bottom": values["z_bottom"][i] if values["z_bottom"][i] is not None else 0.0,
+            "color": color or LITHOLOGY_COLORS.get(layer_name, "#CCCCCC"),
+        }
+        for key in MECHANICAL_FIELDS:
+            layer[key] = values[key][i]
+        layers.append(layer)
+    return layers
+
+
+def _seam_records(index: SeamIndex, seam_name: str) -> List[Tuple[int, Dict, Optional[List[Dict]]]]:
+    """(borehole, point without coordinates, overburden layers or None) per borehole."""
+    seam = index.seam_rows(seam_name)
+    thickness = index.values("thickness", seam.row)
+    z_top = index.values("z_top", seam.row)
+    z_bottom = index.values("z_bottom", seam.row)
+    records = []
+    for i, borehole in enumerate(seam.borehole.tolist()):
+        point = {
+            "borehole": index.boreholes[borehole],
+            "thickness": thickness[i],
+            "burial_depth": z_top[i],
+            "z_top": z_top[i],
+            "z_bottom": z_bottom[i]
+        }
+        layers = None
+        if z_top[i] is not None:
+            # Layers above the seam, nearest first, then the seam itself
+            layers = _layer_records(index, index.overburden_rows(seam, i))
+            layers += _layer_records(
+                index, seam.row[i : i + 1], name=seam_name, color=LITHOLOGY_COLORS.get("煤", "#2C2C2C")
+            )
+        records.append((borehole, point, layers))
+    return records
+
+
+def _value_stats(values: List[float]) -> Dict:
+    return {
+        "min": float(np.min(values)),
+        "max": float(np.max(values)),
+        "mean": float(np.mean(values)),
+        "std": float(np.std(values)) if len(values) > 1 else 0.0
+    }
 
-    for p in files:
-        borehole_name = p.stem
-        try:
-            df = read_csv_robust(p)
-            df = normalize_borehole_df(df)
-            df = add_depth_columns(df)
 
-            if "name" not in df.columns:
-                continue
+@dataclass
+class SeamDataset:
+    """
+    Everything the seam endpoints derive for one seam.
 
-            # Find coal seam layers
-            coal_rows = df[df["name"].apply(is_coal_seam)]
+    `points` are the per-borehole seam samples (thickness, burial depth),
+    `boreholes` the overburden columns above the seam. The accessors below
+    return the same payloads as the legacy per-purpose parsers.
+    """
 
-            for _, row in coal_rows.iterrows():
-                seam_name = str(row["name"]).strip()
-                thickness = pd.to_numeric(row.get("thickness"), errors="coerce")
+    seam_name: str
+    points: List[Dict] = field(default_factory=list)
+    missing_coords: List[str] = field(default_factory=list)
+    boreholes: List[Dict] = field(default_factory=list)
+
+    @property
+    def point_count(self) -> int:
+        return len(self.points)
+
+    def point_stats(self) -> Dict:
+        thickness_values = [p["thickness"] for p in self.points if p.get("thickness") is not None]
+        depth_values = [p["burial_depth"] for p in self.points if p.get("burial_depth") is not None]
+        stats = {}
+        if thickness_values:
+            stats["thickness"] = _value_stats(thickness_values)
+        if depth_values:
+            stats["burial_depth"] = _value_stats(depth_values)
+        return stats
+
+    def property_points(self, property: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(n, 2) coordinates and (n,) values of the points that have `property`."""
+        rows = [
+            (p["x"], p["y"], p[property])
+            for p in self.points
+            if p.get("x") is not None and p.get("y") is not None and p.get(property) is not None
+        ]
+        arr = np.asarray(rows, dtype=float).reshape(-1, 3)
+        return arr[:, :2], arr[:, 2]
+
+    def seam_data(self) -> Dict:
+        """Payload of get_coal_seam_data."""
+        return {
+            "seam_name": self.seam_name,
+            "points": list(self.points),
+            "missing_coords": list(self.missing_coords),
+            "point_count": self.point_count,
+            "stats": self.point_stats()
+        }
 
-                if seam_name not in seam_data:
-                    seam_data[seam_name] = []
+    def overburden(self) -> Dict:
+        """Payload of get_overburden_lithology."""
+        return {
+            "seam_name": self.seam_name,
+            "boreholes": list(self.boreholes),
+            "borehole_count": len(self.boreholes)
+        }
 
-                seam_info = {
-                    "borehole": borehole_name,
-                    "thickness": float(thickness) if pd.notna(thickness) else None,
-                    "z_top": float(row.get("z_top", 0)) if pd.notna(row.get("z_top")) else None,
-                    "z_bottom": float(row.get("z_bottom", 0)) if pd.notna(row.get("z_bottom")) else None,
-                }
+    def lithology_summary(self) -> List[Dict]:
+        lithology_totals: Dict[str, Dict] = {}
+        for bh in self.boreholes:
+            for layer in bh.get("layers", []):
+                totals = lithology_totals.setdefault(layer["name"], {"total_thickness": 0, "count": 0})
+                totals["total_thickness"] += layer.get("thickness", 0)
+                totals["count"] += 1
+
+        total_thickness = sum(v["total_thickness"] for v in lithology_totals.values())
+        summary = []
+        for name, data in lithology_totals.items():
+            if name == self.seam_name:
+                continue  # Skip the seam itself
+            summary.append({
+                "name": name,
+                "avg_thickness": data["total_thickness"] / data["count"] if data["count"] > 0 else 0,
+                "percentage": (data["total_thickness"] / total_thickness * 100) if total_thickness > 0 else 0,
+                "color": LITHOLOGY_COLORS.get(name, "#CCCCCC")
+            })
+        summary.sort(key=lambda x: x["avg_thickness"], reverse=True)
+        return summary
+
+    def stats(self) -> Dict:
+        """Payload of get_seam_stats."""
+        stats = self.point_stats()
+        return {
+            "seam_name": self.seam_name,
+            "borehole_count": self.point_count,
+            "thickness": stats.get("thickness", {}),
+            "burial_depth": stats.get("burial_depth", {}),
+            "lithology_summary": self.lithology_summary()
+        }
 
-                # Add coordinates if available
-                if coords and borehole_name in coords:
-                    seam_info["x"] = coords[borehole_name]["x"]
-                    seam_info["y"] = coords[borehole_name]["y"]
 
-                seam_data[seam_name].append(seam_info)
+def build_seam_dataset(
+    files: List[Path],
+    coords: Dict[str, Dict[str, float]],
+    seam_name: str
+) -> SeamDataset:
+    """
+    Collect the seam samples and the overburden column for `seam_name`.
 
-        except Exception as e:
-            print(f"Error processing {p.name}: {e}")
+    Rows come from the shared seam index, so files are only parsed when
+    they changed; the per-seam records are cached on the index and only
+    the coordinates are joined per call.
+    """
+    index = get_seam_index(files)
+    records = index.memo(("seam_records", seam_name), lambda: _seam_records(index, seam_name))
+    dataset = SeamDataset(seam_name=seam_name)
+    dataset.missing_coords = [name for name in index.boreholes if name not in coords]
+
+    for borehole, point, layers in records:
+        name = index.boreholes[borehole]
+        if name not in coords:
             continue
-
-    # Process seam data into output format
-    seams = []
-    for seam_name, data_list in seam_data.items():
-        thickness_values = [d["thickness"] for d in data_list if d.get("thickness") is not None]
-
-        seams.append({
-            "name": seam_name,
-            "borehole_count": len(data_list),
-            "thickness_values": thickness_values,
-            "avg_thickness": float(np.mean(thickness_values)) if thickness_values else None,
-            "thickness_range": {
-                "min": float(np.min(thickness_values)) if thickness_values else None,
-                "max": float(np.max(thickness_values)) if thickness_values else None
-            }
+        x = coords[name]["x"]
+        y = coords[name]["y"]
+        dataset.points.append({
+            "borehole": name,
+            "x": x,
+            "y": y,
+            "thickness": point["thickness"],
+            "burial_depth": point["burial_depth"],
+            "z_top": point["z_top"],
+            "z_bottom": point["z_bottom"]
+        })
+        if layers is None:
+            continue
+        dataset.boreholes.append({
+            "name": name,
+            "x": x,
+            "y": y,
+            "layers": layers,
+            "seam_top_depth": point["z_top"],
+            "total_overburden_thickness": point["z_top"]
         })
 
-    # Sort by name
-    seams.sort(key=lambda x: x["name"])
-
-    return {
-        "seams": seams,
-        "total_boreholes": len(files),
-        "unique_seams": len(seams)
-    }
+    return dataset
 
 
 def get_coal_seam_data(
@@ -175,78 +294,7 @@ def get_coal_seam_data(
             "stats": {...}
         }
     """
-    points = []
-    missing = []
-
-    for p in files:
-        borehole_name = p.stem
-        if borehole_name not in coords:
-            missing.append(borehole_name)
-            continue
-
-        try:
-            df = read_csv_robust(p)
-            df = normalize_borehole_df(df)
-            df = add_depth_columns(df)
-
-            if "name" not in df.columns:
-                continue
-
-            # Find the specific seam layer
-            seam_rows = df[df["name"].str.strip() == seam_name.strip()]
-
-            if len(seam_rows) == 0:
-                continue
-
-            # Take the first match (there should typically be only one)
-            row = seam_rows.iloc[0]
-
-            thickness = pd.to_numeric(row.get("thickness"), errors="coerce")
-            z_top = pd.to_numeric(row.get("z_top"), errors="coerce")
-
-            point_data = {
-                "borehole": borehole_name,
-                "x": coords[borehole_name]["x"],
-                "y": coords[borehole_name]["y"],
-                "thickness": float(thickness) if pd.notna(thickness) else None,
-                "burial_depth": float(z_top) if pd.notna(z_top) else None,
-                "z_top": float(z_top) if pd.notna(z_top) else None,
-                "z_bottom": float(row.get("z_bottom")) if pd.notna(row.get("z_bottom")) else None
-            }
-
-            points.append(point_data)
-
-        except Exception as e:
-            print(f"Error processing {p.name} for seam {seam_name}: {e}")
-            continue
-
-    # Calculate statistics
-    thickness_values = [p["thickness"] for p in points if p.get("thickness") is not None]
-    depth_values = [p["burial_depth"] for p in points if p.get("burial_depth") is not None]
-
-    stats = {}
-    if thickness_values:
-        stats["thickness"] = {
-            "min": float(np.min(thickness_values)),
-            "max": float(np.max(thickness_values)),
-            "mean": float(np.mean(thickness_values)),
-            "std": float(np.std(thickness_values)) if len(thickness_values) > 1 else 0.0
-        }
-    if depth_values:
-        stats["burial_depth"] = {
-            "min": float(np.min(depth_values)),
-            "max": float(np.max(depth_values)),
-            "mean": float(np.mean(depth_values)),
-            "std": float(np.std(depth_values)) if len(depth_values) > 1 else 0.0
-        }
-
-    return {
-        "seam_name": seam_name,
-        "points": points,
-        "missing_coords": missing,
-        "point_count": len(points),
-        "stats": stats
-    }
+    return build_seam_dataset(files, coords, seam_name).seam_data()
 
 
 def get_overburden_lithology(
@@ -283,102 +331,7 @@ def get_overburden_lithology(
             ]
         }
     """
-    boreholes = []
-
-    for p in files:
-        borehole_name = p.stem
-        if borehole_name not in coords:
-            continue
-
-        try:
-            df = read_csv_robust(p)
-            df = normalize_borehole_df(df)
-            df = add_depth_columns(df)
-
-            if "name" not in df.columns:
-                continue
-
-            # Find the seam layer
-            seam_rows = df[df["name"].str.strip() == seam_name.strip()]
-
-            if len(seam_rows) == 0:
-                continue
-
-            seam_row = seam_rows.iloc[0]
-            seam_z_top = pd.to_numeric(seam_row.get("z_top"), errors="coerce")
-
-            if pd.isna(seam_z_top):
-                continue
-
-            # Get all layers above the seam
-            overburden_rows = df[df["z_top"] < seam_z_top].copy()
-            overburden_rows = overburden_rows.sort_values("z_top", ascending=False)
-
-            layers = []
-            for _, row in overburden_rows.iterrows():
-                layer_name = str(row.get("name", "")).strip()
-                thickness = _float_or_none(row.get("thickness"))
-                z_top = _float_or_none(row.get("z_top"))
-                z_bottom = _float_or_none(row.get("z_bottom"))
-                tensile_strength = _float_or_none(row.get("tensile_strength"))
-                elastic_modulus = _float_or_none(row.get("elastic_modulus"))
-                compressive_strength = _float_or_none(row.get("compressive_strength"))
-                friction_angle = _float_or_none(row.get("friction_angle"))
-                density = _float_or_none(row.get("density"))
-                cohesion = _float_or_none(row.get("cohesion"))
-
-                # Get color for this lithology
-                color = LITHOLOGY_COLORS.get(layer_name, "#CCCCCC")
-
-                layers.append({
-                    "name": layer_name,
-                    "thickness": thickness if thickness is not None else 0.0,
-                    "z_top": z_top if z_top is not None else 0.0,
-                    "z_bottom": z_bottom if z_bottom is not None else 0.0,
-                    "color": color,
-                    "tensile_strength": tensile_strength,
-                    "elastic_modulus": elastic_modulus,
-                    "compressive_strength": compressive_strength,
-                    "friction_angle": friction_angle,
-                    "density": density,
-                    "cohesion": cohesion,
-                })
-
-            # Add the seam itself as a layer
-            seam_thickness = _float_or_none(seam_row.get("thickness"))
-            seam_z_bottom = _float_or_none(seam_row.get("z_bottom"))
-            layers.append({
-                "name": seam_name,
-                "thickness": seam_thickness if seam_thickness is not None else 0.0,
-                "z_top": float(seam_z_top) if pd.notna(seam_z_top) else 0.0,
-                "z_bottom": seam_z_bottom if seam_z_bottom is not None else 0.0,
-                "color": LITHOLOGY_COLORS.get("煤", "#2C2C2C"),
-                "tensile_strength": _float_or_none(seam_row.get("tensile_strength")),
-                "elastic_modulus": _float_or_none(seam_row.get("elastic_modulus")),
-                "compressive_strength": _float_or_none(seam_row.get("compressive_strength")),
-                "friction_angle": _float_or_none(seam_row.get("friction_angle")),
-                "density": _float_or_none(seam_row.get("density")),
-                "cohesion": _float_or_none(seam_row.get("cohesion")),
-            })
-
-            boreholes.append({
-                "name": borehole_name,
-                "x": coords[borehole_name]["x"],
-                "y": coords[borehole_name]["y"],
-                "layers": layers,
-                "seam_top_depth": float(seam_z_top) if pd.notna(seam_z_top) else None,
-                "total_overburden_thickness": float(seam_z_top) if pd.notna(seam_z_top) else None
-            })
-
-        except Exception as e:
-            print(f"Error processing overburden for {p.name}: {e}")
-            continue
-
-    return {
-        "seam_name": seam_name,
-        "boreholes": boreholes,
-        "borehole_count": len(boreholes)
-    }
+    return build_seam_dataset(files, coords, seam_name).overburden()
 
 
 def get_seam_stats(
@@ -404,44 +357,4 @@ def get_seam_stats(
             "lithology_summary": [...]
         }
     """
-    seam_data = get_coal_seam_data(files, coords, seam_name)
-    overburden_data = get_overburden_lithology(files, coords, seam_name)
-
-    # Build lithology summary from overburden data
-    lithology_totals: Dict[str, Dict] = {}
-
-    for bh in overburden_data.get("boreholes", []):
-        for layer in bh.get("layers", []):
-            layer_name = layer["name"]
-            thickness = layer.get("thickness", 0)
-
-            if layer_name not in lithology_totals:
-                lithology_totals[layer_name] = {"total_thickness": 0, "count": 0}
-
-            lithology_totals[layer_name]["total_thickness"] += thickness
-            lithology_totals[layer_name]["count"] += 1
-
-    # Calculate percentages
-    total_thickness = sum(v["total_thickness"] for v in lithology_totals.values())
-    lithology_summary = []
-
-    for name, data in lithology_totals.items():
-        if name == seam_name:
-            continue  # Skip the seam itself
-        lithology_summary.append({
-            "name": name,
-            "avg_thickness": data["total_thickness"] / data["count"] if data["count"] > 0 else 0,
-            "percentage": (data["total_thickness"] / total_thickness * 100) if total_thickness > 0 else 0,
-            "color": LITHOLOGY_COLORS.get(name, "#CCCCCC")
-        })
-
-    # Sort by thickness
-    lithology_summary.sort(key=lambda x: x["avg_thickness"], reverse=True)
-
-    return {
-        "seam_name": seam_name,
-        "borehole_count": seam_data.get("point_count", 0),
-        "thickness": seam_data.get("stats", {}).get("thickness", {}),
-        "burial_depth": seam_data.get("stats", {}).get("burial_depth", {}),
-        "lithology_summary": lithology_summary
-    }
+    return build_seam_dataset(files, coords, seam_name).stats()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import functools
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from fastapi import HTTPException
+
+# Shared executor for CPU-bound work started from `async def` routes, so a
+# heavy request does not block the event loop. Admission is bounded twice:
+# COMPUTE_MAX_QUEUE caps all in-flight + waiting jobs, and each endpoint may
+# cap its own concurrency (COMPUTE_LIMIT_<ENDPOINT> overrides the default).
+# Rejected calls surface as HTTP 503 with Retry-After.
+
+T = TypeVar("T")
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+_counts_lock = threading.Lock()
+_inflight = 0
+_endpoint_inflight: Dict[str, int] = {}
+
+
+class ComputeSaturated(HTTPException):
+    def __init__(self, detail: str, retry_after: int) -> None:
+        super().__init__(status_code=503, detail=detail, headers={"Retry-After": str(retry_after)})
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    try:
+        return max(1, int(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+def get_compute_workers() -> int:
+    return _env_int("COMPUTE_MAX_WORKERS", max(1, min(os.cpu_count() or 1, 4)))
+
+
+def get_compute_queue_limit() -> int:
+    return _env_int("COMPUTE_MAX_QUEUE", 32)
+
+
+def get_retry_after() -> int:
+    return _env_int("COMPUTE_RETRY_AFTER_S", 2)
+
+
+def get_endpoint_limit(endpoint: str, default: Optional[int]) -> Optional[int]:
+    key = "COMPUTE_LIMIT_" + "".join(ch if ch.isalnum() else "_" for ch in endpoint).upper()
+    raw = os.getenv(key, "").strip()
+    if raw:
+        try:
+            return max(1, int(raw))
+        except ValueError:
+            pass
+    return default
+
+
+def get_compute_executor() -> Executor:
+    """Thread pool by default; COMPUTE_EXECUTOR=process for picklable, GIL-bound work."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = get_compute_workers()
+            if os.getenv("COMPUTE_EXECUTOR", "thread").strip().lower() == "process":
+                _executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compute")
+        return _executor
+
+
+def shutdown_compute_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def compute_stats() -> Dict[str, Any]:
+    with _counts_lock:
+        return {
+            "inflight": _inflight,
+            "queue_limit": get_compute_queue_limit(),
+            "endpoints": dict(_endpoint_inflight),
+        }
+
+
+def _acquire(endpoint: Optional[str], limit: Optional[int]) -> None:
+    global _inflight
+    retry_after = get_retry_after()
+    with _counts_lock:
+        if _inflight >= get_compute_queue_limit():
+            raise ComputeSaturated("compute queue is full, retry later", retry_after)
+        if endpoint:
+            cap = get_endpoint_limit(endpoint, limit)
+            if cap is not None and _endpoint_inflight.get(endpoint, 0) >= cap:
+                raise ComputeSaturated(f"too many concurrent {endpoint} requests, retry later", retry_after)
+            _endpoint_inflight[endpoint] = _endpoint_inflight.get(endpoint, 0) + 1
+        _inflight += 1
+
+
+def _release(endpoint: Optional[str]) -> None:
+    global _inflight
+    with _counts_lock:
+        _inflight -= 1
+        if endpoint:
+            remaining = _endpoint_inflight.get(endpoint, 1) - 1
+            if remaining > 0:
+                _endpoint_inflight[endpoint] = remaining
+            else:
+                _endpoint_inflight.pop(endpoint, None)
+
+
+async def run_compute(
+    fn: Callable[..., T],
+    *args: Any,
+    endpoint: Optional[str] = None,
+    limit: Optional[int] = None,
+    **kwargs: Any,
+) -> T:
+    """
+    Run fn(*args, **kwargs) on the compute executor and await its result.
+
+    Raises ComputeSaturated (HTTP 503) instead of queueing when the global
+    queue or the endpoint's concurrency cap is exhausted.
+    """
+    _acquire(endpoint, limit)
+    call = functools.partial(fn, *args, **kwargs)
+    try:
+        executor = get_compute_executor()
+        if isinstance(executor, ThreadPoolExecutor):
+            # Carry request context (tracing spans) into the worker thread.
+            call = functools.partial(contextvars.copy_context().run, call)
+        future = executor.submit(call)
+    except BaseException:
+        _release(endpoint)
+        raise
+    # Release when the work actually finishes, even if the awaiting request
+    # is cancelled first (a running task cannot be interrupted).
+    future.add_done_callback(lambda _: _release(endpoint))
+    return await asyncio.wrap_future(future)
@@ -17,6 +17,8 @@ from scipy.ndimage import gaussian_filter
 import io
 import base64
 
+from app.services.tracing import traced
+
 
 def calculate_optimal_levels(grid: np.ndarray, method: str = "equal", num_levels: int = 10) -> List[float]:
     """
@@ -60,6 +62,7 @@ def calculate_optimal_levels(grid: np.ndarray, method: str = "equal", num_levels
         return calculate_optimal_levels(grid, "equal", num_levels)
 
 
+@traced("render")
 def generate_contours(
     grid: np.ndarray,
     bounds: Dict,
@@ -306,6 +309,7 @@ def simplify_path(path: List[List[float]], tolerance: float = 1.0) -> List[List[
     return simplified
 
 
+@traced("render")
 def generate_contours_simplified(
     grid: np.ndarray,
     bounds: Dict,
@@ -350,6 +354,7 @@ def generate_contours_simplified(
     return result
 
 
+@traced("render")
 def create_filled_contours(
     grid: np.ndarray,
     bounds: Dict,
@@ -407,6 +412,7 @@ def create_filled_contours(
     return {"regions": regions}
 
 
+@traced("render")
 def generate_matplotlib_contour_image(
     grid: np.ndarray,
     bounds: Dict,
@@ -580,6 +586,7 @@ def generate_matplotlib_contour_image(
     }
 
 
+@traced("render")
 def generate_dual_contour_images(
     thickness_grid: np.ndarray,
     depth_grid: np.ndarray,
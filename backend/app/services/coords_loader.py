@@ -5,7 +5,10 @@ from typing import Dict
 
 import pandas as pd
 
+from app.services.tracing import traced
 
+
+@traced("parse")
 def load_borehole_coords(path: Path) -> Dict[str, Dict[str, float]]:
     df = pd.read_csv(path, encoding="utf-8", engine="python")
     name_col = "钻孔名"
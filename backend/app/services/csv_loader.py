@@ -4,9 +4,13 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import csv
+import io
+import threading
 
 import pandas as pd
 
+from app.services.tracing import traced
+
 try:
     import chardet
 except Exception:  # pragma: no cover
@@ -24,6 +28,25 @@ COMMON_ENCODINGS = [
 COMMON_DELIMITERS = [",", ";", "\t", "|"]
 
 
+# Encoding/delimiter are sniffed from a bounded prefix; the full bytes are
+# decoded once and parsed from memory with the C engine.
+SNIFF_SAMPLE_BYTES = 100_000
+
+# path -> (size, mtime_ns, encoding, delimiter) of the last successful read
+_read_attempts: Dict[str, Tuple[int, int, str, str]] = {}
+_read_attempts_lock = threading.Lock()
+
+
+def _bounded_sample(raw: bytes) -> bytes:
+    sample = raw[:SNIFF_SAMPLE_BYTES]
+    if len(raw) > SNIFF_SAMPLE_BYTES:
+        # Avoid cutting a multi-byte character in half.
+        cut = sample.rfind(b"\n")
+        if cut > 0:
+            sample = sample[: cut + 1]
+    return sample
+
+
 def _detect_encoding(raw: bytes) -> Optional[str]:
     if chardet is not None:
         result = chardet.detect(raw)
@@ -45,48 +68,92 @@ def _detect_delimiter(sample_text: str) -> Optional[str]:
         return None
 
 
-def analyze_csv_file(path: Path) -> Dict:
-    raw = path.read_bytes()[:100_000]
-    encoding = _detect_encoding(raw) or "unknown"
+def _analyze_sample(name: str, sample: bytes) -> Dict:
+    encoding = _detect_encoding(sample) or "unknown"
     try:
-        sample_text = raw.decode(encoding if encoding != "unknown" else "utf-8", errors="ignore")
+        sample_text = sample.decode(encoding if encoding != "unknown" else "utf-8", errors="ignore")
     except Exception:
-        sample_text = raw.decode("utf-8", errors="ignore")
+        sample_text = sample.decode("utf-8", errors="ignore")
 
     delimiter = _detect_delimiter(sample_text) or ","
     header = sample_text.splitlines()[0:1]
 
     return {
-        "file": path.name,
+        "file": name,
         "encoding": encoding,
         "delimiter": delimiter,
         "header_preview": header[0] if header else "",
     }
 
 
+def analyze_csv_file(path: Path) -> Dict:
+    with path.open("rb") as handle:
+        sample = _bounded_sample(handle.read(SNIFF_SAMPLE_BYTES + 1))
+    return _analyze_sample(path.name, sample)
+
+
+def analyze_csv_bytes(name: str, raw: bytes) -> Dict:
+    return _analyze_sample(name, _bounded_sample(raw))
+
+
+def _decode(raw: bytes, encoding: str) -> Optional[str]:
+    try:
+        text = raw.decode(encoding)
+    except (UnicodeDecodeError, LookupError):
+        return None
+    return text[1:] if text.startswith("\ufeff") else text
+
+
+def _parse_text(text: str, sep: str) -> Tuple[Optional[pd.DataFrame], str]:
+    # The python engine is only a fallback for inputs the C parser rejects.
+    for engine in ("c", "python"):
+        options = {"float_precision": "round_trip"} if engine == "c" else {}
+        try:
+            df = pd.read_csv(io.StringIO(text), sep=sep, engine=engine, **options)
+        except Exception:
+            continue
+        return (df, engine) if df.shape[1] >= 2 else (None, engine)
+    return None, ""
+
+
+@traced("parse")
 def read_csv_robust(path: Path) -> pd.DataFrame:
-    raw = path.read_bytes()
-    encoding = _detect_encoding(raw)
-    sample_text = raw[:100_000].decode(encoding or "utf-8", errors="ignore")
-    delimiter = _detect_delimiter(sample_text) or ","
+    df, _ = read_csv_with_info(path)
+    return df
+
+
+def read_csv_with_info(path: Path, raw: Optional[bytes] = None) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """Like read_csv_robust, also returning the encoding/delimiter/engine that succeeded."""
+    stat = path.stat()
+    raw = path.read_bytes() if raw is None else raw
+    key = str(path.resolve())
+
+    with _read_attempts_lock:
+        remembered = _read_attempts.get(key)
+    if remembered and remembered[:2] == (stat.st_size, stat.st_mtime_ns):
+        _, _, enc, sep = remembered
+        text = _decode(raw, enc)
+        if text is not None:
+            df, engine = _parse_text(text, sep)
+            if df is not None:
+                return df, {"encoding": enc, "delimiter": sep, "engine": engine}
+
+    sample = _bounded_sample(raw)
+    encoding = _detect_encoding(sample)
+    delimiter = _detect_delimiter(sample.decode(encoding or "utf-8", errors="ignore")) or ","
 
-    tried = []
     encodings = [encoding] if encoding else []
     encodings.extend([e for e in COMMON_ENCODINGS if e not in encodings])
 
     for enc in encodings:
+        text = _decode(raw, enc)
+        if text is None:
+            continue
         for sep in [delimiter] + [d for d in COMMON_DELIMITERS if d != delimiter]:
-            try:
-                df = pd.read_csv(
-                    path,
-                    encoding=enc,
-                    sep=sep,
-                    engine="python",
-                )
-                if df.shape[1] >= 2:
-                    return df
-            except Exception as exc:
-                tried.append(f"{enc}|{sep}: {exc}")
-                continue
+            df, engine = _parse_text(text, sep)
+            if df is not None:
+                with _read_attempts_lock:
+                    _read_attempts[key] = (stat.st_size, stat.st_mtime_ns, enc, sep)
+                return df, {"encoding": enc, "delimiter": sep, "engine": engine}
 
     raise ValueError(f"failed to read csv: {path.name}")
@@ -1,29 +1,187 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
 from pathlib import Path
-from typing import Dict
+import stat
+import tempfile
+import threading
+from typing import Dict, List, Optional, Sequence
 
-import pandas as pd
+from app.services.csv_loader import _bounded_sample, _detect_delimiter, analyze_csv_bytes, read_csv_with_info
 
-from app.services.csv_loader import analyze_csv_file, read_csv_robust
+# Normalization target: UTF-8 without BOM, comma-delimited. Files that are
+# already clean are left untouched so their mtimes, and every mtime-based
+# cache keyed on them, stay valid. `_encoding_manifest.json` in the data dir
+# remembers (size, mtime_ns, sha256) and the analysis of each normalized file;
+# a file whose stat or content hash still matches is skipped without being
+# parsed and reports the remembered analysis as both `before` and `after`.
 
+MANIFEST_NAME = "_encoding_manifest.json"
 
-def fix_csv_encoding(path: Path) -> Dict:
-    info_before = analyze_csv_file(path)
+_manifest_lock = threading.Lock()
+
+
+def get_encoding_fix_workers() -> int:
+    raw = os.getenv("ENCODING_FIX_MAX_WORKERS", "").strip()
+    try:
+        return max(1, int(raw)) if raw else max(1, min(os.cpu_count() or 1, 8))
+    except ValueError:
+        return max(1, min(os.cpu_count() or 1, 8))
+
+
+def _clean_info(name: str, raw: bytes) -> Optional[Dict]:
+    """Analysis dict when `raw` is already clean UTF-8 CSV, else None."""
+    # Empty files are left to the parser, which fails them.
+    if not raw.strip() or raw.startswith(b"\xef\xbb\xbf"):
+        return None
+    sample = _bounded_sample(raw)
+    try:
+        text = sample.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if (_detect_delimiter(text) or ",") != ",":
+        return None
+    # The sample decides; the rest is only validated (no decoding cost beyond memory speed).
+    if len(sample) < len(raw):
+        try:
+            raw.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+    header = text.splitlines()[0:1]
+    return {"file": name, "encoding": "utf-8", "delimiter": ",", "header_preview": header[0] if header else ""}
+
+
+def _atomic_write(path: Path, content: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(content)
+        try:
+            # mkstemp creates 0600; keep the replaced file's permissions.
+            os.chmod(tmp, stat.S_IMODE(path.stat().st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _manifest_entry(path: Path, sha256: str, info: Dict) -> Dict:
+    file_stat = path.stat()
+    return {"size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns, "sha256": sha256, "info": info}
+
+
+def load_manifest(data_dir: Path) -> Dict[str, Dict]:
+    try:
+        data = json.loads((data_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("files", {}) if isinstance(data, dict) else {}
+
+
+def _save_manifest(data_dir: Path, entries: Dict[str, Dict]) -> None:
+    content = json.dumps({"version": 1, "files": entries}, ensure_ascii=False, indent=2, sort_keys=True)
+    _atomic_write(data_dir / MANIFEST_NAME, content.encode("utf-8"))
+
+
+def _normalize(path: Path, known: Optional[Dict]) -> Dict:
+    result: Dict = {"file": path.name, "status": "clean", "changed": False, "error": None}
+    # Entries written before the analysis was recorded are re-checked once.
+    cached = known.get("info") if known else None
+    if cached is not None:
+        file_stat = path.stat()
+        if (file_stat.st_size, file_stat.st_mtime_ns) == (known.get("size"), known.get("mtime_ns")):
+            result.update(before=cached, after=cached, manifest=dict(known))
+            return result
+
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached is not None and known.get("sha256") == digest:
+        # Touched but not modified since it was normalized.
+        result.update(before=cached, after=cached, manifest=_manifest_entry(path, digest, cached))
+        return result
+    info = _clean_info(path.name, raw)
+    if info is not None:
+        result.update(before=info, after=info, manifest=_manifest_entry(path, digest, info))
+        return result
+
+    info_before = analyze_csv_bytes(path.name, raw)
     try:
-        df = read_csv_robust(path)
-        df.to_csv(path, index=False, encoding="utf-8")
-        status = "ok"
-        error = None
+        df, _ = read_csv_with_info(path, raw=raw)
+        content = df.to_csv(index=False).encode("utf-8")
     except Exception as exc:
-        status = "failed"
-        error = str(exc)
-
-    info_after = analyze_csv_file(path)
-    return {
-        "file": path.name,
-        "status": status,
-        "error": error,
-        "before": info_before,
-        "after": info_after,
-    }
\ No newline at end of file
+        result.update(status="failed", error=str(exc), before=info_before, after=info_before, manifest=None)
+        return result
+
+    if content != raw:
+        _atomic_write(path, content)
+        result["changed"] = True
+    digest = hashlib.sha256(content).hexdigest()
+    info_after = analyze_csv_bytes(path.name, content)
+    result.update(
+        status="ok",
+        before=info_before,
+        after=info_after,
+        manifest=_manifest_entry(path, digest, info_after),
+    )
+    return result
+
+
+def normalize_csv_encodings(files: Sequence[Path], max_workers: Optional[int] = None) -> List[Dict]:
+    """
+    Normalize CSV files to UTF-8 in parallel, rewriting only files that change.
+
+    Results are in input order. Each has `status` ("clean": already
+    normalized, skipped; "ok": converted; "failed", e.g. an empty file),
+    `changed` (the file was rewritten) and the `before`/`after` analyses.
+    Manifests are kept per parent directory.
+    """
+    files = list(files)
+    if not files:
+        return []
+    with _manifest_lock:
+        manifests = {parent: load_manifest(parent) for parent in {p.parent for p in files}}
+
+    workers = max(1, min(max_workers or get_encoding_fix_workers(), len(files)))
+
+    def run(path: Path) -> Dict:
+        try:
+            return _normalize(path, manifests[path.parent].get(path.name))
+        except OSError as exc:
+            return {
+                "file": path.name, "status": "failed", "changed": False, "error": str(exc),
+                "before": None, "after": None, "manifest": None,
+            }
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="encoding-fix") as pool:
+        results = list(pool.map(run, files))
+
+    with _manifest_lock:
+        for parent in manifests:
+            # Re-read so concurrent runs over other files are not lost.
+            updated = load_manifest(parent)
+            dirty = False
+            for path, result in zip(files, results):
+                if path.parent != parent:
+                    continue
+                entry = result.pop("manifest", None)
+                if entry is None:
+                    if updated.pop(path.name, None) is not None:
+                        dirty = True
+                elif updated.get(path.name) != entry:
+                    updated[path.name] = entry
+                    dirty = True
+            if dirty:
+                _save_manifest(parent, updated)
+    return results
+
+
+def fix_csv_encoding(path: Path) -> Dict:
+    return normalize_csv_encodings([path], max_workers=1)[0]
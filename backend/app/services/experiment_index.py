@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Dict, List, Optional
+
+# Append-only registry of finished experiments. run_experiment appends one
+# JSON line per result to <experiments_dir>/index.jsonl; readers keep an
+# in-memory table per index file and only parse lines appended since their
+# last read, so leaderboard queries never touch the per-experiment folders.
+INDEX_FILENAME = "index.jsonl"
+
+_tables: Dict[Path, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def index_path(experiments_dir: Path) -> Path:
+    return experiments_dir / INDEX_FILENAME
+
+
+def index_entry(result: Dict[str, Any]) -> Dict[str, Any]:
+    spec = result.get("spec") or {}
+    return {
+        "exp_id": result.get("exp_id", ""),
+        "experiment_name": spec.get("experiment_name", ""),
+        "model_type": spec.get("model_type", ""),
+        "dataset_id": result.get("dataset_id", ""),
+        "dataset_version": result.get("dataset_version", ""),
+        "split_id": result.get("split_id", ""),
+        "seed": spec.get("seed"),
+        "created_at": result.get("created_at", ""),
+        "metrics": result.get("metrics") or {},
+        "ci95": result.get("ci95") or {},
+    }
+
+
+def _encode(entry: Dict[str, Any]) -> bytes:
+    return (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def append_experiment(experiments_dir: Path, result: Dict[str, Any]) -> None:
+    path = index_path(experiments_dir)
+    if not path.exists():
+        # First write on a tree with older experiments: index them all.
+        rebuild_experiment_index(experiments_dir)
+        return
+    # One write() on an O_APPEND descriptor, so concurrent suite workers
+    # cannot interleave partial lines.
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, _encode(index_entry(result)))
+    finally:
+        os.close(fd)
+
+
+def rebuild_experiment_index(experiments_dir: Path) -> int:
+    """Rewrite the index from every <exp_id>/result.json; returns the entry count."""
+    entries: List[Dict[str, Any]] = []
+    for result_path in sorted(experiments_dir.glob("*/result.json")):
+        try:
+            payload = json.loads(result_path.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        payload.setdefault("exp_id", result_path.parent.name)
+        entries.append(index_entry(payload))
+    entries.sort(key=lambda item: (str(item.get("created_at") or ""), str(item["exp_id"])))
+
+    path = index_path(experiments_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(b"".join(_encode(entry) for entry in entries))
+    os.replace(tmp, path)
+    with _lock:
+        _tables.pop(path, None)
+    return len(entries)
+
+
+def _refresh(path: Path) -> Dict[str, Dict[str, Any]]:
+    stat = path.stat()
+    table = _tables.get(path)
+    if table is None or stat.st_ino != table["inode"] or stat.st_size < table["offset"]:
+        # Rebuilt or truncated: start over.
+        table = {"inode": stat.st_ino, "offset": 0, "rows": {}}
+        _tables[path] = table
+    if stat.st_size > table["offset"]:
+        with path.open("rb") as fh:
+            fh.seek(table["offset"])
+            chunk = fh.read(stat.st_size - table["offset"])
+        # Leave a trailing partial line for the next read.
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("exp_id"):
+                table["rows"][entry["exp_id"]] = entry
+        table["offset"] += end
+    return table["rows"]
+
+
+def query_experiments(
+    experiments_dir: Path,
+    dataset_id: Optional[str] = None,
+    model_type: Optional[str] = None,
+    split_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    path = index_path(experiments_dir)
+    if not path.exists():
+        rebuild_experiment_index(experiments_dir)
+    with _lock:
+        rows = list(_refresh(path).values())
+    if dataset_id:
+        rows = [row for row in rows if row.get("dataset_id") == dataset_id]
+    if model_type:
+        rows = [row for row in rows if row.get("model_type") == model_type]
+    if split_id:
+        rows = [row for row in rows if row.get("split_id") == split_id]
+    return rows
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from app.services.research_manager import run_experiment, get_research_paths
+from app.services.research_manager import (
+    DEFAULT_BOOTSTRAP_ROUNDS,
+    ExperimentContext,
+    get_research_paths,
+    load_experiment_context,
+    run_experiment,
+)
 
 
 DEFAULT_EXPERIMENT_TEMPLATES: Dict[str, List[Dict[str, Any]]] = {
@@ -88,29 +96,67 @@ def _safe_metric(metrics: Dict[str, Any], name: str, default: float = 0.0) -> fl
         return default
 
 
+def get_suite_workers(block_count: int) -> int:
+    raw = os.getenv("EXPERIMENT_MAX_WORKERS", "").strip()
+    try:
+        workers = int(raw) if raw else (os.cpu_count() or 1)
+    except ValueError:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, block_count))
+
+
+# Suite worker processes receive the shared context once via the pool
+# initializer instead of pickling the dataset with every block.
+_worker_context: Optional[ExperimentContext] = None
+
+
+def _init_suite_worker(context: ExperimentContext) -> None:
+    global _worker_context
+    _worker_context = context
+
+
+def _run_suite_block(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return run_experiment(payload, context=_worker_context)
+
+
 def run_experiment_suite(
     template_name: str,
     dataset_id: str,
     dataset_version: str,
     split_id: str,
     seed: int = 42,
+    n_bootstrap: int = DEFAULT_BOOTSTRAP_ROUNDS,
+    max_workers: Optional[int] = None,
 ) -> Dict[str, Any]:
     template = DEFAULT_EXPERIMENT_TEMPLATES.get(template_name)
     if not template:
         raise ValueError(f"unknown template: {template_name}")
 
-    results: List[Dict[str, Any]] = []
-    for idx, block in enumerate(template):
-        payload = {
+    context = load_experiment_context(dataset_id, dataset_version=dataset_version, split_id=split_id)
+    payloads = [
+        {
             "dataset_id": dataset_id,
             "dataset_version": dataset_version,
-            "split_id": split_id,
+            "split_id": context.split_id,
             "experiment_name": block["experiment_name"],
             "model_type": block["model_type"],
             "metrics": block.get("metrics", []),
             "seed": int(seed + idx),
+            "n_bootstrap": int(n_bootstrap),
         }
-        results.append(run_experiment(payload))
+        for idx, block in enumerate(template)
+    ]
+
+    workers = max(1, min(int(max_workers), len(payloads))) if max_workers else get_suite_workers(len(payloads))
+    if workers <= 1:
+        results = [run_experiment(payload, context=context) for payload in payloads]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_suite_worker,
+            initargs=(context,),
+        ) as pool:
+            results = list(pool.map(_run_suite_block, payloads))
 
     suite_id = f"suite_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
     run_rows = []
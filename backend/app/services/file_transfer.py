@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from pathlib import Path
+import re
+from typing import Iterator, Optional, Tuple
+from urllib.parse import quote
+import zlib
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+# File downloads for large artifacts: single-range requests are answered with
+# 206 partial content, otherwise compressible files are gzip-encoded while
+# streaming when the client accepts it. Ranges always address the identity
+# (uncompressed) bytes so resumed downloads stay consistent; the gzip variant
+# has its own ETag so caches and If-Range never mix the two encodings.
+CHUNK_SIZE = 1 << 20
+GZIP_MIN_BYTES = 1024
+_PRECOMPRESSED_SUFFIXES = {".gz", ".zip", ".png", ".jpg", ".jpeg", ".npz", ".7z", ".xz", ".bz2"}
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) for a single `bytes=` range, or None to send the whole file."""
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        # Multi-range and other units are not supported; serve the full body.
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        # Syntactically invalid (RFC 9110 14.1.1): ignore the header.
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def _accepts_gzip(request: Request) -> bool:
+    """True when Accept-Encoding gives gzip (or, failing that, `*`) a non-zero q-value."""
+    weights = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        token, *params = [item.strip() for item in part.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if token:
+            weights[token.lower()] = q
+    return weights.get("gzip", weights.get("*", 0.0)) > 0
+
+
+def _iter_file(path: Path, start: int, length: int) -> Iterator[bytes]:
+    with path.open("rb") as fh:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _iter_gzip(path: Path) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in _iter_file(path, 0, path.stat().st_size):
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def file_download_response(
+    request: Request,
+    path: Path,
+    filename: Optional[str] = None,
+    media_type: str = "application/octet-stream",
+) -> Response:
+    stat = path.stat()
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename or path.name)}",
+    }
+
+    if_range = request.headers.get("if-range")
+    range_header = request.headers.get("range") if not if_range or if_range == etag else None
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is not None:
+        start, end = byte_range
+        length = end - start + 1
+        headers.update({"Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(length)})
+        return StreamingResponse(_iter_file(path, start, length), status_code=206, media_type=media_type, headers=headers)
+
+    if size >= GZIP_MIN_BYTES and path.suffix.lower() not in _PRECOMPRESSED_SUFFIXES and _accepts_gzip(request):
+        headers.update({"Content-Encoding": "gzip", "ETag": f'"{stat.st_mtime_ns:x}-{size:x}-gz"'})
+        return StreamingResponse(_iter_gzip(path), media_type=media_type, headers=headers)
+
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(_iter_file(path, 0, size), media_type=media_type, headers=headers)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+import hashlib
+import itertools
 import json
+import os
 from pathlib import Path
+import queue
+import shutil
 import threading
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 import numpy as np
@@ -19,7 +24,9 @@ from app.schemas.geomodel import (
     GeomodelJobStatus,
     GeomodelManifest,
 )
+from app.services.borehole_cache import read_borehole_csv
 from app.services.csv_loader import read_csv_robust
+from app.services.vtk_writer import write_legacy_polydata, write_vtp_polydata
 
 
 def _utc_now_iso() -> str:
@@ -65,6 +72,41 @@ def _sanitize_layer_name(name: str) -> str:
     return clean[:40]
 
 
+def get_geomodel_workers() -> int:
+    raw = os.getenv("GEOMODEL_MAX_WORKERS", "").strip()
+    try:
+        return max(1, int(raw)) if raw else 2
+    except ValueError:
+        return 2
+
+
+def get_geomodel_runs_budget_bytes() -> int:
+    raw = os.getenv("GEOMODEL_RUNS_MAX_MB", "").strip()
+    try:
+        megabytes = float(raw) if raw else 1024.0
+    except ValueError:
+        megabytes = 1024.0
+    return int(max(megabytes, 0.0) * 1024 * 1024)
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for item in path.rglob("*"):
+        try:
+            if item.is_file():
+                total += item.stat().st_size
+        except OSError:
+            continue
+    return total
+
+
+class _JobCancelled(Exception):
+    pass
+
+
+_ACTIVE_STATUSES = {GeomodelJobStatus.pending, GeomodelJobStatus.running}
+
+
 @dataclass
 class _JobRecord:
     job_id: str
@@ -77,34 +119,77 @@ class _JobRecord:
     message: str = ""
     error: Optional[str] = None
     result_manifest: Optional[GeomodelManifest] = None
+    cache_key: str = ""
+    cancel_event: threading.Event = field(default_factory=threading.Event)
 
 
 class GeomodelService:
-    def __init__(self) -> None:
+    """
+    Geomodel jobs run on a fixed set of worker threads fed by a priority queue.
+
+    Identical requests (same parameters, same input signature) are served by the
+    job already queued, running or completed for them; completed run folders
+    are pruned oldest-first once `_geomodel_runs` exceeds its disk budget.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, runs_budget_bytes: Optional[int] = None) -> None:
         self._jobs: Dict[str, _JobRecord] = {}
+        self._by_key: Dict[str, str] = {}
         self._lock = threading.Lock()
+        self._queue: "queue.PriorityQueue[Tuple[int, int, str]]" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._workers: List[threading.Thread] = []
+        self._max_workers = max_workers
+        self._runs_budget_bytes = runs_budget_bytes
 
     def create_job(self, request: GeomodelJobCreate) -> GeomodelJobResponse:
-        job_id = uuid4().hex[:12]
-        output_dir = get_data_dir() / "_geomodel_runs" / job_id
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        record = _JobRecord(
-            job_id=job_id,
-            created_at=_utc_now_iso(),
-            request=request,
-            output_dir=output_dir,
-            status=GeomodelJobStatus.pending,
-            message="job queued",
-        )
+        data_dir = get_data_dir()
+        cache_key = self._cache_key(request, self._input_signature(self._borehole_files(data_dir)))
         with self._lock:
+            existing = self._jobs.get(self._by_key.get(cache_key, ""))
+            if existing is not None and (
+                existing.status in _ACTIVE_STATUSES
+                or (existing.status == GeomodelJobStatus.completed and existing.output_dir.exists())
+            ):
+                return self._as_job_response(existing)
+
+            job_id = uuid4().hex[:12]
+            output_dir = data_dir / "_geomodel_runs" / job_id
+            output_dir.mkdir(parents=True, exist_ok=True)
+            record = _JobRecord(
+                job_id=job_id,
+                created_at=_utc_now_iso(),
+                request=request,
+                output_dir=output_dir,
+                status=GeomodelJobStatus.pending,
+                message="job queued",
+                cache_key=cache_key,
+            )
             self._jobs[job_id] = record
-
-        worker = threading.Thread(target=self._run_job, args=(job_id,), daemon=True)
-        worker.start()
-
+            self._by_key[cache_key] = job_id
+            self._ensure_workers()
+        self._queue.put((-int(request.priority), next(self._seq), job_id))
         return self._as_job_response(record)
 
+    def cancel_job(self, job_id: str) -> GeomodelJobResponse:
+        """Cancel a pending job, or stop a running one at its next stage boundary."""
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if not record:
+                raise KeyError(job_id)
+            if record.status not in _ACTIVE_STATUSES:
+                raise ValueError(f"job already {record.status.value}")
+            record.cancel_event.set()
+            if record.status == GeomodelJobStatus.pending:
+                record.status = GeomodelJobStatus.cancelled
+                record.message = "job cancelled"
+                record.completed_at = _utc_now_iso()
+            else:
+                record.message = "cancellation requested"
+            if self._by_key.get(record.cache_key) == job_id:
+                self._by_key.pop(record.cache_key, None)
+            return self._as_job_response(record)
+
     def get_job(self, job_id: str) -> GeomodelJobResponse:
         record = self._get_job_record(job_id)
         return self._as_job_response(record)
@@ -154,6 +239,75 @@ class GeomodelService:
             if manifest is not None:
                 job.result_manifest = manifest
 
+    def _ensure_workers(self) -> None:
+        # Caller holds self._lock.
+        target = self._max_workers or get_geomodel_workers()
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < target:
+            worker = threading.Thread(target=self._worker_loop, name=f"geomodel-{len(self._workers)}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _worker_loop(self) -> None:
+        while True:
+            _, _, job_id = self._queue.get()
+            try:
+                with self._lock:
+                    record = self._jobs.get(job_id)
+                    runnable = record is not None and record.status == GeomodelJobStatus.pending
+                if runnable:
+                    self._run_job(job_id)
+                    self._collect_garbage()
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _cache_key(request: GeomodelJobCreate, signature: Dict[str, Any]) -> str:
+        params = request.model_dump(mode="json", exclude={"priority"})
+        params["output_formats"] = sorted({str(x).lower() for x in params.get("output_formats") or []})
+        raw = json.dumps({"request": params, "input": signature}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _collect_garbage(self) -> None:
+        """Delete the oldest finished run folders until `_geomodel_runs` fits the budget."""
+        budget = self._runs_budget_bytes if self._runs_budget_bytes is not None else get_geomodel_runs_budget_bytes()
+        runs_dir = get_data_dir() / "_geomodel_runs"
+        if not runs_dir.exists():
+            return
+        with self._lock:
+            active = {
+                record.output_dir.resolve()
+                for record in self._jobs.values()
+                if record.status in _ACTIVE_STATUSES
+            }
+        runs = []
+        for path in runs_dir.iterdir():
+            if not path.is_dir() or path.resolve() in active:
+                continue
+            try:
+                runs.append((path.stat().st_mtime, path, _dir_size(path)))
+            except OSError:
+                continue
+        root = runs_dir.resolve()
+        total = sum(size for _, _, size in runs)
+        total += sum(_dir_size(path) for path in active if path.parent == root and path.exists())
+        for _, path, size in sorted(runs, key=lambda item: item[0]):
+            if total <= budget:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            with self._lock:
+                record = self._jobs.get(path.name)
+                if record is None or record.output_dir.resolve() != path.resolve():
+                    continue
+                del self._jobs[path.name]
+                if self._by_key.get(record.cache_key) == record.job_id:
+                    self._by_key.pop(record.cache_key, None)
+
+    def _check_cancelled(self, job: _JobRecord) -> None:
+        if job.cancel_event.is_set():
+            raise _JobCancelled()
+
     def _run_job(self, job_id: str) -> None:
         self._set_job_status(
             job_id=job_id,
@@ -172,6 +326,13 @@ class GeomodelService:
                 manifest=manifest,
                 mark_completed=True,
             )
+        except _JobCancelled:
+            self._set_job_status(
+                job_id=job_id,
+                status=GeomodelJobStatus.cancelled,
+                message="job cancelled",
+                mark_completed=True,
+            )
         except Exception as exc:  # pragma: no cover - defensive path
             self._set_job_status(
                 job_id=job_id,
@@ -181,9 +342,9 @@ class GeomodelService:
                 mark_completed=True,
             )
 
-    def _build_job_artifacts(self, job: _JobRecord) -> GeomodelManifest:
-        data_dir = get_data_dir()
-        borehole_files = sorted(
+    @staticmethod
+    def _borehole_files(data_dir: Path) -> List[Path]:
+        return sorted(
             p
             for p in data_dir.glob("*.csv")
             if p.is_file()
@@ -192,6 +353,10 @@ class GeomodelService:
             and not p.stem.endswith("_events")
             and p.stem != "validation_labels"
         )
+
+    def _build_job_artifacts(self, job: _JobRecord) -> GeomodelManifest:
+        data_dir = get_data_dir()
+        borehole_files = self._borehole_files(data_dir)
         if not borehole_files:
             raise ValueError("no borehole csv files found in DATA_DIR")
 
@@ -199,6 +364,7 @@ class GeomodelService:
         parsed = self._parse_boreholes(borehole_files, coords)
         if not parsed["boreholes"]:
             raise ValueError("no valid borehole rows with layer/thickness columns")
+        self._check_cancelled(job)
 
         summary = self._build_summary(job, parsed)
         quality = self._build_quality_report(parsed)
@@ -209,10 +375,22 @@ class GeomodelService:
         quality_path.write_text(json.dumps(quality, ensure_ascii=False, indent=2), encoding="utf-8")
 
         requested = {x.lower() for x in job.request.output_formats}
+        self._check_cancelled(job)
+        params = job.request.params or {}
         if "vtk" in requested:
-            self._write_model_vtk(job.output_dir / "model.vtk", parsed["boreholes"])
+            self._write_model_vtk(
+                job.output_dir / "model.vtk",
+                parsed["boreholes"],
+                binary=str(params.get("vtk_format", "binary")).lower() != "ascii",
+            )
+        self._check_cancelled(job)
         if "vtp" in requested:
-            self._write_layer_vtps(job.output_dir, parsed)
+            self._write_layer_vtps(
+                job.output_dir,
+                parsed,
+                encoding="base64" if str(params.get("vtp_encoding", "raw")).lower() == "base64" else "raw",
+                compress=str(params.get("vtp_compress", True)).lower() not in {"0", "false", "no"},
+            )
 
         artifacts = self._collect_artifacts(job.job_id, job.output_dir)
         manifest = GeomodelManifest(
@@ -259,7 +437,7 @@ class GeomodelService:
         total_samples = 0
 
         for idx, file_path in enumerate(borehole_files):
-            df = read_csv_robust(file_path)
+            df = read_borehole_csv(file_path)
             name_col = _guess_column(df, ["名称", "name", "岩性", "lithology"])
             thickness_col = _guess_column(df, ["厚度/m", "厚度", "thickness"])
             if not name_col or not thickness_col:
@@ -393,66 +571,50 @@ class GeomodelService:
             "generated_at": _utc_now_iso(),
         }
 
-    def _write_model_vtk(self, file_path: Path, boreholes: List[Dict[str, Any]]) -> None:
-        points = [(float(bh["x"]), float(bh["y"]), 0.0) for bh in boreholes]
-        lines = [
-            "# vtk DataFile Version 3.0",
-            "Geomodel Point Cloud",
-            "ASCII",
-            "DATASET POLYDATA",
-            f"POINTS {len(points)} float",
-        ]
-        lines.extend(f"{x:.6f} {y:.6f} {z:.6f}" for x, y, z in points)
-        lines.append(f"VERTICES {len(points)} {len(points) * 2}")
-        lines.extend(f"1 {idx}" for idx in range(len(points)))
-        file_path.write_text("\n".join(lines), encoding="utf-8")
+    def _write_model_vtk(self, file_path: Path, boreholes: List[Dict[str, Any]], binary: bool = True) -> None:
+        points = np.zeros((len(boreholes), 3), dtype=np.float32)
+        points[:, 0] = [float(bh["x"]) for bh in boreholes]
+        points[:, 1] = [float(bh["y"]) for bh in boreholes]
+        write_legacy_polydata(
+            file_path,
+            points,
+            point_data={"total_thickness": np.asarray([bh["total_thickness"] for bh in boreholes], dtype=np.float32)},
+            binary=binary,
+        )
 
-    def _write_layer_vtps(self, output_dir: Path, parsed: Dict[str, Any]) -> None:
+    def _write_layer_vtps(
+        self,
+        output_dir: Path,
+        parsed: Dict[str, Any],
+        encoding: str = "raw",
+        compress: bool = True,
+    ) -> None:
         boreholes = parsed["boreholes"]
         layer_values = parsed["layer_values"]
-        if not layer_values:
+        if not layer_values or not boreholes:
             return
 
         top_layers = sorted(layer_values.keys(), key=lambda n: len(layer_values[n]), reverse=True)[:12]
-        for layer_name in top_layers:
-            points: List[tuple[float, float, float]] = []
-            thickness_values: List[float] = []
-            for bh in boreholes:
-                thickness = _to_float_or_none((bh.get("layers") or {}).get(layer_name))
-                if thickness is None or thickness <= 0:
-                    continue
-                points.append((float(bh["x"]), float(bh["y"]), 0.0))
-                thickness_values.append(float(thickness))
-
-            if not points:
+        xy = np.asarray([(float(bh["x"]), float(bh["y"])) for bh in boreholes], dtype=np.float32)
+        # boreholes x layers thickness table; missing layers are NaN.
+        thickness = pd.DataFrame([bh.get("layers") or {} for bh in boreholes]).reindex(columns=top_layers)
+        thickness = thickness.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+
+        for col, layer_name in enumerate(top_layers):
+            values = thickness[:, col]
+            mask = np.isfinite(values) & (values > 0)
+            if not mask.any():
                 continue
-
-            pts_text = " ".join(f"{x:.6f} {y:.6f} {z:.6f}" for x, y, z in points)
-            conn_text = " ".join(str(i) for i in range(len(points)))
-            off_text = " ".join(str(i + 1) for i in range(len(points)))
-            thick_text = " ".join(f"{v:.6f}" for v in thickness_values)
-
-            file_content = (
-                '<?xml version="1.0"?>\n'
-                '<VTKFile type="PolyData" version="0.1" byte_order="LittleEndian">\n'
-                "  <PolyData>\n"
-                f'    <Piece NumberOfPoints="{len(points)}" NumberOfVerts="{len(points)}" NumberOfLines="0" NumberOfStrips="0" NumberOfPolys="0">\n'
-                "      <PointData Scalars=\"thickness\">\n"
-                f'        <DataArray type="Float32" Name="thickness" format="ascii">{thick_text}</DataArray>\n'
-                "      </PointData>\n"
-                "      <Points>\n"
-                f'        <DataArray type="Float32" NumberOfComponents="3" format="ascii">{pts_text}</DataArray>\n'
-                "      </Points>\n"
-                "      <Verts>\n"
-                f'        <DataArray type="Int32" Name="connectivity" format="ascii">{conn_text}</DataArray>\n'
-                f'        <DataArray type="Int32" Name="offsets" format="ascii">{off_text}</DataArray>\n'
-                "      </Verts>\n"
-                "    </Piece>\n"
-                "  </PolyData>\n"
-                "</VTKFile>\n"
-            )
+            points = np.zeros((int(mask.sum()), 3), dtype=np.float32)
+            points[:, :2] = xy[mask]
             file_name = f"layer_{_sanitize_layer_name(layer_name)}.vtp"
-            (output_dir / file_name).write_text(file_content, encoding="utf-8")
+            write_vtp_polydata(
+                output_dir / file_name,
+                points,
+                point_data={"thickness": values[mask]},
+                encoding=encoding,
+                compress=compress,
+            )
 
     def _collect_artifacts(self, job_id: str, output_dir: Path) -> List[GeomodelArtifactItem]:
         items: List[GeomodelArtifactItem] = []
@@ -4,8 +4,15 @@ from typing import Dict, List
 import io
 import csv
 
+import numpy as np
 
-def grid_to_csv_bytes(grid: List[List[float]], bounds: Dict) -> bytes:
+from app.services.tracing import traced
+
+
+@traced("serialize")
+def grid_to_csv_bytes(grid: List[List[float]] | np.ndarray, bounds: Dict) -> bytes:
+    if isinstance(grid, np.ndarray):
+        grid = grid.tolist()
     rows = len(grid)
     cols = len(grid[0]) if rows else 0
     if rows == 0 or cols == 0:
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+import os
+import threading
+import time
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.services.mpi_calculator import PointData
+from app.services.mpi_new_algorithm import calc_all_indicators_new
+
+# Seam-wide advanced-indicator evaluation runs on a process pool that is kept
+# alive across requests. Workers reuse their indicator objects (cached per
+# process in mpi_new_algorithm), so only the first request pays start-up.
+# The pool is sized once by INDICATOR_MAX_WORKERS; requests share it and a
+# per-request max_workers only bounds that request's in-flight chunks.
+MIN_PARALLEL_POINTS = 8
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_indicator_workers() -> int:
+    raw = os.getenv("INDICATOR_MAX_WORKERS", "").strip()
+    if raw:
+        try:
+            return max(1, int(raw))
+        except ValueError:
+            pass
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+def get_indicator_time_budget() -> Optional[float]:
+    raw = os.getenv("INDICATOR_TIME_BUDGET_S", "").strip()
+    try:
+        budget = float(raw) if raw else 0.0
+    except ValueError:
+        budget = 0.0
+    return budget if budget > 0 else None
+
+
+def _get_pool() -> Tuple[ProcessPoolExecutor, int]:
+    """The shared pool and its size; sized once from INDICATOR_MAX_WORKERS."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None:
+            _pool_workers = get_indicator_workers()
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers)
+        return _pool, _pool_workers
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_indicator_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _evaluate(task: Tuple[PointData, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    point, weights, config = task
+    return calc_all_indicators_new(point=point, weights=weights, microseismic_events=[], config=config)
+
+
+def _evaluate_chunk(tasks: List[Tuple[PointData, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    return [_evaluate(task) for task in tasks]
+
+
+def evaluate_points(
+    points: Sequence[PointData],
+    *,
+    weights: Optional[Dict[str, Any]] = None,
+    config: Optional[Dict[str, Any]] = None,
+    max_workers: Optional[int] = None,
+    time_budget_s: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Evaluate calc_all_indicators_new for many boreholes, yielding results in input order.
+
+    Small batches (or a single worker) run in-process. `max_workers` only
+    limits how many chunks this call keeps in flight on the shared pool
+    (clamped to the pool size); the pool itself is never resized, so
+    concurrent calls do not disturb each other. Raises TimeoutError once
+    the time budget is spent; this call's pending work is cancelled.
+    """
+    limit = get_indicator_workers()
+    workers = max(1, min(int(max_workers), limit)) if max_workers else limit
+    budget = time_budget_s if time_budget_s and time_budget_s > 0 else get_indicator_time_budget()
+    deadline = time.monotonic() + budget if budget else None
+    tasks = [(point, weights, config) for point in points]
+
+    if workers <= 1 or len(tasks) < MIN_PARALLEL_POINTS:
+        for task in tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"indicator evaluation exceeded {budget:g}s budget")
+            yield _evaluate(task)
+        return
+
+    pool, pool_workers = _get_pool()
+    workers = min(workers, pool_workers)
+    chunksize = max(1, len(tasks) // (workers * 4))
+    chunks = iter([tasks[i : i + chunksize] for i in range(0, len(tasks), chunksize)])
+    pending: Deque[Future] = deque(pool.submit(_evaluate_chunk, chunk) for chunk in islice(chunks, workers))
+    try:
+        while pending:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done = pending.popleft().result(timeout=remaining)
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(pool.submit(_evaluate_chunk, chunk))
+            yield from done
+    except FutureTimeoutError:
+        raise TimeoutError(f"indicator evaluation exceeded {budget:g}s budget") from None
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
@@ -6,9 +6,10 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
-from app.services.csv_loader import read_csv_robust
-from app.services.borehole_parser import normalize_borehole_df, add_depth_columns, fill_missing_by_lithology
+from app.services.borehole_cache import read_borehole_csv
+from app.services.borehole_parser import normalize_borehole_df, add_depth_columns, fill_missing_by_lithology_batch
 from app.services.lithology_stats import compute_lithology_averages
+from app.services.tracing import traced
 
 try:
     from scipy.interpolate import griddata
@@ -36,32 +37,45 @@ def compute_points_values(files: List[Path], coords: Dict[str, Dict[str, float]]
     lith_avgs = compute_lithology_averages(files)
     lith_avg_map = {item["name"]: item for item in lith_avgs if "name" in item}
 
-    points = []
-    values = []
     missing = []
 
+    names = []
+    frames = []
     for p in files:
         name = p.stem
         if name not in coords:
             missing.append(name)
             continue
 
-        df = read_csv_robust(p)
+        df = read_borehole_csv(p)
         df = normalize_borehole_df(df)
-        df = add_depth_columns(df)
-        df = fill_missing_by_lithology(df, lith_avg_map)
+        frames.append(add_depth_columns(df))
+        names.append(name)
+
+    data = points_values_from_frames(names, fill_missing_by_lithology_batch(frames, lith_avg_map), coords, field)
+    data["missing_coords"] = missing
+    return data
+
+
+def points_values_from_frames(
+    names: List[str], frames: List[pd.DataFrame], coords: Dict[str, Dict[str, float]], field: str
+) -> Dict:
+    """Thickness-weighted `field` per borehole of already filled frames."""
+    points = []
+    values = []
+    for name, df in zip(names, frames):
         mean_val = _thickness_weighted_mean(df, field)
         if mean_val is None:
             continue
         points.append((coords[name]["x"], coords[name]["y"]))
         values.append(mean_val)
-
-    return {"points": points, "values": values, "missing_coords": missing}
+    return {"points": points, "values": values}
 
 
 def _idw_interpolate(x: np.ndarray, y: np.ndarray, v: np.ndarray, grid_x: np.ndarray, grid_y: np.ndarray) -> np.ndarray:
+    """IDW grid of `v`; a 2-D `v` (points x k) yields k grids stacked on the last axis."""
     gx, gy = np.meshgrid(grid_x, grid_y)
-    values = np.zeros_like(gx, dtype=float)
+    values = np.zeros(gx.shape + v.shape[1:], dtype=float)
     for i in range(gx.shape[0]):
         for j in range(gx.shape[1]):
             dx = x - gx[i, j]
@@ -69,7 +83,10 @@ def _idw_interpolate(x: np.ndarray, y: np.ndarray, v: np.ndarray, grid_x: np.nda
             dist = np.sqrt(dx * dx + dy * dy)
             dist = np.where(dist == 0, 1e-12, dist)
             w = 1 / (dist**2)
-            values[i, j] = np.sum(w * v) / np.sum(w)
+            if v.ndim == 1:
+                values[i, j] = np.sum(w * v) / np.sum(w)
+            else:
+                values[i, j] = (w @ v) / np.sum(w)
     return values
 
 
@@ -91,6 +108,7 @@ def _kriging_interpolate(x: np.ndarray, y: np.ndarray, v: np.ndarray, grid_x: np
     return grid
 
 
+@traced("interpolate")
 def interpolate_from_points(
     points: np.ndarray,
     values: np.ndarray,
@@ -98,9 +116,29 @@ def interpolate_from_points(
     grid_size: int,
     bounds: Dict[str, float] | None = None
 ) -> Dict:
+    result = interpolate_stack_from_points(points, np.asarray(values)[:, None], method, grid_size, bounds)
+    if "error" in result:
+        return result
+    return {"grid": result["grids"][0], "bounds": result["bounds"]}
+
+
+@traced("interpolate")
+def interpolate_stack_from_points(
+    points: np.ndarray,
+    values: np.ndarray,
+    method: str,
+    grid_size: int,
+    bounds: Dict[str, float] | None = None
+) -> Dict:
+    """
+    Interpolate several value columns (points x k) over the same points.
+
+    The operator is shared across columns: IDW weights are computed once per
+    cell and linear/nearest reuse one triangulation. Kriging fits a variogram
+    per column, so it still runs once per column.
+    """
     x = points[:, 0]
     y = points[:, 1]
-    v = values
 
     if bounds is None:
         padding = 0.05
@@ -121,25 +159,32 @@ def interpolate_from_points(
 
     grid_x = np.linspace(min_x, max_x, grid_size)
     grid_y = np.linspace(min_y, max_y, grid_size)
+    columns = [values[:, k] for k in range(values.shape[1])]
 
     method_key = method.strip().lower()
     if method_key == "idw":
-        grid = _idw_interpolate(x, y, v, grid_x, grid_y)
+        if len(columns) == 1:
+            grids = [_idw_interpolate(x, y, columns[0], grid_x, grid_y)]
+        else:
+            stacked = _idw_interpolate(x, y, values, grid_x, grid_y)
+            grids = [stacked[:, :, k] for k in range(len(columns))]
     elif method_key in {"kriging", "ordinary_kriging", "ok"}:
         if OrdinaryKriging is None:
             return {"error": "pykrige is required for kriging interpolation"}
-        grid = _kriging_interpolate(x, y, v, grid_x, grid_y)
+        grids = [_kriging_interpolate(x, y, v, grid_x, grid_y) for v in columns]
     elif method_key in {"linear", "nearest"}:
         if griddata is None:
             return {"error": "scipy is required for linear/nearest interpolation"}
         gx, gy = np.meshgrid(grid_x, grid_y)
-        grid = griddata(points=points, values=v, xi=(gx, gy), method=method_key)
-        grid = np.nan_to_num(grid, nan=float(np.nanmean(v)))
+        raw = griddata(points=points, values=values if len(columns) > 1 else columns[0], xi=(gx, gy), method=method_key)
+        if len(columns) == 1:
+            raw = raw[:, :, None]
+        grids = [np.nan_to_num(raw[:, :, k], nan=float(np.nanmean(v))) for k, v in enumerate(columns)]
     else:
         return {"error": "unknown method"}
 
     return {
-        "grid": grid,
+        "grids": grids,
         "bounds": {"min_x": min_x, "max_x": max_x, "min_y": min_y, "max_y": max_y},
     }
 
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from uuid import uuid4
+
+# Background job runner shared by long-running endpoints. Each job's state
+# (status, stage, progress, error) is persisted as JSON under
+# <state_dir>/_jobs so pollers in any request see it, and a content key maps
+# identical submissions onto one job.
+JOBS_DIRNAME = "_jobs"
+
+ProgressCallback = Callable[[float, str], None]
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid4().hex[:8]}.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+class JobQueue:
+    """Bounded worker pool with on-disk job state and content-key de-duplication."""
+
+    def __init__(self, state_dir: Callable[[], Path], max_workers: int = 2, max_pending: int = 64):
+        self._state_dir = state_dir
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(1, int(max_pending))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._futures: Dict[str, Future] = {}
+        self._paths: Dict[str, Path] = {}
+        self._lock = threading.Lock()
+
+    def _jobs_dir(self) -> Path:
+        return self._state_dir() / JOBS_DIRNAME
+
+    def _state_path(self, job_id: str) -> Path:
+        with self._lock:
+            path = self._paths.get(job_id)
+        return path or self._jobs_dir() / f"{job_id}.json"
+
+    def _update(self, job_id: str, **changes: Any) -> Dict[str, Any]:
+        path = self._state_path(job_id)
+        with self._lock:
+            state = _read_json(path) or {"job_id": job_id}
+            state.update(changes)
+            state["updated_at"] = _now_iso()
+            _write_json_atomic(path, state)
+        return state
+
+    def get_state(self, job_id: str) -> Optional[Dict[str, Any]]:
+        state = _read_json(self._state_path(job_id))
+        if state is None:
+            return None
+        if state.get("status") != "running":
+            return state
+        path = self._state_path(job_id)
+        with self._lock:
+            if job_id in self._futures:
+                return state
+            # _run writes the terminal state before dropping its future, so a
+            # job that just finished is re-read here rather than reported lost.
+            state = _read_json(path) or state
+        if state.get("status") == "running":
+            # The process that owned the job went away before it finished.
+            state.update(status="failed", error="job interrupted before completion", error_status=500)
+        return state
+
+    def submit(
+        self,
+        content_key: str,
+        fn: Callable[[str, ProgressCallback], Any],
+        job_id: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue fn(job_id, progress) unless an identical job is running or done.
+
+        Returns (state, deduplicated). Raises JobQueueFull when max_pending
+        jobs are already queued or running.
+        """
+        jobs_dir = self._jobs_dir()
+        ref_path = jobs_dir / "by_key" / f"{content_key}.json"
+        with self._lock:
+            ref = _read_json(ref_path)
+            if ref:
+                existing = _read_json(jobs_dir / f"{ref['job_id']}.json")
+                status = (existing or {}).get("status")
+                if status == "completed" or (status == "running" and ref["job_id"] in self._futures):
+                    return existing, True
+            if len(self._futures) >= self.max_pending:
+                raise JobQueueFull(f"job queue is full ({self.max_pending} pending)")
+
+            job_id = job_id or uuid4().hex
+            state = {
+                "job_id": job_id,
+                "content_key": content_key,
+                "status": "running",
+                "stage": "queued",
+                "progress": 0.0,
+                "submitted_at": _now_iso(),
+                "updated_at": _now_iso(),
+                **(meta or {}),
+            }
+            path = jobs_dir / f"{job_id}.json"
+            _write_json_atomic(path, state)
+            _write_json_atomic(ref_path, {"job_id": job_id})
+            self._paths[job_id] = path
+            self._futures[job_id] = self._executor.submit(self._run, job_id, fn)
+        return state, False
+
+    def forget(self, content_key: str) -> None:
+        """Drop the de-duplication entry so the next identical submit runs again."""
+        with self._lock:
+            try:
+                (self._jobs_dir() / "by_key" / f"{content_key}.json").unlink()
+            except FileNotFoundError:
+                pass
+
+    def _run(self, job_id: str, fn: Callable[[str, ProgressCallback], Any]) -> None:
+        def progress(value: float, stage: str) -> None:
+            self._update(job_id, progress=round(max(0.0, min(1.0, float(value))), 4), stage=stage)
+
+        self._update(job_id, stage="started", started_at=_now_iso())
+        try:
+            fn(job_id, progress)
+        except Exception as exc:
+            detail = getattr(exc, "detail", None) or str(exc) or exc.__class__.__name__
+            self._update(
+                job_id,
+                status="failed",
+                stage="failed",
+                error=str(detail),
+                error_status=int(getattr(exc, "status_code", 500)),
+                finished_at=_now_iso(),
+            )
+        else:
+            self._update(job_id, status="completed", stage="completed", progress=1.0, finished_at=_now_iso())
+        finally:
+            with self._lock:
+                self._futures.pop(job_id, None)
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None and timeout > 0:
+            try:
+                future.result(timeout=timeout)
+            except FutureTimeoutError:
+                pass
+        return self.get_state(job_id)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._futures)
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.perf_stats import summarize_latencies
+
+# Microbenchmarks for the numeric kernels behind the heavy endpoints. Each
+# case runs one kernel on deterministic synthetic input of a given size and
+# reports a scenario in the same shape as scripts/perf/run_backend_perf.py
+# ({"name", "summary", "error_buckets"}), so kernel reports can be checked
+# with perf_baseline.evaluate_reports and a thresholds file.
+
+_ROOT = Path(__file__).resolve().parents[3]
+
+Setup = Callable[[], Tuple[Callable[[], Any], Optional[Callable[[], None]]]]
+
+
+@dataclass
+class KernelCase:
+    kernel: str
+    size: Dict[str, Any]
+    items: int  # work units per call (grid cells, rows, points), for items_per_sec
+    setup: Setup = field(repr=False)
+
+    @property
+    def name(self) -> str:
+        label = "_".join(f"{key}{value}" for key, value in self.size.items())
+        return f"kernel_{self.kernel}_{label}"
+
+
+def _mpi_advanced() -> None:
+    if str(_ROOT) not in sys.path:
+        sys.path.insert(0, str(_ROOT))
+
+
+def _scatter(points: int, seed: int = 7) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0.0, 1000.0, points)
+    y = rng.uniform(0.0, 1000.0, points)
+    v = 5.0 + 2.0 * np.sin(x / 150.0) + np.cos(y / 200.0) + rng.normal(0.0, 0.1, points)
+    return x, y, v
+
+
+def _idw_case(points: int, grid: int) -> KernelCase:
+    def setup():
+        from app.services.interpolate import _idw_interpolate
+
+        x, y, v = _scatter(points)
+        axis = np.linspace(0.0, 1000.0, grid)
+        return (lambda: _idw_interpolate(x, y, v, axis, axis)), None
+
+    return KernelCase("idw_interpolate", {"p": points, "g": grid}, grid * grid, setup)
+
+
+def _kriging_case(points: int, grid: int) -> KernelCase:
+    def setup():
+        from app.services.interpolate import _kriging_interpolate
+
+        x, y, v = _scatter(points)
+        axis = np.linspace(0.0, 1000.0, grid)
+        return (lambda: _kriging_interpolate(x, y, v, axis, axis)), None
+
+    return KernelCase("kriging_interpolate", {"p": points, "g": grid}, grid * grid, setup)
+
+
+def _phase_field_case(grid: int, max_iter: int) -> KernelCase:
+    def setup():
+        _mpi_advanced()
+        from mpi_advanced.indicators.rsi_phase_field import PhaseFieldFractureModel
+
+        model = PhaseFieldFractureModel(length_scale=0.5)
+        # tol=0 runs exactly max_iter sweeps, so timings compare across versions.
+        return (lambda: model.solve_phase_field_2d_fd(nx=grid, ny=grid, load_ratio=1.2, max_iter=max_iter, tol=0.0)), None
+
+    return KernelCase("phase_field_2d_fd", {"g": grid, "it": max_iter}, grid * grid * max_iter, setup)
+
+
+def _energy_field_case(grid: Tuple[int, int, int], events: int) -> KernelCase:
+    def setup():
+        _mpi_advanced()
+        from mpi_advanced.core.data_models import MicroseismicEvent
+        from mpi_advanced.indicators.bri_microseismic import EnergyDensityField
+
+        rng = np.random.default_rng(11)
+        builder = EnergyDensityField(grid_shape=grid, grid_spacing=10.0)
+        extent = np.array(grid, dtype=float) * 10.0
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        batch = [
+            MicroseismicEvent(
+                event_id=f"ev{i}",
+                timestamp=start,
+                location=rng.uniform(0.0, 1.0, 3) * extent,
+                magnitude=float(rng.uniform(0.5, 2.5)),
+                energy=float(rng.uniform(1e3, 1e6)) if i % 2 else 0.0,
+            )
+            for i in range(events)
+        ]
+        return (lambda: builder.build_field(batch)), None
+
+    cells = int(np.prod(grid))
+    return KernelCase("energy_density_field", {"g": "x".join(map(str, grid)), "e": events}, cells * events, setup)
+
+
+def _stress_case(radii: int) -> KernelCase:
+    def setup():
+        _mpi_advanced()
+        from mpi_advanced.indicators.asi_indicator_ust import UnifiedStrengthTheory
+
+        ust = UnifiedStrengthTheory(cohesion=2e6, friction_angle=20, b=0.5)
+        R0, P0, Pi = 2.0, 12e6, 0.3e6
+        Rp = ust.get_plastic_zone_radius(R0, P0, Pi)
+        r = np.linspace(R0, 10 * R0, radii)
+        return (lambda: ust.get_stress_distribution(r, R0, Rp, P0, Pi)), None
+
+    return KernelCase("ust_stress_distribution", {"r": radii}, radii, setup)
+
+
+def _indicators_case(points: int) -> KernelCase:
+    def setup():
+        from app.services.mpi_calculator import PointData, RockLayer, calc_all_indicators
+
+        rng = np.random.default_rng(3)
+        batch = []
+        for i in range(points):
+            strata = [
+                RockLayer(
+                    thickness=float(rng.uniform(2.0, 12.0)),
+                    name=name,
+                    density=float(rng.uniform(2300.0, 2700.0)),
+                    cohesion=float(rng.uniform(1.5, 4.0)),
+                    friction_angle=float(rng.uniform(25.0, 38.0)),
+                    tensile_strength=float(rng.uniform(1.5, 6.0)),
+                    compressive_strength=float(rng.uniform(20.0, 90.0)),
+                    elastic_modulus=float(rng.uniform(5.0, 40.0)),
+                )
+                for name in ("细砂岩", "泥岩", "粉砂岩", "中砂岩")
+            ]
+            batch.append(PointData(
+                x=float(i), y=0.0, borehole=f"B{i}",
+                thickness=float(rng.uniform(1.0, 8.0)),
+                burial_depth=float(rng.uniform(200.0, 700.0)),
+                strata=strata,
+            ))
+        return (lambda: [calc_all_indicators(point) for point in batch]), None
+
+    return KernelCase("calc_all_indicators", {"p": points}, points, setup)
+
+
+def _read_csv_case(rows: int) -> KernelCase:
+    def setup():
+        from app.services.csv_loader import read_csv_robust
+
+        tmp = tempfile.TemporaryDirectory(prefix="kernel_bench_")
+        path = Path(tmp.name) / "borehole.csv"
+        rng = np.random.default_rng(5)
+        names = np.array(["细砂岩", "泥岩", "粉砂岩", "16-3煤"])
+        lines = ["序号,名称,厚度/m,弹性模量/Gpa,容重/kN*m-3,抗拉强度/MPa"]
+        for i in range(rows):
+            lines.append(
+                f"{i + 1},{names[i % len(names)]},{rng.uniform(0.5, 20):.2f},"
+                f"{rng.uniform(5, 40):.2f},{rng.uniform(22, 27):.2f},{rng.uniform(1, 6):.2f}"
+            )
+        path.write_bytes(("\n".join(lines) + "\n").encode("gbk"))
+        return (lambda: read_csv_robust(path)), tmp.cleanup
+
+    return KernelCase("read_csv_robust", {"rows": rows}, rows, setup)
+
+
+def _contour_case(grid: int, dpi: int) -> KernelCase:
+    def setup():
+        from app.services.contour_generator import generate_matplotlib_contour_image
+
+        axis = np.linspace(0.0, 1.0, grid)
+        gx, gy = np.meshgrid(axis, axis)
+        values = 5.0 + 2.0 * np.sin(gx * 6.0) * np.cos(gy * 4.0)
+        bounds = {"min_x": 0.0, "max_x": 1000.0, "min_y": 0.0, "max_y": 1000.0}
+
+        def run():
+            result = generate_matplotlib_contour_image(values, bounds, title="bench", num_levels=10, dpi=dpi)
+            if "error" in result:
+                raise RuntimeError(result["error"])
+            return result
+
+        return run, None
+
+    return KernelCase("matplotlib_contour_image", {"g": grid, "dpi": dpi}, grid * grid, setup)
+
+
+PRESETS: Dict[str, Callable[[], List[KernelCase]]] = {
+    "quick": lambda: [
+        _idw_case(50, 20),
+        _kriging_case(30, 20),
+        _phase_field_case(24, 20),
+        _energy_field_case((6, 6, 4), 3),
+        _stress_case(500),
+        _indicators_case(20),
+        _read_csv_case(500),
+        _contour_case(30, 60),
+    ],
+    "default": lambda: [
+        _idw_case(100, 50),
+        _idw_case(400, 100),
+        _kriging_case(100, 50),
+        _kriging_case(300, 80),
+        _phase_field_case(40, 100),
+        _phase_field_case(80, 100),
+        _energy_field_case((10, 10, 6), 10),
+        _energy_field_case((20, 20, 10), 20),
+        _stress_case(1_000),
+        _stress_case(10_000),
+        _indicators_case(100),
+        _indicators_case(1_000),
+        _read_csv_case(2_000),
+        _read_csv_case(20_000),
+        _contour_case(60, 100),
+        _contour_case(120, 150),
+    ],
+}
+
+KERNELS = sorted({case.kernel for case in PRESETS["quick"]()})
+
+
+def build_cases(preset: str = "default", kernels: Optional[Sequence[str]] = None) -> List[KernelCase]:
+    if preset not in PRESETS:
+        raise ValueError(f"unknown preset: {preset} (expected one of {sorted(PRESETS)})")
+    cases = PRESETS[preset]()
+    if kernels:
+        unknown = set(kernels) - set(KERNELS)
+        if unknown:
+            raise ValueError(f"unknown kernels: {sorted(unknown)}")
+        cases = [case for case in cases if case.kernel in kernels]
+    return cases
+
+
+def run_case(case: KernelCase, repeats: int = 5, warmup: int = 1) -> Dict[str, Any]:
+    """Time `repeats` calls after `warmup` untimed ones; errors are bucketed, not raised."""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    success = 0
+    repeats = max(1, int(repeats))
+    started = time.perf_counter()
+    cleanup = None
+    try:
+        fn, cleanup = case.setup()
+        for _ in range(max(0, int(warmup))):
+            fn()
+        started = time.perf_counter()
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            fn()
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            success += 1
+    except Exception as exc:
+        key = f"{type(exc).__name__}: {str(exc)[:160]}"
+        errors[key] = errors.get(key, 0) + max(1, repeats - success)
+    finally:
+        if cleanup is not None:
+            cleanup()
+
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    summary = summarize_latencies(latencies, repeats, success, elapsed_ms)
+    busy_ms = sum(latencies)
+    summary["items_per_sec"] = (case.items * success) / (busy_ms / 1000.0) if busy_ms > 0 else 0.0
+    return {
+        "name": case.name,
+        "kernel": case.kernel,
+        "size": dict(case.size),
+        "summary": summary,
+        "error_buckets": errors,
+    }
+
+
+def run_kernel_benchmarks(
+    preset: str = "default",
+    kernels: Optional[Sequence[str]] = None,
+    repeats: int = 5,
+    warmup: int = 1,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Run every case of a preset; the report is compatible with evaluate_reports."""
+    scenarios = []
+    for case in build_cases(preset, kernels):
+        result = run_case(case, repeats=repeats, warmup=warmup)
+        scenarios.append(result)
+        if on_result is not None:
+            on_result(result)
+    return {
+        "meta": {
+            "mode": "kernel",
+            "preset": preset,
+            "repeats": int(repeats),
+            "warmup": int(warmup),
+            "kernels": sorted({item["kernel"] for item in scenarios}),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "scenarios": scenarios,
+    }
@@ -5,7 +5,7 @@ from typing import Dict, List
 
 import pandas as pd
 
-from app.services.csv_loader import read_csv_robust
+from app.services.borehole_cache import read_borehole_csv
 from app.services.borehole_parser import normalize_borehole_df
 
 
@@ -21,12 +21,16 @@ def compute_lithology_averages(files: List[Path]) -> Dict:
     frames = []
     for p in files:
         try:
-            df = read_csv_robust(p)
+            df = read_borehole_csv(p)
             df = normalize_borehole_df(df)
             frames.append(df)
         except Exception:
             continue
+    return lithology_averages_from_frames(frames)
 
+
+def lithology_averages_from_frames(frames: List[pd.DataFrame]) -> Dict:
+    """Per-lithology means over already normalized borehole frames."""
     if not frames:
         return {}
 
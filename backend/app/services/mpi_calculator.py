@@ -14,6 +14,8 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional, Any
 import numpy as np
 
+from app.services.tracing import traced
+
 
 @dataclass
 class MPIConfig:
@@ -274,6 +276,7 @@ def calc_abutment_stress(point: PointData, config: Optional[MPIConfig] = None) -
     return _clamp(asi, 0, 100)
 
 
+@traced("score")
 def calc_mpi(
     point: PointData,
     config: Optional[MPIConfig] = None,
@@ -329,6 +332,7 @@ def calc_mpi(
     }
 
 
+@traced("score")
 def calc_all_indicators(
     point: PointData,
     config: Optional[MPIConfig] = None,
@@ -377,6 +381,7 @@ def calc_all_indicators(
     }
 
 
+@traced("score")
 def calc_mpi_batch(
     points_data: Dict[str, Dict[str, Any]],
     config: Optional[MPIConfig] = None,
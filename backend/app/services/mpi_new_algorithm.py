@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 import sys
 from typing import Any, Dict, List, Optional
@@ -332,6 +333,33 @@ def _to_indicator_diag(
     }
 
 
+# Indicator objects hold only configuration, so each process builds them once
+# per config and reuses them for every borehole it evaluates.
+@lru_cache(maxsize=8)
+def _rsi_indicator(length_scale: float):
+    return create_phase_field_analytical(length_scale=length_scale)
+
+
+@lru_cache(maxsize=1)
+def _bri_indicator():
+    return create_bri_microseismic_full()
+
+
+@lru_cache(maxsize=8)
+def _asi_indicator(b: float):
+    return ASIIndicatorUST(b=b)
+
+
+def combine_mpi(values: Dict[str, float], weights: Optional[Dict[str, Any]] = None) -> float:
+    norm_w = _normalize_weights(weights)
+    mpi_value = (
+        norm_w["rsi"] * values["rsi"]
+        + norm_w["bri"] * values["bri"]
+        + norm_w["asi"] * values["asi"]
+    )
+    return round(float(_clamp(mpi_value, 0.0, 100.0)), 4)
+
+
 def calc_all_indicators_new(
     point: PointData,
     *,
@@ -360,17 +388,17 @@ def calc_all_indicators_new(
     compute_errors: List[str] = []
 
     try:
-        rsi_result = create_phase_field_analytical(length_scale=cfg.phase_field_length_scale).compute(geology, monitoring)
+        rsi_result = _rsi_indicator(cfg.phase_field_length_scale).compute(geology, monitoring)
     except Exception as exc:
         compute_errors.append(f"rsi: {exc}")
 
     try:
-        bri_result = create_bri_microseismic_full().compute(geology, monitoring)
+        bri_result = _bri_indicator().compute(geology, monitoring)
     except Exception as exc:
         compute_errors.append(f"bri: {exc}")
 
     try:
-        asi_result = ASIIndicatorUST(b=cfg.ust_parameter_b).compute(geology, monitoring)
+        asi_result = _asi_indicator(cfg.ust_parameter_b).compute(geology, monitoring)
     except Exception as exc:
         compute_errors.append(f"asi: {exc}")
 
@@ -386,12 +414,7 @@ def calc_all_indicators_new(
         "asi": diagnostics["asi"]["value"],
     }
     norm_w = _normalize_weights(weights)
-    mpi_value = (
-        norm_w["rsi"] * values["rsi"]
-        + norm_w["bri"] * values["bri"]
-        + norm_w["asi"] * values["asi"]
-    )
-    values["mpi"] = round(float(_clamp(mpi_value, 0.0, 100.0)), 4)
+    values["mpi"] = combine_mpi(values, norm_w)
 
     problem_indicators = [name for name, item in diagnostics.items() if item.get("status") != "ok"]
     status = "ok"
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import math
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Open-loop load generation for scripts/perf/run_backend_perf.py. Arrivals
+# follow a Poisson process at a fixed target rate and are dispatched whether
+# or not earlier requests have finished, so server queueing shows up in the
+# latencies instead of silently lowering the offered load. Latency is taken
+# from the *scheduled* send time (coordinated-omission correction); the time
+# from the actual send is kept as `service_latency_ms`.
+
+RequestFn = Callable[[], Tuple[bool, int, str]]
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram: log-linear buckets with bounded relative error.
+
+    Values (ms) are bucketed with `significant_digits` of precision over
+    [lowest_ms, inf), so recording is O(1) and memory does not grow with
+    the number of samples. Percentiles report the bucket's upper edge.
+    """
+
+    def __init__(self, lowest_ms: float = 0.01, significant_digits: int = 2) -> None:
+        self.lowest_ms = float(lowest_ms)
+        self._log_base = math.log1p(10.0 ** -int(significant_digits))
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, value_ms: float) -> int:
+        if value_ms <= self.lowest_ms:
+            return 0
+        return int(math.log(value_ms / self.lowest_ms) / self._log_base) + 1
+
+    def _upper(self, index: int) -> float:
+        return self.lowest_ms * math.exp(index * self._log_base)
+
+    def record(self, value_ms: float) -> None:
+        value = max(float(value_ms), 0.0)
+        i = self._index(value)
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for i, n in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * max(0.0, min(100.0, float(pct))) / 100.0))
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen >= target:
+                return min(self._upper(i), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {key: 0.0 for key in ("min", "max", "avg", "p50", "p90", "p95", "p99", "p999")}
+        return {
+            "min": self.min,
+            "max": self.max,
+            "avg": self.total / self.count,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+        }
+
+
+@dataclass
+class MixEntry:
+    name: str
+    weight: float
+    request_fn: RequestFn
+
+
+def parse_mix(specs: Sequence[str], available: Sequence[str]) -> Dict[str, float]:
+    """`["name=weight", "name"]` -> {name: weight}; an empty list weights all equally."""
+    if not specs:
+        return {name: 1.0 for name in available}
+    weights: Dict[str, float] = {}
+    for spec in specs:
+        name, _, raw = str(spec).partition("=")
+        name = name.strip()
+        if name not in available:
+            raise ValueError(f"unknown scenario in mix: {name} (expected one of {sorted(available)})")
+        weight = float(raw) if raw.strip() else 1.0
+        if weight < 0:
+            raise ValueError(f"negative weight for {name}")
+        weights[name] = weight
+    if not any(weights.values()):
+        raise ValueError("mix weights must not all be zero")
+    return weights
+
+
+def poisson_arrivals(rps: float, duration_s: float, rng: random.Random) -> List[float]:
+    """Send offsets (s) of a Poisson process with rate `rps` over `duration_s`."""
+    if rps <= 0 or duration_s <= 0:
+        return []
+    offsets = []
+    t = rng.expovariate(rps)
+    while t < duration_s:
+        offsets.append(t)
+        t += rng.expovariate(rps)
+    return offsets
+
+
+class _ScenarioStats:
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()
+        self.service = LatencyHistogram()
+        self.sent = 0
+        self.success = 0
+        self.errors: Dict[str, int] = {}
+
+    def add_error(self, status: int, err: str) -> None:
+        key = f"{status}" if status else "EXC"
+        if err:
+            key = f"{key}:{err[:72]}"
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    def merge(self, other: "_ScenarioStats") -> None:
+        self.latency.merge(other.latency)
+        self.service.merge(other.service)
+        self.sent += other.sent
+        self.success += other.success
+        for key, n in other.errors.items():
+            self.errors[key] = self.errors.get(key, 0) + n
+
+    def report(self, name: str, elapsed_ms: float, target_rps: float) -> Dict[str, object]:
+        elapsed_sec = elapsed_ms / 1000.0
+        total = self.sent
+        summary: Dict[str, object] = {
+            "total_requests": total,
+            "success_count": self.success,
+            "failed_count": total - self.success,
+            "success_rate": (self.success / total) if total else 0.0,
+            "elapsed_ms": elapsed_ms,
+            "rps": (total / elapsed_sec) if elapsed_sec > 0 else 0.0,
+            "target_rps": target_rps,
+            "latency_ms": self.latency.summary(),
+            "service_latency_ms": self.service.summary(),
+        }
+        return {"name": name, "summary": summary, "error_buckets": dict(self.errors)}
+
+
+def run_open_loop(
+    mix: Sequence[MixEntry],
+    rps: float,
+    duration_s: float,
+    max_inflight: int = 64,
+    max_backlog: int = 10_000,
+    seed: int = 0,
+    total_name: Optional[str] = "mix_total",
+) -> List[Dict[str, object]]:
+    """
+    Offer `rps` Poisson arrivals for `duration_s`, each a weighted pick from `mix`.
+
+    Up to `max_inflight` requests run concurrently; later arrivals wait and
+    that wait counts toward their latency. Arrivals beyond `max_backlog`
+    outstanding requests are failed as `DROPPED` rather than queued. Returns
+    one scenario report per mix entry (the shape evaluate_reports reads),
+    plus an aggregate named `total_name`.
+    """
+    entries = [entry for entry in mix if entry.weight > 0]
+    if not entries:
+        raise ValueError("empty mix")
+    rng = random.Random(seed)
+    arrivals = poisson_arrivals(rps, duration_s, rng)
+    weights = [entry.weight for entry in entries]
+    picks = rng.choices(range(len(entries)), weights=weights, k=len(arrivals))
+
+    stats = [_ScenarioStats() for _ in entries]
+    lock = threading.Lock()
+    outstanding = [0]
+
+    def execute(k: int, scheduled: float) -> None:
+        sent = time.perf_counter()
+        try:
+            ok, status, err = entries[k].request_fn()
+        except Exception as exc:  # pragma: no cover - transports return errors
+            ok, status, err = False, 0, f"{type(exc).__name__}: {exc}"
+        done = time.perf_counter()
+        with lock:
+            outstanding[0] -= 1
+            s = stats[k]
+            s.latency.record((done - scheduled) * 1000.0)
+            s.service.record((done - sent) * 1000.0)
+            if ok:
+                s.success += 1
+            else:
+                s.add_error(status, err)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, int(max_inflight)), thread_name_prefix="load") as pool:
+        for offset, k in zip(arrivals, picks):
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with lock:
+                stats[k].sent += 1
+                if outstanding[0] >= max_backlog:
+                    stats[k].add_error(0, "DROPPED: client backlog full")
+                    continue
+                outstanding[0] += 1
+            pool.submit(execute, k, scheduled)
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+    total_weight = sum(weights)
+    reports = [
+        s.report(entry.name, elapsed_ms, rps * entry.weight / total_weight)
+        for entry, s in zip(entries, stats)
+    ]
+    if total_name:
+        total = _ScenarioStats()
+        for s in stats:
+            total.merge(s)
+        reports.append(total.report(total_name, elapsed_ms, rps))
+    return reports
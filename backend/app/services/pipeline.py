@@ -1,37 +1,199 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
 
-from app.services.encoding_fix import fix_csv_encoding
+import numpy as np
+
+from app.services.borehole_cache import read_borehole_csv
+from app.services.borehole_parser import add_depth_columns, fill_missing_by_lithology_batch, normalize_borehole_df
+from app.services.encoding_fix import normalize_csv_encodings
 from app.services.coords_loader import load_borehole_coords
-from app.services.interpolate import interpolate_field
-from app.services.pressure_index import compute_borehole_index, interpolate_index
+from app.services.interpolate import interpolate_stack_from_points, points_values_from_frames
+from app.services.lithology_stats import lithology_averages_from_frames
+from app.services.pressure_index import index_items_from_frames, normalize_weights
 
+# run_pipeline is a small DAG: every stage names the stages it reads, runs
+# once, and its output is shared by all dependents. The corpus is parsed and
+# normalized once, lithology averages are computed once, field and index
+# values come from the same filled frames, and both are interpolated with
+# one operator when they cover the same boreholes.
 
-def run_pipeline(data_dir: Path, field: str, method: str, grid_size: int, fix_encoding: bool = True) -> Dict:
-    if fix_encoding:
-        files = sorted([p for p in data_dir.glob("*.csv") if p.is_file()])
-        fix_results = [fix_csv_encoding(p) for p in files]
-    else:
-        fix_results = []
 
-    coord_path = data_dir / "zuobiao.csv"
-    coords = load_borehole_coords(coord_path)
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    needs: Tuple[str, ...] = ()
+
+
+def run_stages(stages: Sequence[Stage], inputs: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Run stages in dependency order; returns all outputs and per-stage wall time (ms)."""
+    results = dict(inputs)
+    timings: Dict[str, float] = {}
+    pending = list(stages)
+    while pending:
+        ready = [stage for stage in pending if all(dep in results for dep in stage.needs)]
+        if not ready:
+            names = ", ".join(stage.name for stage in pending)
+            raise ValueError(f"pipeline stages have unmet or cyclic dependencies: {names}")
+        for stage in ready:
+            t0 = time.perf_counter()
+            results[stage.name] = stage.run(results)
+            timings[stage.name] = (time.perf_counter() - t0) * 1000.0
+        pending = [stage for stage in pending if stage.name not in results]
+    return results, timings
+
+
+def _fix_encoding(ctx: Dict[str, Any]) -> List[Dict]:
+    if not ctx["fix_encoding"]:
+        return []
+    files = sorted([p for p in ctx["data_dir"].glob("*.csv") if p.is_file()])
+    return normalize_csv_encodings(files)
+
+
+def _corpus(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    data_dir: Path = ctx["data_dir"]
+    coords = load_borehole_coords(data_dir / "zuobiao.csv")
     files = sorted([p for p in data_dir.glob("*.csv") if p.is_file() and p.name != "zuobiao.csv"])
+    frames: Dict[str, Any] = {}
+    errors: Dict[str, Exception] = {}
+    for p in files:
+        try:
+            frames[p.stem] = normalize_borehole_df(read_borehole_csv(p))
+        except Exception as exc:
+            errors[p.stem] = exc
+    return {"coords": coords, "files": files, "frames": frames, "errors": errors}
+
+
+def _lithology_averages(ctx: Dict[str, Any]) -> Dict[str, Dict]:
+    # Unreadable files are left out of the averages, as in compute_lithology_averages.
+    lith_avgs = lithology_averages_from_frames(list(ctx["corpus"]["frames"].values()))
+    return {item["name"]: item for item in lith_avgs if "name" in item}
+
+
+def _filled(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    corpus = ctx["corpus"]
+    names = []
+    missing = []
+    frames = []
+    for p in corpus["files"]:
+        name = p.stem
+        if name not in corpus["coords"]:
+            missing.append(name)
+            continue
+        if name in corpus["errors"]:
+            raise corpus["errors"][name]
+        frames.append(add_depth_columns(corpus["frames"][name]))
+        names.append(name)
+    filled = fill_missing_by_lithology_batch(frames, ctx["lithology_averages"])
+    return {"names": names, "frames": filled, "missing_coords": missing}
+
+
+def _field_values(ctx: Dict[str, Any]) -> Dict:
+    filled = ctx["filled"]
+    return points_values_from_frames(filled["names"], filled["frames"], ctx["corpus"]["coords"], ctx["field"])
+
 
-    interpolation = interpolate_field(files=files, coords=coords, field=field, method=method, grid_size=grid_size)
-    base = compute_borehole_index(files=files, coords=coords)
-    grid = interpolate_index(items=base.get("items", []), method=method, grid_size=grid_size)
+def _index_values(ctx: Dict[str, Any]) -> Dict:
+    filled = ctx["filled"]
+    items = index_items_from_frames(filled["names"], filled["frames"], ctx["corpus"]["coords"], normalize_weights(None))
+    return {"items": items, "missing_coords": list(filled["missing_coords"])}
+
+
+def _interpolate(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    field_data = ctx["field_values"]
+    items = ctx["index_values"]["items"]
+    method, grid_size = ctx["method"], ctx["grid_size"]
+    field_points = [tuple(p) for p in field_data["points"]]
+    index_points = [(item["x"], item["y"]) for item in items]
+
+    def grid_of(points: List[Tuple[float, float]], columns: List[List[float]]) -> Dict:
+        if len(points) < 3:
+            return {"error": "not enough points for interpolation"}
+        return interpolate_stack_from_points(
+            np.array(points), np.array(columns, dtype=float).T, method=method, grid_size=grid_size
+        )
+
+    index_values = [item["index"] for item in items]
+    if field_points == index_points:
+        shared = grid_of(field_points, [field_data["values"], index_values])
+        field_result = index_result = shared
+        field_grid = index_grid = None
+        if "grids" in shared:
+            field_grid, index_grid = shared["grids"]
+    else:
+        field_result = grid_of(field_points, [field_data["values"]])
+        index_result = grid_of(index_points, [index_values])
+        field_grid = field_result["grids"][0] if "grids" in field_result else None
+        index_grid = index_result["grids"][0] if "grids" in index_result else None
+    return {
+        "shared_operator": field_points == index_points,
+        "field": (field_result, field_grid),
+        "index": (index_result, index_grid),
+    }
+
+
+PIPELINE_STAGES = (
+    Stage("fix_encoding", _fix_encoding),
+    Stage("corpus", _corpus, ("fix_encoding",)),
+    Stage("lithology_averages", _lithology_averages, ("corpus",)),
+    Stage("filled", _filled, ("corpus", "lithology_averages")),
+    Stage("field_values", _field_values, ("filled",)),
+    Stage("index_values", _index_values, ("filled",)),
+    Stage("interpolate", _interpolate, ("field_values", "index_values")),
+)
+
+
+def run_pipeline(data_dir: Path, field: str, method: str, grid_size: int, fix_encoding: bool = True) -> Dict:
+    results, timings = run_stages(
+        PIPELINE_STAGES,
+        {"data_dir": data_dir, "field": field, "method": method, "grid_size": grid_size, "fix_encoding": fix_encoding},
+    )
+    missing = results["filled"]["missing_coords"]
+    field_points = results["field_values"]["points"]
+    items = results["index_values"]["items"]
+
+    field_result, field_grid = results["interpolate"]["field"]
+    if len(field_points) < 3:
+        interpolation: Dict[str, Any] = {"error": "not enough points for interpolation", "missing_coords": missing}
+    elif field_grid is None:
+        interpolation = field_result
+    else:
+        interpolation = {
+            "field": field,
+            "method": method,
+            "grid_size": grid_size,
+            "bounds": field_result["bounds"],
+            "values": field_grid.tolist(),
+            "missing_coords": missing,
+            "point_count": len(field_points),
+        }
+
+    index_result, index_grid = results["interpolate"]["index"]
+    if index_grid is None:
+        grid: Dict[str, Any] = index_result
+    else:
+        grid = {
+            "method": method,
+            "grid_size": grid_size,
+            "bounds": index_result["bounds"],
+            "values": index_grid.tolist(),
+            "point_count": len(items),
+        }
 
     return {
         "field": field,
         "method": method,
         "grid_size": grid_size,
-        "fix_results": fix_results,
+        "fix_results": results["fix_encoding"],
         "interpolation": interpolation,
         "index": {
-            "base": base,
+            "base": results["index_values"],
             "grid": grid,
         },
-    }
\ No newline at end of file
+        "shared_operator": results["interpolate"]["shared_operator"],
+        "timings_ms": timings,
+    }
@@ -6,8 +6,9 @@ from typing import Any, Dict, List, Optional
 import numpy as np
 import pandas as pd
 
-from app.services.csv_loader import read_csv_robust
-from app.services.borehole_parser import normalize_borehole_df, add_depth_columns, fill_missing_by_lithology
+from app.services.borehole_cache import read_borehole_csv
+from app.services.compute_executor import run_compute
+from app.services.borehole_parser import normalize_borehole_df, add_depth_columns, fill_missing_by_lithology_batch
 from app.services.lithology_stats import compute_lithology_averages
 from app.services.interpolate import interpolate_from_points
 from app.services.mpi_calculator import PointData, RockLayer, calc_all_indicators
@@ -46,20 +47,31 @@ def compute_borehole_index(files: List[Path], coords: Dict[str, Dict[str, float]
     lith_avgs = compute_lithology_averages(files)
     lith_avg_map = {item["name"]: item for item in lith_avgs if "name" in item}
 
-    results = []
     missing_coords = []
 
+    names = []
+    frames = []
     for p in files:
         name = p.stem
         if name not in coords:
             missing_coords.append(name)
             continue
 
-        df = read_csv_robust(p)
+        df = read_borehole_csv(p)
         df = normalize_borehole_df(df)
-        df = add_depth_columns(df)
-        df = fill_missing_by_lithology(df, lith_avg_map)
+        frames.append(add_depth_columns(df))
+        names.append(name)
+
+    items = index_items_from_frames(names, fill_missing_by_lithology_batch(frames, lith_avg_map), coords, weights)
+    return {"items": items, "missing_coords": missing_coords}
 
+
+def index_items_from_frames(
+    names: List[str], frames: List[pd.DataFrame], coords: Dict[str, Dict[str, float]], weights: Dict
+) -> List[Dict]:
+    """Index value per borehole of already filled frames; `weights` must be normalized."""
+    results = []
+    for name, df in zip(names, frames):
         index_value = 0.0
         weight_sum = 0.0
         for field, w in weights.items():
@@ -80,8 +92,7 @@ def compute_borehole_index(files: List[Path], coords: Dict[str, Dict[str, float]
                 "index": index_value / weight_sum,
             }
         )
-
-    return {"items": results, "missing_coords": missing_coords}
+    return results
 
 
 def interpolate_index(items: List[Dict], method: str, grid_size: int) -> Dict:
@@ -176,6 +187,18 @@ async def calculate_pressure_index_grid(
     """
     Compatibility helper used by geomodel integration routes.
 
+    Runs build_pressure_index_grid on the compute executor.
+    """
+    return await run_compute(build_pressure_index_grid, seam_name=seam_name, resolution=resolution, points=points)
+
+
+def build_pressure_index_grid(
+    *,
+    seam_name: str,
+    resolution: int,
+    points: List[Dict[str, Any]],
+) -> List[List[float]]:
+    """
     Builds point-wise MPI from overburden borehole payload, then interpolates
     a grid with IDW.
     """
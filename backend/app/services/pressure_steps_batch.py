@@ -5,8 +5,8 @@ from typing import Dict, List
 
 import pandas as pd
 
-from app.services.csv_loader import read_csv_robust
-from app.services.borehole_parser import normalize_borehole_df, add_depth_columns, fill_missing_by_lithology
+from app.services.borehole_cache import read_borehole_csv
+from app.services.borehole_parser import normalize_borehole_df, add_depth_columns, fill_missing_by_lithology_batch
 from app.services.lithology_stats import compute_lithology_averages
 from app.services.pressure_steps import compute_pressure_steps
 
@@ -40,13 +40,14 @@ def compute_pressure_steps_boreholes(
     lith_avgs = compute_lithology_averages(files)
     lith_avg_map = {item["name"]: item for item in lith_avgs if "name" in item}
 
-    items = []
+    frames = []
     for p in files:
-        df = read_csv_robust(p)
+        df = read_borehole_csv(p)
         df = normalize_borehole_df(df)
-        df = add_depth_columns(df)
-        df = fill_missing_by_lithology(df, lith_avg_map)
+        frames.append(add_depth_columns(df))
 
+    items = []
+    for p, df in zip(files, fill_missing_by_lithology_batch(frames, lith_avg_map)):
         total_h = _total_thickness(df) or 0.0
         h = total_h if h_mode == "total" else total_h
 
@@ -5,7 +5,7 @@ from datetime import datetime, timezone
 from hashlib import sha256
 import json
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 import numpy as np
@@ -22,6 +22,7 @@ from sklearn.metrics import (
 
 from app.core.config import get_data_dir
 from app.services.csv_loader import read_csv_robust
+from app.services.experiment_index import append_experiment
 
 
 def _utc_now_iso() -> str:
@@ -460,46 +461,147 @@ def _ece_report(y_true: np.ndarray, y_prob: np.ndarray, bins: int = 10) -> Dict[
     return {"ece": float(ece), "mce": float(mce), "bin_count": bins, "bins": rows}
 
 
+DEFAULT_BOOTSTRAP_ROUNDS = 200
+_BOOTSTRAP_CHUNK_CELLS = 2_000_000
+
+
+def _bootstrap_ranking_metrics(y_true: np.ndarray, y_prob: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row-wise ROC AUC and average precision from one descending sort.
+
+    Both follow sklearn's step definitions: only the last position of each
+    tied score block is a threshold, AUC is the trapezoidal area under the
+    resulting ROC points. Single-class rows score 0.5.
+    """
+    order = np.argsort(-y_prob, axis=1, kind="stable")
+    scores = np.take_along_axis(y_prob, order, axis=1)
+    tp = np.cumsum(np.take_along_axis(y_true, order, axis=1), axis=1)
+    seen = np.arange(1, scores.shape[1] + 1)
+    fp = seen - tp
+    n_pos = tp[:, -1]
+    n_neg = fp[:, -1]
+
+    is_threshold = np.ones_like(scores, dtype=bool)
+    is_threshold[:, :-1] = scores[:, :-1] != scores[:, 1:]
+    prev_tp = np.zeros_like(tp)
+    prev_fp = np.zeros_like(fp)
+    prev_tp[:, 1:] = np.maximum.accumulate(np.where(is_threshold, tp, 0), axis=1)[:, :-1]
+    prev_fp[:, 1:] = np.maximum.accumulate(np.where(is_threshold, fp, 0), axis=1)[:, :-1]
+
+    area = np.where(is_threshold, (fp - prev_fp) * (tp + prev_tp), 0).sum(axis=1) / 2.0
+    gain = np.where(is_threshold, (tp - prev_tp) * (tp / seen), 0.0).sum(axis=1)
+    valid = (n_pos > 0) & (n_neg > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        auc = np.where(valid, area / (n_pos * n_neg), 0.5)
+        pr_auc = np.where(valid, gain / n_pos, 0.5)
+    return auc, pr_auc
+
+
+def _bootstrap_f1(y_true: np.ndarray, y_prob: np.ndarray) -> np.ndarray:
+    pred = y_prob >= 0.5
+    tp = (pred & y_true).sum(axis=1)
+    fp = (pred & ~y_true).sum(axis=1)
+    fn = (~pred & y_true).sum(axis=1)
+    denom = 2 * tp + fp + fn
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f1 = 2.0 * tp / denom
+    return np.where(denom > 0, f1, 0.0)
+
+
+def _bootstrap_metric_rows(y_true: np.ndarray, y_prob: np.ndarray) -> Dict[str, np.ndarray]:
+    err = y_prob - y_true
+    sq = np.mean(err * err, axis=1)
+    auc, pr_auc = _bootstrap_ranking_metrics(y_true, y_prob)
+    return {
+        "auc": auc,
+        "pr_auc": pr_auc,
+        "brier": sq,
+        "f1": _bootstrap_f1(y_true, y_prob),
+        "mae": np.mean(np.abs(err), axis=1),
+        "rmse": np.sqrt(sq),
+    }
+
+
 def _bootstrap_ci(
     y_true: np.ndarray,
     y_prob: np.ndarray,
-    metric_fn: Callable[[np.ndarray, np.ndarray], float],
     seed: int,
-    n_bootstrap: int = 200,
-) -> Tuple[float, float]:
-    if len(y_true) <= 1:
-        value = metric_fn(y_true, y_prob)
-        return float(value), float(value)
-    rng = np.random.default_rng(seed)
-    vals: List[float] = []
+    n_bootstrap: int = DEFAULT_BOOTSTRAP_ROUNDS,
+) -> Dict[str, List[float]]:
+    """
+    95% percentile bootstrap intervals for auc/pr_auc/brier/f1/mae/rmse.
+
+    All metrics share one (n_bootstrap x n) resample index matrix, drawn and
+    scored in row chunks so memory stays bounded for large B.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    y_prob = np.asarray(y_prob, dtype=float)
     n = len(y_true)
-    for _ in range(n_bootstrap):
-        idx = rng.integers(0, n, size=n)
-        yt = y_true[idx]
-        yp = y_prob[idx]
-        try:
-            vals.append(float(metric_fn(yt, yp)))
-        except Exception:
-            continue
-    if not vals:
-        value = metric_fn(y_true, y_prob)
-        return float(value), float(value)
-    lo, hi = np.percentile(vals, [2.5, 97.5])
-    return float(lo), float(hi)
+    rounds = max(1, int(n_bootstrap))
+    if n <= 1:
+        point = _bootstrap_metric_rows(y_true[None, :], y_prob[None, :])
+        return {name: [float(v[0]), float(v[0])] for name, v in point.items()}
 
+    rng = np.random.default_rng(seed)
+    chunk = max(1, _BOOTSTRAP_CHUNK_CELLS // n)
+    parts: Dict[str, List[np.ndarray]] = {}
+    for start in range(0, rounds, chunk):
+        idx = rng.integers(0, n, size=(min(chunk, rounds - start), n))
+        for name, values in _bootstrap_metric_rows(y_true[idx], y_prob[idx]).items():
+            parts.setdefault(name, []).append(values)
 
-def run_experiment(spec: Dict[str, Any]) -> Dict[str, Any]:
-    dataset_id = str(spec["dataset_id"])
+    ci: Dict[str, List[float]] = {}
+    for name, values in parts.items():
+        lo, hi = np.percentile(np.concatenate(values), [2.5, 97.5])
+        ci[name] = [float(lo), float(hi)]
+    return ci
+
+
+@dataclass
+class ExperimentContext:
+    """Dataset, manifest and split loaded once and shared by several experiments."""
+
+    dataset_id: str
+    manifest: Dict[str, Any]
+    split_id: str
+    split_manifest: Dict[str, Any]
+    df: pd.DataFrame
+
+
+def load_experiment_context(dataset_id: str, dataset_version: str = "", split_id: str = "") -> ExperimentContext:
     manifest = load_dataset_manifest(dataset_id)
-    expected_version = str(spec.get("dataset_version", "")).strip()
+    expected_version = str(dataset_version or "").strip()
     if expected_version and expected_version != manifest["dataset_version"]:
         raise ValueError("dataset version mismatch")
 
-    split_id = str(spec.get("split_id", "")).strip() or (latest_split_id(dataset_id) or "")
+    split_id = str(split_id or "").strip() or (latest_split_id(dataset_id) or "")
     if not split_id:
         raise ValueError("no split found for dataset, run /split first")
     split_manifest = load_split_manifest(dataset_id, split_id)
     df = read_csv_robust(dataset_csv_path(dataset_id))
+    return ExperimentContext(
+        dataset_id=dataset_id,
+        manifest=manifest,
+        split_id=split_id,
+        split_manifest=split_manifest,
+        df=df,
+    )
+
+
+def run_experiment(spec: Dict[str, Any], context: Optional[ExperimentContext] = None) -> Dict[str, Any]:
+    dataset_id = str(spec["dataset_id"])
+    if context is None:
+        context = load_experiment_context(
+            dataset_id,
+            dataset_version=str(spec.get("dataset_version", "")),
+            split_id=str(spec.get("split_id", "")),
+        )
+    elif context.dataset_id != dataset_id:
+        raise ValueError("experiment context belongs to another dataset")
+    manifest = context.manifest
+    split_id = context.split_id
+    split_manifest = context.split_manifest
+    df = context.df
 
     label_schema = manifest.get("label_schema", {})
     label_col = str(spec.get("target_label_column") or label_schema.get("label_column") or "").strip()
@@ -537,14 +639,8 @@ def run_experiment(spec: Dict[str, Any]) -> Dict[str, Any]:
     except Exception:
         p_value = 1.0
 
-    ci = {
-        "auc": list(_bootstrap_ci(y_true, y_prob, lambda yt, yp: roc_auc_score(yt, yp) if len(np.unique(yt)) > 1 else 0.5, seed + 1)),
-        "pr_auc": list(_bootstrap_ci(y_true, y_prob, lambda yt, yp: average_precision_score(yt, yp) if len(np.unique(yt)) > 1 else 0.5, seed + 2)),
-        "brier": list(_bootstrap_ci(y_true, y_prob, lambda yt, yp: brier_score_loss(yt, yp), seed + 3)),
-        "f1": list(_bootstrap_ci(y_true, y_prob, lambda yt, yp: f1_score(yt, (yp >= 0.5).astype(int), zero_division=0), seed + 4)),
-        "mae": list(_bootstrap_ci(y_true, y_prob, lambda yt, yp: mean_absolute_error(yt, yp), seed + 5)),
-        "rmse": list(_bootstrap_ci(y_true, y_prob, lambda yt, yp: np.sqrt(mean_squared_error(yt, yp)), seed + 6)),
-    }
+    n_bootstrap = int(spec.get("n_bootstrap") or DEFAULT_BOOTSTRAP_ROUNDS)
+    ci = _bootstrap_ci(y_true, y_prob, seed + 1, n_bootstrap=n_bootstrap)
 
     exp_id = f"exp_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:6]}"
     metrics = {
@@ -575,6 +671,7 @@ def run_experiment(spec: Dict[str, Any]) -> Dict[str, Any]:
 
     exp_folder = experiment_dir(exp_id)
     experiment_result_path(exp_id).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    append_experiment(get_research_paths().experiments_dir, result)
 
     metrics_lines = ["metric,value"]
     metrics_lines.extend([f"{k},{v}" for k, v in metrics.items()])
@@ -10,12 +10,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 import numpy as np
 import pandas as pd
 
-from .csv_loader import read_csv_robust
+from .csv_loader import read_csv_with_info
 
 # 项目根目录
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
@@ -92,6 +92,21 @@ class RockParams:
         )
 
 
+# 参数字段 -> 汇总表列名
+PARAM_COLUMNS: Dict[str, str] = {
+    "density": "密度（kg*m3）",
+    "bulk_modulus": "体积模量（Gpa）",
+    "shear_modulus": "剪切模量/GPa",
+    "cohesion": "内聚力（MPa）",
+    "friction_angle": "内摩擦角",
+    "tensile_strength": "抗拉强度（MPa）",
+    "compressive_strength": "抗压强度/MPa",
+    "elastic_modulus": "弹性模量（Gpa）",
+    "poisson_ratio": "泊松比",
+}
+PARAM_KEYS: List[str] = list(PARAM_COLUMNS)
+
+
 def _parse_float(value: Any) -> Optional[float]:
     """安全解析浮点数"""
     if pd.isna(value) or value is None or value == "":
@@ -165,6 +180,69 @@ LITHOLOGY_SYNONYMS: Dict[str, List[str]] = {
 }
 
 
+def _build_synonym_groups() -> Dict[str, Tuple[str, ...]]:
+    """同义词展开：名称 -> 同义词匹配时合并查询的全部岩性"""
+    groups: Dict[str, List[str]] = {}
+    for standard_name, synonyms in LITHOLOGY_SYNONYMS.items():
+        members = [standard_name, *synonyms]
+        for name in members:
+            bucket = groups.setdefault(name, [name])
+            for member in members:
+                if member not in bucket:
+                    bucket.append(member)
+    return {name: tuple(members) for name, members in groups.items()}
+
+
+def _build_canonical_names() -> Dict[str, str]:
+    """同义词 -> 标准名称（标准名称优先于同义词出现位置）"""
+    canonical = {name: name for name in LITHOLOGY_SYNONYMS}
+    for standard_name, synonyms in LITHOLOGY_SYNONYMS.items():
+        for syn in synonyms:
+            canonical.setdefault(syn, standard_name)
+    return canonical
+
+
+SYNONYM_GROUPS: Dict[str, Tuple[str, ...]] = _build_synonym_groups()
+CANONICAL_NAMES: Dict[str, str] = _build_canonical_names()
+
+
+def _group_positions(series: Optional[pd.Series]) -> Dict[str, List[int]]:
+    """按取值分组的行号索引（保持首次出现顺序）"""
+    if series is None:
+        return {}
+    labels = series.astype(str).str.strip().to_numpy()
+    codes, uniques = pd.factorize(labels)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {
+        str(label): order[bounds[i]:bounds[i + 1]].tolist()
+        for i, label in enumerate(uniques)
+        if label
+    }
+
+
+def _aggregate_params(frame: pd.DataFrame, key: str) -> pd.DataFrame:
+    """按key分组统计每个参数的均值/有效样本数"""
+    grouped = frame.groupby(key, sort=False)
+    stats = grouped[PARAM_KEYS].agg(["mean", "count"])
+    stats.columns = [f"{param}_{stat}" for param, stat in stats.columns]
+    stats.insert(0, "count", grouped.size())
+    stats.index = stats.index.astype(str)
+    return stats
+
+
+def _params_from_stats(stats: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """统计表 -> {岩性: get_params_by_lithology返回格式}"""
+    means = stats[[f"{key}_mean" for key in PARAM_KEYS]].astype(object)
+    means = means.where(means.notna(), None)
+    result: Dict[str, Dict[str, Any]] = {}
+    for name, count, values in zip(stats.index, stats["count"].tolist(), means.itertuples(index=False)):
+        params: Dict[str, Any] = {"count": int(count)}
+        params.update(zip(PARAM_KEYS, values))
+        result[name] = params
+    return result
+
+
 class RockParamsDatabase:
     """
     岩石力学参数数据库
@@ -183,7 +261,11 @@ class RockParamsDatabase:
         self.data: pd.DataFrame = pd.DataFrame()
         self._index_by_lithology: Dict[str, List[int]] = {}
         self._index_by_mine: Dict[str, List[int]] = {}
-        self._stats_cache: Dict[str, Dict[str, float]] = {}
+        # 加载时预计算的统计表：原始岩性 / 同义词展开后的查询名称
+        self.lithology_stats: pd.DataFrame = pd.DataFrame()
+        self.synonym_stats: pd.DataFrame = pd.DataFrame()
+        self._lithology_params: Dict[str, Dict[str, Any]] = {}
+        self._synonym_params: Dict[str, Dict[str, Any]] = {}
 
         self._load()
         self._build_indexes()
@@ -193,29 +275,50 @@ class RockParamsDatabase:
         if not self.db_path.exists():
             raise FileNotFoundError(f"数据库文件不存在: {self.db_path}")
 
-        self.data = read_csv_robust(self.db_path)
-        print(f"[RockParamsDB] 加载数据: {len(self.data)} 条记录")
+        self.data, read_info = read_csv_with_info(self.db_path)
+        print(
+            f"[RockParamsDB] 加载数据: {len(self.data)} 条记录 "
+            f"(encoding={read_info['encoding']}, engine={read_info['engine']})"
+        )
 
     def _build_indexes(self):
         """构建查询索引"""
-        # 按岩性索引
-        for idx, row in self.data.iterrows():
-            lithology = str(row.get("岩性", "")).strip()
-            if lithology:
-                if lithology not in self._index_by_lithology:
-                    self._index_by_lithology[lithology] = []
-                self._index_by_lithology[lithology].append(idx)
-
-        # 按矿名索引
-        for idx, row in self.data.iterrows():
-            mine = str(row.get("矿名", "")).strip()
-            if mine:
-                if mine not in self._index_by_mine:
-                    self._index_by_mine[mine] = []
-                self._index_by_mine[mine].append(idx)
+        self._index_by_lithology = _group_positions(self.data.get("岩性"))
+        self._index_by_mine = _group_positions(self.data.get("矿名"))
+        self._build_stats_tables()
 
         print(f"[RockParamsDB] 构建索引: {len(self._index_by_lithology)} 种岩性, {len(self._index_by_mine)} 个矿名")
 
+    def _build_stats_tables(self):
+        """预计算各岩性（含同义词组）的参数均值/样本数"""
+        frame = pd.DataFrame(
+            {
+                key: pd.to_numeric(self.data[col], errors="coerce") if col in self.data.columns else np.nan
+                for key, col in PARAM_COLUMNS.items()
+            },
+            index=self.data.index,
+        )
+        if "岩性" not in self.data.columns or frame.empty:
+            return
+
+        frame["lithology"] = self.data["岩性"].astype(str).str.strip()
+        frame = frame[frame["lithology"] != ""]
+        self.lithology_stats = _aggregate_params(frame, "lithology")
+
+        pairs = [
+            (name, member)
+            for name, members in SYNONYM_GROUPS.items()
+            for member in members
+            if member in self._index_by_lithology
+        ]
+        if pairs:
+            membership = pd.DataFrame(pairs, columns=["query", "lithology"])
+            expanded = membership.merge(frame, on="lithology", how="inner")
+            self.synonym_stats = _aggregate_params(expanded, "query")
+
+        self._lithology_params = _params_from_stats(self.lithology_stats)
+        self._synonym_params = _params_from_stats(self.synonym_stats) if not self.synonym_stats.empty else {}
+
     def get_by_lithology(self, lithology: str, use_synonyms: bool = True) -> List[RockParams]:
         """
         按岩性查询参数
@@ -227,30 +330,12 @@ class RockParamsDatabase:
         Returns:
             参数列表
         """
-        results = []
+        names = SYNONYM_GROUPS.get(lithology, (lithology,)) if use_synonyms else (lithology,)
         indices = set()
+        for name in names:
+            indices.update(self._index_by_lithology.get(name, []))
 
-        # 精确匹配
-        if lithology in self._index_by_lithology:
-            indices.update(self._index_by_lithology[lithology])
-
-        # 同义词匹配
-        if use_synonyms:
-            for standard_name, synonyms in LITHOLOGY_SYNONYMS.items():
-                if lithology in synonyms or lithology == standard_name:
-                    if standard_name in self._index_by_lithology:
-                        indices.update(self._index_by_lithology[standard_name])
-                    # 也查找同义词
-                    for syn in synonyms:
-                        if syn in self._index_by_lithology:
-                            indices.update(self._index_by_lithology[syn])
-
-        # 转换为结果
-        for idx in indices:
-            row = self.data.iloc[idx]
-            results.append(RockParams.from_row(row))
-
-        return results
+        return [RockParams.from_row(self.data.iloc[idx]) for idx in sorted(indices)]
 
     def get_params_by_lithology(self, lithology: str, use_synonyms: bool = True) -> Dict[str, float]:
         """
@@ -261,32 +346,11 @@ class RockParamsDatabase:
             use_synonyms: 是否使用同义词匹配
 
         Returns:
-            参数字典（均值）
+            参数字典（均值），无匹配数据时为空字典
         """
-        cache_key = f"{lithology}_{use_synonyms}"
-        if cache_key in self._stats_cache:
-            return self._stats_cache[cache_key]
-
-        records = self.get_by_lithology(lithology, use_synonyms)
-        if not records:
-            return {}
-
-        # 计算均值
-        params = {
-            "count": len(records),
-            "density": _mean([r.density for r in records if r.density is not None]),
-            "bulk_modulus": _mean([r.bulk_modulus for r in records if r.bulk_modulus is not None]),
-            "shear_modulus": _mean([r.shear_modulus for r in records if r.shear_modulus is not None]),
-            "cohesion": _mean([r.cohesion for r in records if r.cohesion is not None]),
-            "friction_angle": _mean([r.friction_angle for r in records if r.friction_angle is not None]),
-            "tensile_strength": _mean([r.tensile_strength for r in records if r.tensile_strength is not None]),
-            "compressive_strength": _mean([r.compressive_strength for r in records if r.compressive_strength is not None]),
-            "elastic_modulus": _mean([r.elastic_modulus for r in records if r.elastic_modulus is not None]),
-            "poisson_ratio": _mean([r.poisson_ratio for r in records if r.poisson_ratio is not None]),
-        }
-
-        self._stats_cache[cache_key] = params
-        return params
+        if use_synonyms and lithology in self._synonym_params:
+            return self._synonym_params[lithology]
+        return self._lithology_params.get(lithology, {})
 
     def get_by_mine(self, mine_name: str) -> List[RockParams]:
         """
@@ -551,6 +615,19 @@ DEFAULT_PARAMS: Dict[str, Dict[str, float]] = {
 }
 
 
+def _build_default_aliases() -> Dict[str, str]:
+    """同义词 -> 有默认参数的标准名称"""
+    aliases: Dict[str, str] = {}
+    for standard_name, synonyms in LITHOLOGY_SYNONYMS.items():
+        if standard_name in DEFAULT_PARAMS:
+            for syn in synonyms:
+                aliases.setdefault(syn, standard_name)
+    return aliases
+
+
+_DEFAULT_ALIASES: Dict[str, str] = _build_default_aliases()
+
+
 def get_default_params(lithology: str) -> Dict[str, float]:
     """
     获取岩性默认参数
@@ -566,10 +643,9 @@ def get_default_params(lithology: str) -> Dict[str, float]:
         return DEFAULT_PARAMS[lithology].copy()
 
     # 尝试从同义词映射中查找标准名称
-    for standard_name, synonyms in LITHOLOGY_SYNONYMS.items():
-        if lithology in synonyms:
-            if standard_name in DEFAULT_PARAMS:
-                return DEFAULT_PARAMS[standard_name].copy()
+    standard_name = _DEFAULT_ALIASES.get(lithology)
+    if standard_name is not None:
+        return DEFAULT_PARAMS[standard_name].copy()
 
     # 尝试按关键词匹配
     if "砂" in lithology and "泥" in lithology:
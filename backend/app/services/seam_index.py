@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from app.services.borehole_cache import read_borehole_csv
+from app.services.borehole_parser import add_depth_columns, normalize_borehole_df
+
+# Process-wide index of the borehole corpus for the seam endpoints. Every file
+# is parsed once into column arrays (re-parsed only when its size/mtime
+# changes); the arrays are concatenated and seam rows, per-borehole first
+# occurrences and overburden row ranges are derived in vectorized passes.
+# Seam lookups and the /seams/list summary are then dictionary reads.
+
+MECHANICAL_FIELDS = (
+    "tensile_strength",
+    "elastic_modulus",
+    "compressive_strength",
+    "friction_angle",
+    "density",
+    "cohesion",
+)
+NUMERIC_FIELDS = ("thickness", "z_top", "z_bottom") + MECHANICAL_FIELDS
+
+T = TypeVar("T")
+
+MAX_INDEXES = 8
+MAX_PARSED_FILES = 4096
+
+_parsed: "OrderedDict[str, Tuple[Tuple[int, int], Optional[Dict[str, np.ndarray]]]]" = OrderedDict()
+_indexes: "OrderedDict[Tuple[str, ...], SeamIndex]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _parse_borehole(path: Path) -> Optional[Dict[str, np.ndarray]]:
+    """Column arrays of one borehole, or None when it has no layer names."""
+    df = add_depth_columns(normalize_borehole_df(read_borehole_csv(path)))
+    if "name" not in df.columns:
+        return None
+    names = df["name"]
+    # Seam keys follow `df["name"].str.strip()`: non-string cells never match.
+    if names.dtype == object or pd.api.types.is_string_dtype(names):
+        keys = names.str.strip().to_numpy(dtype=object)
+    else:
+        keys = np.full(len(df), np.nan, dtype=object)
+    part = {
+        "key": keys,
+        "label": names.astype(str).str.strip().to_numpy(dtype=object),
+    }
+    for field in NUMERIC_FIELDS:
+        if field in df.columns:
+            part[field] = pd.to_numeric(df[field], errors="coerce").to_numpy(dtype=float)
+        else:
+            part[field] = np.full(len(df), np.nan)
+    return part
+
+
+def _load_part(path: Path) -> Optional[Dict[str, np.ndarray]]:
+    key = str(path.resolve())
+    signature = _file_signature(path)
+    with _lock:
+        cached = _parsed.get(key)
+        if cached is not None and signature is not None and cached[0] == signature:
+            _parsed.move_to_end(key)
+            return cached[1]
+    try:
+        part = _parse_borehole(path)
+    except Exception as e:
+        print(f"Error processing {path.name}: {e}")
+        return None
+    if signature is not None:
+        with _lock:
+            _parsed[key] = (signature, part)
+            while len(_parsed) > MAX_PARSED_FILES:
+                _parsed.popitem(last=False)
+    return part
+
+
+@dataclass
+class SeamRows:
+    """First occurrence of one layer name per borehole, in file order."""
+
+    borehole: np.ndarray  # index into SeamIndex.boreholes
+    row: np.ndarray  # corpus row of the layer
+    thickness: np.ndarray
+    z_top: np.ndarray
+    z_bottom: np.ndarray
+    overburden_start: np.ndarray  # corpus rows [start, stop) lie above the layer
+    overburden_stop: np.ndarray
+
+
+class SeamIndex:
+    """Concatenated layer table of one ordered file list."""
+
+    def __init__(self, files: Sequence[Path]):
+        self.files = list(files)
+        self.boreholes = [p.stem for p in self.files]
+        self.signatures = [_file_signature(p) for p in self.files]
+
+        parts = [_load_part(p) for p in self.files]
+        lengths = np.array([len(part["key"]) if part else 0 for part in parts], dtype=np.int64)
+        present = [part for part in parts if part]
+        self.borehole_stop = np.cumsum(lengths)
+        self.borehole_start = self.borehole_stop - lengths
+        self.row_borehole = np.repeat(np.arange(len(self.files)), lengths)
+        self.columns: Dict[str, np.ndarray] = {}
+        for field in ("key", "label") + NUMERIC_FIELDS:
+            dtype = object if field in ("key", "label") else float
+            self.columns[field] = (
+                np.concatenate([part[field] for part in present]) if present else np.empty(0, dtype=dtype)
+            )
+
+        self._build_overburden_ranges()
+        self._build_layer_groups()
+        self._summary = self._build_summary()
+        self._memo: Dict[Hashable, Any] = {}
+        self._memo_lock = threading.Lock()
+
+    def is_current(self) -> bool:
+        return all(_file_signature(p) == sig for p, sig in zip(self.files, self.signatures))
+
+    def _build_overburden_ranges(self) -> None:
+        # Depths are cumulative thicknesses, so within a borehole z_top is
+        # non-decreasing and the layers above a row are the rows before the
+        # first row of its equal-z_top run. Boreholes with negative
+        # thicknesses break that and are filtered by value instead.
+        z_top = self.columns["z_top"]
+        bh = self.row_borehole
+        n = len(z_top)
+        idx = np.arange(n)
+        new_run = np.ones(n, dtype=bool)
+        if n > 1:
+            new_run[1:] = (bh[1:] != bh[:-1]) | (z_top[1:] != z_top[:-1])
+        self.run_start = np.maximum.accumulate(np.where(new_run, idx, 0)) if n else idx
+        descending = np.zeros(n, dtype=bool)
+        if n > 1:
+            descending[1:] = (bh[1:] == bh[:-1]) & (z_top[1:] < z_top[:-1])
+        self.unordered_boreholes = set(bh[descending].tolist())
+
+    def _build_layer_groups(self) -> None:
+        keys = self.columns["key"]
+        frame = pd.DataFrame({"borehole": self.row_borehole, "key": keys, "row": np.arange(len(keys))})
+        frame = frame[frame["key"].notna()]
+        first = frame.drop_duplicates(["borehole", "key"])
+        self._first_rows: Dict[str, np.ndarray] = {
+            name: first["row"].to_numpy()[positions]
+            for name, positions in first.groupby("key", sort=False).indices.items()
+        }
+        self._coal_rows = frame[frame["key"].str.contains("煤", regex=False)]
+
+    def _build_summary(self) -> List[Dict]:
+        thickness = self.columns["thickness"]
+        seams = []
+        for name, rows in self._coal_rows.groupby("key", sort=True)["row"]:
+            values = thickness[rows.to_numpy()]
+            values = values[~np.isnan(values)]
+            seams.append({
+                "name": name,
+                "borehole_count": int(len(rows)),
+                "thickness_values": values.tolist(),
+                "avg_thickness": float(np.mean(values)) if len(values) else None,
+                "thickness_range": {
+                    "min": float(np.min(values)) if len(values) else None,
+                    "max": float(np.max(values)) if len(values) else None
+                }
+            })
+        return seams
+
+    def seam_summary(self) -> Dict:
+        """Payload of get_all_coal_seams."""
+        return {
+            "seams": self._summary,
+            "total_boreholes": len(self.files),
+            "unique_seams": len(self._summary)
+        }
+
+    def seam_rows(self, seam_name: str) -> SeamRows:
+        rows = self._first_rows.get(seam_name.strip(), np.empty(0, dtype=np.int64))
+        borehole = self.row_borehole[rows]
+        return SeamRows(
+            borehole=borehole,
+            row=rows,
+            thickness=self.columns["thickness"][rows],
+            z_top=self.columns["z_top"][rows],
+            z_bottom=self.columns["z_bottom"][rows],
+            overburden_start=self.borehole_start[borehole],
+            overburden_stop=self.run_start[rows],
+        )
+
+    def overburden_rows(self, seam: SeamRows, i: int) -> np.ndarray:
+        """Corpus rows above occurrence i of a seam, nearest layer first."""
+        borehole = int(seam.borehole[i])
+        z_top = self.columns["z_top"]
+        if borehole in self.unordered_boreholes:
+            rows = np.arange(self.borehole_start[borehole], self.borehole_stop[borehole])
+            rows = rows[z_top[rows] < seam.z_top[i]]
+        else:
+            rows = np.arange(seam.overburden_start[i], seam.overburden_stop[i])
+        # Equal depths keep file order, as DataFrame.sort_values does.
+        return rows[np.argsort(-z_top[rows], kind="stable")]
+
+    def values(self, field: str, rows: np.ndarray) -> List[Optional[float]]:
+        return [None if np.isnan(v) else float(v) for v in self.columns[field][rows]]
+
+    def memo(self, key: Hashable, build: Callable[[], T]) -> T:
+        """Derived data cached for the lifetime of this index."""
+        with self._memo_lock:
+            if key in self._memo:
+                return self._memo[key]
+        value = build()
+        with self._memo_lock:
+            return self._memo.setdefault(key, value)
+
+
+def get_seam_index(files: Sequence[Path]) -> SeamIndex:
+    """Index for this ordered file list, rebuilt when any file changed."""
+    key = tuple(str(p) for p in files)
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+    if index is not None and index.is_current():
+        return index
+
+    # Only files whose signature changed are parsed again.
+    index = SeamIndex(files)
+    with _lock:
+        _indexes[key] = index
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def clear_seam_index() -> None:
+    with _lock:
+        _indexes.clear()
+        _parsed.clear()
@@ -14,7 +14,8 @@ from pathlib import Path
 import numpy as np
 
 from app.core.config import get_data_dir
-from app.services.coal_seam_parser import get_coal_seam_data, get_overburden_lithology, get_seam_stats
+from app.services.coal_seam_parser import SeamDataset, build_seam_dataset
+from app.services.compute_executor import run_compute
 from app.services.coords_loader import load_borehole_coords
 from app.services.interpolate import interpolate_from_points
 from app.services.contour_generator import generate_contours_simplified
@@ -28,7 +29,8 @@ def interpolate_seam_property(
     method: str = "kriging",
     grid_size: int = 50,
     contour_levels: int = 10,
-    include_contours: bool = True
+    include_contours: bool = True,
+    dataset: Optional[SeamDataset] = None
 ) -> Dict:
     """
     Interpolate a property for a specific coal seam.
@@ -42,6 +44,8 @@ def interpolate_seam_property(
         grid_size: Grid resolution
         contour_levels: Number of contour levels
         include_contours: Whether to generate contour line data
+        dataset: Seam dataset already built for seam_name; files are only
+            scanned when it is not given
 
     Returns:
         Dictionary with interpolation results:
@@ -62,36 +66,23 @@ def interpolate_seam_property(
         return {"error": f"Invalid property: {property}. Must be 'thickness' or 'burial_depth'"}
 
     # Get seam data
-    seam_data = get_coal_seam_data(files, coords, seam_name)
+    if dataset is None:
+        dataset = build_seam_dataset(files, coords, seam_name)
 
-    if seam_data["point_count"] < 3:
+    if dataset.point_count < 3:
         return {
-            "error": f"Not enough data points for seam '{seam_name}'. Found {seam_data['point_count']} boreholes, need at least 3.",
+            "error": f"Not enough data points for seam '{seam_name}'. Found {dataset.point_count} boreholes, need at least 3.",
             "seam_name": seam_name,
-            "point_count": seam_data["point_count"]
+            "point_count": dataset.point_count
         }
 
     # Extract points for interpolation
-    points = []
-    values = []
-    value_key = property  # "thickness" or "burial_depth"
+    pts, vals = dataset.property_points(property)
 
-    for point_data in seam_data["points"]:
-        x = point_data.get("x")
-        y = point_data.get("y")
-        value = point_data.get(value_key)
-
-        if x is not None and y is not None and value is not None:
-            points.append([x, y])
-            values.append(value)
-
-    if len(points) < 3:
+    if len(pts) < 3:
         return {"error": "Not enough valid points for interpolation"}
 
     # Perform interpolation
-    pts = np.array(points)
-    vals = np.array(values)
-
     interp_result = interpolate_from_points(
         points=pts,
         values=vals,
@@ -120,9 +111,9 @@ def interpolate_seam_property(
         "grid_size": grid_size,
         "bounds": bounds,
         "values": grid.tolist(),
-        "point_count": len(points),
+        "point_count": len(pts),
         "stats": stats,
-        "points": [{"x": float(p[0]), "y": float(p[1]), "value": float(v)} for p, v in zip(points, values)]
+        "points": [{"x": float(p[0]), "y": float(p[1]), "value": float(v)} for p, v in zip(pts, vals)]
     }
 
     # Generate contours if requested
@@ -163,8 +154,9 @@ def interpolate_seam_with_overburden(
     Returns:
         Comprehensive result dictionary with interpolation data and overburden info
     """
-    # Get seam stats first
-    stats = get_seam_stats(files, coords, seam_name)
+    # One dataset feeds the stats, both interpolations and the overburden
+    dataset = build_seam_dataset(files, coords, seam_name)
+    stats = dataset.stats()
 
     # Interpolate thickness
     thickness_result = interpolate_seam_property(
@@ -175,7 +167,8 @@ def interpolate_seam_with_overburden(
         method=method,
         grid_size=grid_size,
         contour_levels=contour_levels,
-        include_contours=True
+        include_contours=True,
+        dataset=dataset
     )
 
     # Interpolate burial depth
@@ -187,11 +180,12 @@ def interpolate_seam_with_overburden(
         method=method,
         grid_size=grid_size,
         contour_levels=contour_levels,
-        include_contours=True
+        include_contours=True,
+        dataset=dataset
     )
 
     # Get overburden data
-    overburden = get_overburden_lithology(files, coords, seam_name)
+    overburden = dataset.overburden()
 
     # Compile results
     result = {
@@ -229,6 +223,7 @@ def compare_interpolation_methods_for_seam(
     """
     methods = ["kriging", "idw", "linear", "nearest"]
     results = {}
+    dataset = build_seam_dataset(files, coords, seam_name)
 
     for method in methods:
         result = interpolate_seam_property(
@@ -238,7 +233,8 @@ def compare_interpolation_methods_for_seam(
             property=property,
             method=method,
             grid_size=grid_size,
-            include_contours=False  # No contours for comparison
+            include_contours=False,  # No contours for comparison
+            dataset=dataset
         )
         results[method] = result
 
@@ -269,6 +265,10 @@ async def get_seam_overburden(seam_name: str) -> Dict:
     """
     Compatibility helper for routes expecting an async overburden loader.
     """
+    return await run_compute(load_seam_overburden, seam_name)
+
+
+def load_seam_overburden(seam_name: str) -> Dict:
     data_dir = get_data_dir()
     if not data_dir.exists():
         return {"seam_name": seam_name, "boreholes": [], "borehole_count": 0}
@@ -279,4 +279,4 @@ async def get_seam_overburden(seam_name: str) -> Dict:
 
     coords = load_borehole_coords(coord_path)
     files = sorted([p for p in data_dir.glob("*.csv") if p.is_file() and p.name != "zuobiao.csv"])
-    return get_overburden_lithology(files, coords, seam_name)
+    return build_seam_dataset(files, coords, seam_name).overburden()
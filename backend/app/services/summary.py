@@ -4,10 +4,10 @@ from typing import Dict, List
 import numpy as np
 
 
-def summarize_grid(grid: List[List[float]]) -> Dict:
-    if not grid or not grid[0]:
+def summarize_grid(grid: List[List[float]] | np.ndarray) -> Dict:
+    arr = np.asarray(grid, dtype=float)
+    if arr.size == 0:
         return {"error": "empty grid"}
-    arr = np.array(grid, dtype=float)
     return {
         "min": float(np.min(arr)),
         "max": float(np.max(arr)),
@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+from datetime import datetime
+import functools
+import os
+from pathlib import Path
+import re
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+
+from app.core.config import get_data_dir
+
+# Request-scoped stage timing. TracingMiddleware opens a Trace per HTTP
+# request; services mark their work with `span("parse")` / `@traced(...)`.
+# Durations are summed per stage, exposed in the Server-Timing header and
+# aggregated into per-route histograms served by /api/metrics. Outside a
+# request (scripts, worker processes) spans are no-ops.
+#
+# Stage names in use: parse, normalize, interpolate, score, render,
+# serialize. A span nested in a span of the same stage is not counted twice.
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+BUCKETS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_open_stages: ContextVar[Tuple[str, ...]] = ContextVar("open_stages", default=())
+
+
+def tracing_enabled() -> bool:
+    return os.getenv("TRACING", "1").strip().lower() not in {"0", "false", "off"}
+
+
+class Trace:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}  # seconds
+        # Threads with an open span of this trace. Pool threads are shared
+        # between requests, so a thread only belongs to the trace while it
+        # is inside one of its spans.
+        self.threads: Dict[int, int] = {}  # thread ident -> open span depth
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def enter_thread(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            self.threads[ident] = self.threads.get(ident, 0) + 1
+
+    def exit_thread(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            depth = self.threads.get(ident, 0) - 1
+            if depth > 0:
+                self.threads[ident] = depth
+            else:
+                self.threads.pop(ident, None)
+
+    def active_threads(self) -> List[int]:
+        with self._lock:
+            return list(self.threads)
+
+    def server_timing(self, total_s: float) -> str:
+        with self._lock:
+            items = list(self.stages.items())
+        parts = [f"{stage};dur={seconds * 1000.0:.1f}" for stage, seconds in items]
+        parts.append(f"total;dur={total_s * 1000.0:.1f}")
+        return ", ".join(parts)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+class span:
+    """Time a block as `stage` of the current request; no-op without one."""
+
+    __slots__ = ("stage", "_trace", "_token", "_t0")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self._trace: Optional[Trace] = None
+
+    def __enter__(self) -> "span":
+        trace = _trace.get()
+        if trace is None:
+            return self
+        open_stages = _open_stages.get()
+        if self.stage in open_stages:
+            return self
+        trace.enter_thread()
+        self._trace = trace
+        self._token = _open_stages.set(open_stages + (self.stage,))
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._trace is None:
+            return
+        self._trace.add(self.stage, time.perf_counter() - self._t0)
+        self._trace.exit_thread()
+        _open_stages.reset(self._token)
+        self._trace = None
+
+
+def traced(stage: str) -> Callable[[F], F]:
+    """Decorator form of span()."""
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(stage):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+class TracedJSONResponse(JSONResponse):
+    """Default response class: JSON encoding is timed as the serialize stage."""
+
+    def render(self, content: Any) -> bytes:
+        with span("serialize"):
+            return super().render(content)
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_S) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        i = 0
+        while i < len(BUCKETS_S) and seconds > BUCKETS_S[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += seconds
+        self.count += 1
+
+
+_metrics_lock = threading.Lock()
+_request_hist: Dict[Tuple[str, str], _Histogram] = {}
+_stage_hist: Dict[Tuple[str, str, str], _Histogram] = {}
+_status_counts: Dict[Tuple[str, str, str], int] = {}
+
+
+def record_request(method: str, route: str, status: int, total_s: float, stages: Dict[str, float]) -> None:
+    with _metrics_lock:
+        _request_hist.setdefault((method, route), _Histogram()).observe(total_s)
+        for stage, seconds in stages.items():
+            _stage_hist.setdefault((method, route, stage), _Histogram()).observe(seconds)
+        key = (method, route, str(status))
+        _status_counts[key] = _status_counts.get(key, 0) + 1
+
+
+def reset_metrics() -> None:
+    with _metrics_lock:
+        _request_hist.clear()
+        _stage_hist.clear()
+        _status_counts.clear()
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{key}="{_label_value(value)}"' for key, value in labels.items())
+
+
+def _histogram_lines(name: str, labels: str, hist: _Histogram) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(BUCKETS_S + (float("inf"),), hist.counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+    lines.append(f"{name}_sum{{{labels}}} {hist.total:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {hist.count}")
+    return lines
+
+
+def render_prometheus() -> str:
+    """All request metrics in the Prometheus text exposition format (0.0.4)."""
+    with _metrics_lock:
+        requests = sorted(_request_hist.items())
+        stages = sorted(_stage_hist.items())
+        statuses = sorted(_status_counts.items())
+
+    lines = [
+        "# HELP backend_requests_total HTTP requests by route and status.",
+        "# TYPE backend_requests_total counter",
+    ]
+    for (method, route, status), count in statuses:
+        lines.append(f"backend_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+    lines += [
+        "# HELP backend_request_duration_seconds End-to-end request handling time.",
+        "# TYPE backend_request_duration_seconds histogram",
+    ]
+    for (method, route), hist in requests:
+        lines += _histogram_lines("backend_request_duration_seconds", _labels(method=method, route=route), hist)
+    lines += [
+        "# HELP backend_stage_duration_seconds Time per request spent in each traced stage.",
+        "# TYPE backend_stage_duration_seconds histogram",
+    ]
+    for (method, route, stage), hist in stages:
+        lines += _histogram_lines(
+            "backend_stage_duration_seconds", _labels(method=method, route=route, stage=stage), hist
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _env_float(name: str) -> Optional[float]:
+    raw = os.getenv(name, "").strip()
+    try:
+        return float(raw) if raw else None
+    except ValueError:
+        return None
+
+
+def get_profile_threshold_ms() -> Optional[float]:
+    """TRACE_PROFILE_SLOW_MS enables the sampling profiler; unset means off."""
+    return _env_float("TRACE_PROFILE_SLOW_MS")
+
+
+def get_profile_dir() -> Path:
+    raw = os.getenv("TRACE_PROFILE_DIR", "").strip()
+    return Path(raw) if raw else get_data_dir() / "_profiles"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of the threads working on one trace.
+
+    Threads belong to the trace while they are inside one of its spans, so
+    the request thread and any compute-executor threads it uses are
+    covered, but not other requests running on the same pool threads.
+    Samples are kept as collapsed stacks ("a;b;c count"), the input format
+    of flamegraph tools.
+    """
+
+    def __init__(self, trace: Trace, interval_s: float) -> None:
+        self.trace = trace
+        self.interval_s = max(0.001, interval_s)
+        self.samples: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="trace-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            frames = sys._current_frames()
+            for ident in self.trace.active_threads():
+                frame = frames.get(ident)
+                if frame is None or ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def dump(self, method: str, route: str, total_s: float) -> Optional[Path]:
+        if not self.samples:
+            return None
+        out_dir = get_profile_dir()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        path = out_dir / f"{stamp}_{method}_{slug}_{int(total_s * 1000)}ms.folded"
+        lines = [f"{stack} {count}" for stack, count in sorted(self.samples.items())]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class TracingMiddleware:
+    """ASGI middleware: per-request Trace, Server-Timing header and metrics."""
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not tracing_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        token = _trace.set(trace)
+        status = {"code": 500}
+        profiler = None
+        threshold_ms = get_profile_threshold_ms()
+        if threshold_ms is not None:
+            profiler = SamplingProfiler(trace, (_env_float("TRACE_PROFILE_INTERVAL_MS") or 5.0) / 1000.0)
+            profiler.start()
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = int(message["status"])
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", trace.server_timing(time.perf_counter() - trace.started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _trace.reset(token)
+            total_s = time.perf_counter() - trace.started
+            method = scope.get("method", "GET")
+            route = _route_template(scope)
+            with trace._lock:
+                stages = dict(trace.stages)
+            record_request(method, route, status["code"], total_s, stages)
+            if profiler is not None:
+                profiler.stop()
+                if total_s * 1000.0 >= threshold_ms:
+                    try:
+                        profiler.dump(method, route, total_s)
+                    except OSError:
+                        pass
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import base64
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import zlib
+
+import numpy as np
+
+from app.services.tracing import traced
+
+# Point-cloud writers for geomodel artifacts. Arrays go to disk straight from
+# NumPy buffers: legacy .vtk as BINARY (big-endian, as the format requires) and
+# .vtp with all DataArrays in one <AppendedData> block, optionally compressed
+# with vtkZLibDataCompressor and either raw or base64 encoded.
+
+VTP_BLOCK_SIZE = 1 << 16
+VTP_ZLIB_LEVEL = 1  # favour write speed; dense surfaces are written per job
+
+_VTK_TYPES = {
+    np.dtype("float32"): "Float32",
+    np.dtype("float64"): "Float64",
+    np.dtype("int32"): "Int32",
+    np.dtype("int64"): "Int64",
+    np.dtype("uint8"): "UInt8",
+}
+_LEGACY_TYPES = {
+    np.dtype("float32"): "float",
+    np.dtype("float64"): "double",
+    np.dtype("int32"): "int",
+}
+
+
+def _as_points(points: np.ndarray) -> np.ndarray:
+    arr = np.asarray(points, dtype=np.float32)
+    if arr.ndim != 2 or arr.shape[1] != 3:
+        raise ValueError("points must have shape (n, 3)")
+    return arr
+
+
+@traced("serialize")
+def write_legacy_polydata(
+    file_path: Path,
+    points: np.ndarray,
+    point_data: Optional[Dict[str, np.ndarray]] = None,
+    title: str = "Geomodel Point Cloud",
+    binary: bool = True,
+) -> None:
+    """Legacy VTK POLYDATA with one vertex cell per point."""
+    pts = _as_points(points)
+    n = len(pts)
+    cells = np.column_stack([np.ones(n, dtype=np.int32), np.arange(n, dtype=np.int32)])
+    kind = "BINARY" if binary else "ASCII"
+
+    with Path(file_path).open("wb") as fh:
+
+        def _header(text: str) -> None:
+            fh.write(text.encode("ascii") + b"\n")
+
+        def _block(arr: np.ndarray, fmt: str) -> None:
+            if binary:
+                fh.write(arr.astype(arr.dtype.newbyteorder(">"), copy=False).tobytes())
+                fh.write(b"\n")
+            elif arr.size:
+                np.savetxt(fh, arr.reshape(len(arr), -1), fmt=fmt)
+
+        _header(f"# vtk DataFile Version 3.0\n{title}\n{kind}\nDATASET POLYDATA")
+        _header(f"POINTS {n} float")
+        _block(pts, "%.6f")
+        _header(f"VERTICES {n} {n * 2}")
+        _block(cells, "%d")
+        if point_data:
+            _header(f"POINT_DATA {n}")
+            for name, values in point_data.items():
+                arr = np.asarray(values)
+                arr = arr.astype(np.float32) if arr.dtype.kind == "f" else arr.astype(np.int32)
+                _header(f"SCALARS {name} {_LEGACY_TYPES[arr.dtype]} 1\nLOOKUP_TABLE default")
+                _block(arr, "%.6f" if arr.dtype.kind == "f" else "%d")
+
+
+def _encode_array(arr: np.ndarray, compress: bool, b64: bool) -> bytes:
+    """One appended DataArray payload with its UInt64 header."""
+    raw = np.ascontiguousarray(arr).astype(arr.dtype.newbyteorder("<"), copy=False).tobytes()
+    if not compress:
+        header = np.array([len(raw)], dtype="<u8").tobytes()
+        return base64.b64encode(header + raw) if b64 else header + raw
+
+    blocks = [raw[i : i + VTP_BLOCK_SIZE] for i in range(0, len(raw), VTP_BLOCK_SIZE)]
+    compressed = [zlib.compress(block, VTP_ZLIB_LEVEL) for block in blocks]
+    last = len(blocks[-1]) % VTP_BLOCK_SIZE if blocks else 0
+    header = np.array(
+        [len(blocks), VTP_BLOCK_SIZE, last, *[len(c) for c in compressed]], dtype="<u8"
+    ).tobytes()
+    body = b"".join(compressed)
+    if b64:
+        # Header and body are encoded separately, as vtkXMLDataParser expects.
+        return base64.b64encode(header) + base64.b64encode(body)
+    return header + body
+
+
+@traced("serialize")
+def write_vtp_polydata(
+    file_path: Path,
+    points: np.ndarray,
+    point_data: Optional[Dict[str, np.ndarray]] = None,
+    encoding: str = "raw",
+    compress: bool = True,
+) -> None:
+    """VTK XML PolyData (vertex cells) with appended, optionally zlib-compressed arrays."""
+    if encoding not in {"raw", "base64"}:
+        raise ValueError("encoding must be 'raw' or 'base64'")
+    pts = _as_points(points)
+    n = len(pts)
+    b64 = encoding == "base64"
+    arrays: List[Tuple[str, str, np.ndarray, int]] = []  # (section, name, data, components)
+    for name, values in (point_data or {}).items():
+        arrays.append(("PointData", name, np.asarray(values, dtype=np.float32).reshape(-1), 1))
+    arrays.append(("Points", "Points", pts, 3))
+    arrays.append(("Verts", "connectivity", np.arange(n, dtype=np.int32), 1))
+    arrays.append(("Verts", "offsets", np.arange(1, n + 1, dtype=np.int32), 1))
+
+    payloads: List[bytes] = []
+    tags: Dict[str, List[str]] = {"PointData": [], "Points": [], "Verts": []}
+    offset = 0
+    for section, name, data, components in arrays:
+        payload = _encode_array(data, compress=compress, b64=b64)
+        comp_attr = f' NumberOfComponents="{components}"' if components > 1 else ""
+        tags[section].append(
+            f'        <DataArray type="{_VTK_TYPES[data.dtype]}" Name="{name}"{comp_attr} '
+            f'format="appended" offset="{offset}"/>'
+        )
+        payloads.append(payload)
+        offset += len(payload)
+
+    scalars = next((name for section, name, _, _ in arrays if section == "PointData"), None)
+    compressor = ' compressor="vtkZLibDataCompressor"' if compress else ""
+    lines = [
+        '<?xml version="1.0"?>',
+        f'<VTKFile type="PolyData" version="1.0" byte_order="LittleEndian" header_type="UInt64"{compressor}>',
+        "  <PolyData>",
+        f'    <Piece NumberOfPoints="{n}" NumberOfVerts="{n}" NumberOfLines="0" NumberOfStrips="0" NumberOfPolys="0">',
+        f'      <PointData Scalars="{scalars}">' if scalars else "      <PointData>",
+        *tags["PointData"],
+        "      </PointData>",
+        "      <Points>",
+        *tags["Points"],
+        "      </Points>",
+        "      <Verts>",
+        *tags["Verts"],
+        "      </Verts>",
+        "    </Piece>",
+        "  </PolyData>",
+        f'  <AppendedData encoding="{encoding}">',
+    ]
+    with Path(file_path).open("wb") as fh:
+        fh.write(("\n".join(lines) + "\n   _").encode("utf-8"))
+        for payload in payloads:
+            fh.write(payload)
+        fh.write(b"\n  </AppendedData>\n</VTKFile>\n")
@@ -1,71 +1,89 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Any, Dict, Optional, Sequence
 
+import numpy as np
 
-def _face_index(value: float, min_v: float, max_v: float, count: int) -> int:
-    if count <= 1:
-        return 0
-    span = max_v - min_v
-    if span <= 0:
-        return 0
-    ratio = (value - min_v) / span
-    idx = int(ratio * count)
-    if idx == count:
-        idx = count - 1
-    return max(0, min(count - 1, idx))
+from app.services.workface_raster import grid_axes, rasterize_workfaces
+
+
+def _face_indices(values: np.ndarray, min_v: float, max_v: float, count: int) -> np.ndarray:
+    """Equal-width band index of each coordinate along one grid axis."""
+    if count <= 1 or max_v - min_v <= 0:
+        return np.zeros(len(values), dtype=np.int64)
+    ratio = (values - min_v) / (max_v - min_v)
+    return np.clip(np.floor(ratio * count), 0, count - 1).astype(np.int64)
+
+
+def workface_label_map(workfaces: Sequence[Dict[str, Any]], bounds: Dict, rows: int, cols: int) -> np.ndarray:
+    """
+    (rows, cols) index of the workface containing each cell, -1 outside all.
+
+    Workfaces are parse_workface_file items (polygon or rect); where faces
+    overlap the later one wins. The raster comes from the workface_raster
+    cache; the returned array is a writable copy.
+    """
+    return rasterize_workfaces(workfaces, bounds, rows, cols).copy()
 
 
 def compute_workface_adjusted_grid(
-    grid: List[List[float]],
+    grid: Sequence[Sequence[float]] | np.ndarray,
     bounds: Dict,
     axis: str = "x",
     count: int = 3,
     direction: str = "ascending",
     mode: str = "decrease",
     decay: float = 0.08,
+    workfaces: Optional[Sequence[Dict[str, Any]]] = None,
 ) -> Dict:
-    rows = len(grid)
-    cols = len(grid[0]) if rows else 0
-    if rows == 0 or cols == 0:
-        return {"error": "empty grid"}
-
-    min_x = bounds["min_x"]
-    max_x = bounds["max_x"]
-    min_y = bounds["min_y"]
-    max_y = bounds["max_y"]
+    """
+    Apply a per-face decay factor to a grid.
 
-    dx = (max_x - min_x) / (cols - 1) if cols > 1 else 0
-    dy = (max_y - min_y) / (rows - 1) if rows > 1 else 0
-
-    face_map = [[0 for _ in range(cols)] for _ in range(rows)]
-    adjusted = [[0.0 for _ in range(cols)] for _ in range(rows)]
-
-    for i in range(rows):
-        y = min_y + i * dy
-        for j in range(cols):
-            x = min_x + j * dx
-            value = x if axis == "x" else y
-            min_v = min_x if axis == "x" else min_y
-            max_v = max_x if axis == "x" else max_y
-            idx = _face_index(value, min_v, max_v, count)
-            if direction == "descending":
-                idx = (count - 1) - idx
-            face_map[i][j] = idx
-
-            if mode == "increase":
-                factor = 1 + decay * idx
-            else:
-                factor = max(0.0, 1 - decay * idx)
+    Without `workfaces` the grid is split into `count` equal bands along
+    `axis`. With parsed workfaces each cell takes the index of the polygon
+    containing it; cells outside every face keep face -1 and factor 1.
+    `face_map` and `adjusted` are NumPy arrays (see workface_result_to_json).
+    """
+    values = np.asarray(grid, dtype=float)
+    if values.ndim != 2 or values.size == 0:
+        return {"error": "empty grid"}
+    rows, cols = values.shape
 
-            adjusted[i][j] = grid[i][j] * factor
+    if workfaces:
+        count = len(workfaces)
+        labels = workface_label_map(workfaces, bounds, rows, cols)
+        face_map = np.where(labels >= 0, (count - 1) - labels, -1) if direction == "descending" else labels
+        idx = np.maximum(face_map, 0)
+        factor = 1 + decay * idx if mode == "increase" else np.maximum(0.0, 1 - decay * idx)
+        adjusted = values * np.where(face_map >= 0, factor, 1.0)
+    else:
+        xs, ys = grid_axes(bounds, rows, cols)
+        if axis == "x":
+            idx = _face_indices(xs, float(bounds["min_x"]), float(bounds["max_x"]), count)
+        else:
+            idx = _face_indices(ys, float(bounds["min_y"]), float(bounds["max_y"]), count)
+        if direction == "descending":
+            idx = (count - 1) - idx
+        factor = 1 + decay * idx if mode == "increase" else np.maximum(0.0, 1 - decay * idx)
+        # One factor per column (axis x) or row (axis y), broadcast over the grid.
+        if axis == "x":
+            face_map = np.broadcast_to(idx, (rows, cols)).copy()
+            adjusted = values * factor[None, :]
+        else:
+            face_map = np.broadcast_to(idx[:, None], (rows, cols)).copy()
+            adjusted = values * factor[:, None]
 
     return {
-        "axis": axis,
+        "axis": "polygon" if workfaces else axis,
         "count": count,
         "direction": direction,
         "mode": mode,
         "decay": decay,
         "face_map": face_map,
         "adjusted": adjusted,
-    }
\ No newline at end of file
+    }
+
+
+def workface_result_to_json(result: Dict) -> Dict:
+    """Route payload: arrays of compute_workface_adjusted_grid as nested lists."""
+    return {key: value.tolist() if isinstance(value, np.ndarray) else value for key, value in result.items()}
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Workface polygons rasterized onto the interpolation grid. A label map holds,
+# per cell, the index of the face containing the cell centre (-1 outside all;
+# where faces overlap the later one wins), using the rule of the reference
+# points_in_polygon: even-odd inside, plus every cell centre lying on an edge
+# (within boundary_tolerance), so faces include their max edges. Label maps
+# are cached per (polygon set, bounds, rows, cols), so every metric grid on
+# the same grid reuses one raster, and face_statistics reduces any grid over
+# all faces in a single pass.
+
+MAX_RASTERS = 32
+BOUNDARY_RTOL = 1e-9
+
+_rasters: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def grid_axes(bounds: Dict, rows: int, cols: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Cell x (cols,) and y (rows,) coordinates, matching grid_to_csv_bytes."""
+    min_x, max_x = float(bounds["min_x"]), float(bounds["max_x"])
+    min_y, max_y = float(bounds["min_y"]), float(bounds["max_y"])
+    dx = (max_x - min_x) / (cols - 1) if cols > 1 else 0
+    dy = (max_y - min_y) / (rows - 1) if rows > 1 else 0
+    return min_x + np.arange(cols) * dx, min_y + np.arange(rows) * dy
+
+
+def workface_polygon(face: Dict[str, Any]) -> List[List[float]]:
+    """Vertices of a parse_workface_file item; rect items become their 4 corners."""
+    if face.get("type") == "polygon" and len(face.get("points") or []) >= 3:
+        return face["points"]
+    b = face["bounds"]
+    return [[b["min_x"], b["min_y"]], [b["max_x"], b["min_y"]], [b["max_x"], b["max_y"]], [b["min_x"], b["max_y"]]]
+
+
+def boundary_tolerance(pts: np.ndarray) -> float:
+    """Distance within which a point counts as lying on an edge of `pts`."""
+    return BOUNDARY_RTOL * max(1.0, float(np.abs(pts).max()))
+
+
+def edge_interval(
+    y: np.ndarray, x0: np.ndarray, y0: np.ndarray, x1: np.ndarray, y1: np.ndarray, tol: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Closed x interval [lo, hi] of edges (x0, y0)-(x1, y1) at height y.
+
+    `near` marks edges whose y extent (widened by tol) contains y; a
+    horizontal edge spans its x extent, any other edge the point at y.
+    """
+    ylo, yhi = np.minimum(y0, y1), np.maximum(y0, y1)
+    near = (y >= ylo - tol) & (y <= yhi + tol)
+    flat = y0 == y1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_at = x0 + (np.clip(y, ylo, yhi) - y0) * (x1 - x0) / np.where(flat, 1.0, y1 - y0)
+    lo = np.where(flat, np.minimum(x0, x1), x_at) - tol
+    hi = np.where(flat, np.maximum(x0, x1), x_at) + tol
+    return near, lo, hi
+
+
+def points_in_polygon(x: np.ndarray, y: np.ndarray, polygon: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    Even-odd test of points (x, y) against a polygon, one vectorized pass per edge.
+
+    Points on an edge (within boundary_tolerance) are inside, so adjacent
+    faces both contain their shared edge and a face keeps its max edges.
+    Reference implementation of the rule polygon_mask rasterizes; it costs
+    O(points * edges) and is kept for checking polygon_mask against.
+    """
+    pts = np.asarray(polygon, dtype=float)
+    tol = boundary_tolerance(pts)
+    px, py = pts[:, 0], pts[:, 1]
+    qx, qy = np.roll(px, -1), np.roll(py, -1)
+    inside = np.zeros(np.broadcast(x, y).shape, dtype=bool)
+    on_edge = np.zeros_like(inside)
+    for x0, y0, x1, y1 in zip(px, py, qx, qy):
+        near, lo, hi = edge_interval(y, x0, y0, x1, y1, tol)
+        on_edge |= near & (x >= lo) & (x <= hi)
+        if y0 == y1:
+            continue
+        crosses = (y0 > y) != (y1 > y)
+        x_cross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+        inside ^= crosses & (x < x_cross)
+    return inside | on_edge
+
+
+def polygon_mask(polygon: Sequence[Sequence[float]], xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """
+    (len(ys), len(xs)) mask of a polygon by scanline edge crossings.
+
+    Each row's edge crossings are sorted and paired into even-odd spans
+    [c0, c1), [c2, c3), ...; each edge also contributes the closed interval
+    it occupies on the row (edge_interval), so cells on the boundary are
+    inside. Intervals become column ranges via searchsorted on the
+    (ascending) x axis and are filled by accumulating +1/-1 marks, so the
+    cost is O(rows * edges + cells) rather than O(cells * edges).
+    """
+    mask = np.zeros((len(ys), len(xs)), dtype=bool)
+    pts = np.asarray(polygon, dtype=float)
+    if pts.ndim != 2 or len(pts) < 3:
+        return mask
+    tol = boundary_tolerance(pts)
+    x0, y0 = pts[:, 0], pts[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+
+    # Only rows within the polygon's y extent can touch it.
+    r0 = int(np.searchsorted(ys, y0.min() - tol, side="left"))
+    r1 = int(np.searchsorted(ys, y0.max() + tol, side="right"))
+    if r0 >= r1:
+        return mask
+    y = ys[r0:r1, None]
+    starts, stops = [], []
+
+    near, lo, hi = edge_interval(y, x0, y0, x1, y1, tol)
+    row, edge = np.nonzero(near)
+    starts.append((row, np.searchsorted(xs, lo[row, edge], side="left")))
+    stops.append((row, np.searchsorted(xs, hi[row, edge], side="right")))
+
+    sloped = y0 != y1
+    x0, y0, x1, y1 = x0[sloped], y0[sloped], x1[sloped], y1[sloped]
+    crosses = (y0 > y) != (y1 > y)
+    pairs = int(crosses.sum(axis=1).max()) // 2 if len(x0) else 0
+    if pairs:
+        with np.errstate(invalid="ignore"):
+            # Same expression as points_in_polygon, so both agree on cells next to an edge.
+            x_cross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+        x_cross = np.sort(np.where(crosses, x_cross, np.inf), axis=1)
+        lo = x_cross[:, 0 : 2 * pairs : 2]
+        hi = x_cross[:, 1 : 2 * pairs : 2]
+        row, span = np.nonzero(np.isfinite(hi))
+        starts.append((row, np.searchsorted(xs, lo[row, span], side="left")))
+        stops.append((row, np.searchsorted(xs, hi[row, span], side="left")))
+
+    # Intervals may overlap, so a cell is covered where the running count is positive.
+    marks = np.zeros((r1 - r0, len(xs) + 1), dtype=np.int32)
+    for row, col in starts:
+        np.add.at(marks, (row, col), 1)
+    for row, col in stops:
+        np.add.at(marks, (row, col), -1)
+    mask[r0:r1] = np.cumsum(marks[:, :-1], axis=1) > 0
+    return mask
+
+
+def polygon_set_key(polygons: Sequence[Sequence[Sequence[float]]]) -> str:
+    digest = hashlib.sha1()
+    for polygon in polygons:
+        pts = np.ascontiguousarray(polygon, dtype=np.float64)
+        digest.update(np.int64(pts.size).tobytes())
+        digest.update(pts.tobytes())
+    return digest.hexdigest()
+
+
+def rasterize_polygons(
+    polygons: Sequence[Sequence[Sequence[float]]], bounds: Dict, rows: int, cols: int
+) -> np.ndarray:
+    """
+    Cached (rows, cols) int64 label map of `polygons`; -1 outside all.
+
+    The returned array is shared with the cache and read-only.
+    """
+    key = (
+        polygon_set_key(polygons),
+        tuple(float(bounds[k]) for k in ("min_x", "max_x", "min_y", "max_y")),
+        int(rows),
+        int(cols),
+    )
+    with _lock:
+        labels = _rasters.get(key)
+        if labels is not None:
+            _rasters.move_to_end(key)
+            return labels
+
+    xs, ys = grid_axes(bounds, rows, cols)
+    labels = np.full((rows, cols), -1, dtype=np.int64)
+    for k, polygon in enumerate(polygons):
+        labels[polygon_mask(polygon, xs, ys)] = k
+    labels.setflags(write=False)
+
+    with _lock:
+        _rasters[key] = labels
+        _rasters.move_to_end(key)
+        while len(_rasters) > MAX_RASTERS:
+            _rasters.popitem(last=False)
+    return labels
+
+
+def rasterize_workfaces(workfaces: Sequence[Dict[str, Any]], bounds: Dict, rows: int, cols: int) -> np.ndarray:
+    """rasterize_polygons for parse_workface_file items (polygon or rect)."""
+    return rasterize_polygons([workface_polygon(face) for face in workfaces], bounds, rows, cols)
+
+
+def clear_raster_cache() -> None:
+    with _lock:
+        _rasters.clear()
+
+
+def face_statistics(
+    grid: Sequence[Sequence[float]] | np.ndarray,
+    labels: np.ndarray,
+    count: int,
+    percentiles: Sequence[float] = (10, 50, 90),
+) -> List[Dict[str, Optional[float]]]:
+    """
+    Per-face cells/min/max/mean/std/percentiles of `grid` over a label map.
+
+    One bincount pass gives counts, sums and squared deviations for every
+    face; one lexsort by (label, value) gives min, max and percentiles
+    (linear interpolation, as np.percentile). Non-finite cells and cells
+    outside [0, count) are ignored; empty faces report cells 0 and None.
+    """
+    values = np.asarray(grid, dtype=float).ravel()
+    lab = np.asarray(labels).ravel()
+    if values.shape != lab.shape:
+        raise ValueError("grid and labels must have the same shape")
+    keep = (lab >= 0) & (lab < count) & np.isfinite(values)
+    v, lab = values[keep], lab[keep].astype(np.int64)
+
+    n = np.bincount(lab, minlength=count)
+    safe_n = np.maximum(n, 1)
+    mean = np.bincount(lab, weights=v, minlength=count) / safe_n
+    std = np.sqrt(np.bincount(lab, weights=(v - mean[lab]) ** 2, minlength=count) / safe_n)
+
+    # One trailing pad value keeps the gathers below in range for empty faces.
+    sorted_v = np.append(v[np.lexsort((v, lab))], 0.0)
+    starts = np.concatenate(([0], np.cumsum(n)[:-1]))
+    last = starts + np.maximum(n - 1, 0)
+
+    columns = {"min": sorted_v[starts], "max": sorted_v[last], "mean": mean, "std": std}
+    for pct in percentiles:
+        pos = starts + np.maximum(n - 1, 0) * (float(pct) / 100.0)
+        below = np.floor(pos).astype(np.int64)
+        above = np.minimum(below + 1, last)
+        columns[f"p{float(pct):g}"] = sorted_v[below] + (sorted_v[above] - sorted_v[below]) * (pos - below)
+
+    stats: List[Dict[str, Optional[float]]] = []
+    for k in range(count):
+        item: Dict[str, Optional[float]] = {"face": k, "cells": int(n[k])}
+        for name, column in columns.items():
+            item[name] = float(column[k]) if n[k] else None
+        stats.append(item)
+    return stats
@@ -100,6 +100,10 @@ def _write_spatial_seam_files(base_dir: Path, seam_name: str = "16-3煤") -> Non
         (base_dir / f"{borehole}.csv").write_text(borehole_csv, encoding="utf-8")
 
 
+def _wait_for_run(run_id: str):
+    return client.get(f"/api/algorithm-validation/result/{run_id}", params={"wait": 30})
+
+
 def test_validation_run_and_result():
     run_resp = client.post("/api/algorithm-validation/run", json=_sample_run_payload())
     assert run_resp.status_code == 200
@@ -108,7 +112,7 @@ def test_validation_run_and_result():
     assert "run_id" in run_data
     assert run_data["status"] in {"running", "completed"}
 
-    result_resp = client.get(f"/api/algorithm-validation/result/{run_data['run_id']}")
+    result_resp = _wait_for_run(run_data["run_id"])
     assert result_resp.status_code == 200
 
     result = result_resp.json()
@@ -157,7 +161,7 @@ def test_validation_run_uses_real_label_stream(tmp_path, monkeypatch):
     assert run_resp.status_code == 200
     run_id = run_resp.json()["run_id"]
 
-    result_resp = client.get(f"/api/algorithm-validation/result/{run_id}")
+    result_resp = _wait_for_run(run_id)
     assert result_resp.status_code == 200
     result = result_resp.json()
     assert result["evaluation_inputs"]["source"] == f"{dataset_id}_labels.csv"
@@ -165,6 +169,84 @@ def test_validation_run_uses_real_label_stream(tmp_path, monkeypatch):
     assert result["evaluation_inputs"]["y_prob"] == [0.9, 0.2, 0.8, 0.3]
 
 
+def test_validation_run_deduplicates_identical_payloads(tmp_path, monkeypatch):
+    dataset_id = "site_c03"
+    _write_dataset_files(tmp_path, dataset_id)
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+
+    payload = _sample_run_payload()
+    payload["dataset_id"] = dataset_id
+    payload["strata"] = []
+
+    first = client.post("/api/algorithm-validation/run", json=payload).json()
+    assert first["deduplicated"] is False
+    assert _wait_for_run(first["run_id"]).json()["status"] == "completed"
+
+    second = client.post("/api/algorithm-validation/run", json=payload).json()
+    assert second["deduplicated"] is True
+    assert second["run_id"] == first["run_id"]
+    assert second["status"] == "completed"
+
+    # Changing the dataset on disk invalidates the content key.
+    labels = tmp_path / f"{dataset_id}_labels.csv"
+    labels.write_text(labels.read_text(encoding="utf-8") + "1,0.7\n", encoding="utf-8")
+    third = client.post("/api/algorithm-validation/run", json=payload).json()
+    assert third["deduplicated"] is False
+    assert third["run_id"] != first["run_id"]
+    assert _wait_for_run(third["run_id"]).status_code == 200
+
+
+def test_validation_run_reports_missing_dataset_synchronously(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    payload = _sample_run_payload()
+    payload["dataset_id"] = "missing_site"
+    payload["strata"] = []
+
+    resp = client.post("/api/algorithm-validation/run", json=payload)
+    assert resp.status_code == 404
+
+
+def test_failed_run_result_keeps_its_status_code(tmp_path, monkeypatch):
+    from fastapi import HTTPException
+
+    from app.routes import algorithm_validation
+
+    def fail(*args, **kwargs):
+        raise HTTPException(status_code=400, detail="invalid strata")
+
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(algorithm_validation, "_build_validation_result", fail)
+    payload = _sample_run_payload()
+    payload["params"]["bri"]["time_window_days"] = 11  # not deduplicated against other runs
+    run_id = client.post("/api/algorithm-validation/run", json=payload).json()["run_id"]
+
+    resp = _wait_for_run(run_id)
+    assert resp.status_code == 400
+    assert resp.json()["status"] == "failed"
+    assert resp.json()["error_status"] == 400
+
+
+def test_job_finishing_between_state_read_and_check_is_not_reported_lost(tmp_path, monkeypatch):
+    from app.services import job_queue
+
+    queue = job_queue.JobQueue(lambda: tmp_path, max_workers=1)
+    state, _ = queue.submit("key", lambda job_id, progress: None)
+    assert queue.wait(state["job_id"], timeout=5)["status"] == "completed"
+
+    # A poll that read "running" just before _run wrote the terminal state
+    # and dropped its future.
+    read_json = job_queue._read_json
+    stale = [dict(read_json(tmp_path / job_queue.JOBS_DIRNAME / f"{state['job_id']}.json"), status="running")]
+    monkeypatch.setattr(job_queue, "_read_json", lambda path: stale.pop() if stale else read_json(path))
+    result = queue.get_state(state["job_id"])
+    assert result["status"] == "completed" and "error_status" not in result
+
+    # A job whose owner went away is still reported as interrupted.
+    path = tmp_path / job_queue.JOBS_DIRNAME / f"{state['job_id']}.json"
+    path.write_text(json.dumps({**read_json(path), "status": "running"}), encoding="utf-8")
+    assert queue.get_state(state["job_id"])["error_status"] == 500
+
+
 def test_validation_evaluate_metrics():
     payload = {
         "y_true": [1, 0, 1, 0, 1, 0],
@@ -186,6 +268,7 @@ def test_validation_export_package():
     run_resp = client.post("/api/algorithm-validation/run", json=_sample_run_payload())
     assert run_resp.status_code == 200
     run_id = run_resp.json()["run_id"]
+    assert _wait_for_run(run_id).status_code == 200
 
     export_resp = client.get(f"/api/algorithm-validation/export/{run_id}")
     assert export_resp.status_code == 200
@@ -268,3 +351,59 @@ def test_validation_spatial_overview_includes_real_label_stream(tmp_path, monkey
     assert eval_inputs["mode"] == "real_label_stream"
     assert eval_inputs["y_true"] == [1, 0, 1, 0]
     assert eval_inputs["y_prob"] == [0.82, 0.21, 0.76, 0.33]
+
+
+def test_resolve_mech_params_frame_applies_fallback_tiers():
+    import pandas as pd
+
+    from app.routes.algorithm_validation import _EMERGENCY_PARAMS, _resolve_mech_params_frame
+
+    strata = pd.DataFrame(
+        {
+            "name": ["泥岩", "泥岩", "未知岩层"],
+            "density": [2450.0, None, None],
+            "cohesion": [None, None, None],
+        },
+        index=[7, 8, 9],
+    )
+
+    resolved = _resolve_mech_params_frame(strata)
+
+    assert list(resolved.index) == [7, 8, 9]
+    assert list(resolved.columns) == list(_EMERGENCY_PARAMS)
+    assert resolved.loc[7, "density"] == 2450.0
+    assert resolved.notna().all().all()
+    # Layers sharing a lithology resolve to the same fallback values.
+    assert resolved.loc[8, "cohesion"] == resolved.loc[7, "cohesion"]
+
+
+def test_validation_spatial_overview_reuses_cached_indicators(tmp_path, monkeypatch):
+    import os
+
+    seam_name = "16-3煤"
+    _write_spatial_seam_files(tmp_path, seam_name=seam_name)
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    url = "/api/algorithm-validation/spatial-overview"
+    params = {"seam_name": seam_name, "resolution": 30, "method": "idw"}
+
+    first = client.get(url, params=params).json()
+    assert first["cache"]["boreholes_computed"] == 4
+
+    again = client.get(url, params=params).json()
+    assert again["cache"] == {"boreholes_cached": 4, "boreholes_computed": 0, "grids_cached": 4}
+    assert again["grids"] == first["grids"]
+
+    # Changing weights only re-interpolates the mpi grid.
+    reweighted = client.get(url, params={**params, "weight_rsi": 0.8, "weight_bri": 0.1, "weight_asi": 0.1}).json()
+    assert reweighted["cache"]["boreholes_computed"] == 0
+    assert reweighted["cache"]["grids_cached"] == 3
+    assert reweighted["grids"]["rsi"] == first["grids"]["rsi"]
+
+    # Editing a borehole file invalidates only that borehole.
+    path = tmp_path / "BH02.csv"
+    path.write_text(path.read_text(encoding="utf-8").replace("2,泥岩,12", "2,泥岩,20"), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    edited = client.get(url, params=params).json()
+    assert edited["cache"]["boreholes_computed"] == 1
+    assert edited["cache"]["boreholes_cached"] == 3
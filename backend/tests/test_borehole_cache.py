@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from app.services import borehole_cache
+from app.services.csv_loader import read_csv_robust
+
+
+def _write_borehole(path, rows: str) -> None:
+    content = "序号,名称,厚度/m,弹性模量/Gpa\n" + rows
+    path.write_bytes(content.encode("gbk"))
+
+
+def test_cached_table_matches_fresh_parse(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    source = tmp_path / "B1.csv"
+    _write_borehole(source, "1,泥岩,5.2,12\n2,煤,3.1,\n3,,2.0,30\n")
+
+    first = borehole_cache.read_borehole_csv(source)
+    borehole_cache._digest_memo.clear()
+    second = borehole_cache.read_borehole_csv(source)
+
+    expected = read_csv_robust(source)
+    assert first.equals(expected)
+    assert second.equals(expected)
+    assert list(second.dtypes) == list(expected.dtypes)
+
+    meta = borehole_cache.read_cache_meta(source)
+    assert meta is not None
+    assert meta["delimiter"] == ","
+    assert meta["rows"] == 3
+
+
+def test_cache_rebuilds_when_source_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    source = tmp_path / "B2.csv"
+    _write_borehole(source, "1,泥岩,5.2,12\n")
+    assert len(borehole_cache.read_borehole_csv(source)) == 1
+
+    _write_borehole(source, "1,泥岩,5.2,12\n2,砂岩,4.0,20\n")
+    df = borehole_cache.read_borehole_csv(source)
+    assert df["名称"].tolist() == ["泥岩", "砂岩"]
+
+    entries = list(borehole_cache.get_cache_root().glob("v*-*"))
+    assert len(entries) == 1
+
+
+def test_entries_of_deleted_sources_are_swept(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    kept, deleted = tmp_path / "B3.csv", tmp_path / "B4.csv"
+    _write_borehole(kept, "1,泥岩,5.2,12\n")
+    _write_borehole(deleted, "1,砂岩,4.0,20\n")
+    borehole_cache.read_borehole_csv(kept)
+    borehole_cache.read_borehole_csv(deleted)
+    assert len(list(borehole_cache.get_cache_root().glob("v*-*"))) == 2
+
+    deleted.unlink()
+    borehole_cache.prune_orphaned_entries()
+    entries = list(borehole_cache.get_cache_root().glob("v*-*"))
+    assert [e.name for e in entries] == [borehole_cache._entry_dir(borehole_cache.source_digest(kept)).name]
+    assert len(list((borehole_cache.get_cache_root() / borehole_cache.SOURCES_DIRNAME).glob("*.json"))) == 1
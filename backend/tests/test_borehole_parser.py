@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from app.services.borehole_parser import fill_missing_by_lithology, fill_missing_by_lithology_batch
+
+LITH_AVG_MAP = {
+    "泥岩": {"name": "泥岩", "thickness": 4.0, "density": 2.5},
+    "砂岩": {"name": "砂岩", "thickness": 6.0, "density": 2.6},
+    "灰岩": {"name": "灰岩", "thickness": 5.0},
+}
+
+
+def test_fill_missing_by_lithology_fills_nan_and_blank_cells():
+    df = pd.DataFrame(
+        {
+            "name": ["泥岩", "砂岩", "煤", "泥岩", "灰岩"],
+            "thickness": [np.nan, 3.0, np.nan, 1.5, np.nan],
+            "density": [" ", np.nan, "", 2.4, ""],
+            "shear_strength": [np.nan, np.nan, np.nan, np.nan, np.nan],
+        }
+    )
+
+    filled = fill_missing_by_lithology(df, LITH_AVG_MAP)
+
+    assert filled["thickness"].tolist()[:2] == [4.0, 3.0]
+    assert np.isnan(filled["thickness"].iloc[2])
+    # 灰岩 has no density average, so its blank cell is kept as is.
+    assert filled["density"].tolist() == [2.5, 2.6, "", 2.4, ""]
+    assert filled["thickness"].iloc[4] == 5.0
+    # No average for shear_strength, so the gap stays open.
+    assert filled["shear_strength"].isna().all()
+    # The input frame is left untouched.
+    assert np.isnan(df["thickness"].iloc[0])
+
+
+def test_fill_missing_by_lithology_batch_matches_per_frame():
+    frames = [
+        pd.DataFrame({"name": ["泥岩", "砂岩"], "thickness": [np.nan, np.nan]}),
+        pd.DataFrame({"name": ["砂岩"], "thickness": [2], "density": [np.nan]}),
+        pd.DataFrame({"name": ["灰岩", "泥岩"], "density": ["", " "]}),
+        pd.DataFrame({"depth": [1.0]}),
+    ]
+
+    batch = fill_missing_by_lithology_batch(frames, LITH_AVG_MAP)
+
+    assert len(batch) == len(frames)
+    for frame, result in zip(frames, batch):
+        pd.testing.assert_frame_equal(result, fill_missing_by_lithology(frame, LITH_AVG_MAP))
+    assert list(batch[1].columns) == ["name", "thickness", "density"]
+    assert batch[1]["thickness"].dtype == np.int64
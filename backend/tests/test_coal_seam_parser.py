@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services import coal_seam_parser
+from app.services import seam_index
+from app.services import seam_interpolate
+
+
+def _write_borehole(path, rows: str) -> None:
+    content = "序号,名称,厚度/m,弹性模量/Gpa\n" + rows
+    path.write_bytes(content.encode("gbk"))
+
+
+@pytest.fixture()
+def seam_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    seam_index.clear_seam_index()
+    _write_borehole(tmp_path / "B1.csv", "1,泥岩,5.0,12\n2,细砂岩,3.0,20\n3,16-3煤,2.0,\n")
+    _write_borehole(tmp_path / "B2.csv", "1,砾岩,4.0,30\n2,16-3煤,2.5,\n3,泥岩,1.0,10\n")
+    _write_borehole(tmp_path / "B3.csv", "1,泥岩,6.0,12\n2,16-3煤,3.5,\n")
+    _write_borehole(tmp_path / "B4.csv", "1,泥岩,2.0,12\n")
+    _write_borehole(tmp_path / "B5.csv", "1,16-3煤,1.0,\n")
+    files = sorted(tmp_path.glob("B*.csv"))
+    coords = {
+        "B1": {"x": 0.0, "y": 0.0},
+        "B2": {"x": 100.0, "y": 0.0},
+        "B3": {"x": 0.0, "y": 100.0},
+        "B4": {"x": 100.0, "y": 100.0},
+    }
+    return files, coords
+
+
+def test_dataset_collects_points_overburden_and_stats(seam_files):
+    files, coords = seam_files
+    dataset = coal_seam_parser.build_seam_dataset(files, coords, "16-3煤")
+
+    seam_data = dataset.seam_data()
+    assert [p["borehole"] for p in seam_data["points"]] == ["B1", "B2", "B3"]
+    assert seam_data["missing_coords"] == ["B5"]
+    assert seam_data["points"][0]["burial_depth"] == pytest.approx(8.0)
+    assert seam_data["stats"]["thickness"]["max"] == pytest.approx(3.5)
+
+    b1 = dataset.overburden()["boreholes"][0]
+    assert [layer["name"] for layer in b1["layers"]] == ["细砂岩", "泥岩", "16-3煤"]
+    assert b1["seam_top_depth"] == pytest.approx(8.0)
+
+    stats = dataset.stats()
+    assert stats["borehole_count"] == 3
+    assert {item["name"] for item in stats["lithology_summary"]} == {"泥岩", "细砂岩", "砾岩"}
+
+    pts, vals = dataset.property_points("thickness")
+    assert pts.shape == (3, 2)
+    assert vals.tolist() == pytest.approx([2.0, 2.5, 3.5])
+
+    # The legacy per-purpose parsers are views of the same dataset.
+    assert coal_seam_parser.get_coal_seam_data(files, coords, "16-3煤") == seam_data
+    assert coal_seam_parser.get_overburden_lithology(files, coords, "16-3煤") == dataset.overburden()
+    assert coal_seam_parser.get_seam_stats(files, coords, "16-3煤") == stats
+
+
+def test_seam_analysis_reads_each_file_once(seam_files, monkeypatch):
+    files, coords = seam_files
+    reads = []
+    original = seam_index.read_borehole_csv
+
+    def counting_read(path):
+        reads.append(path.name)
+        return original(path)
+
+    monkeypatch.setattr(seam_index, "read_borehole_csv", counting_read)
+
+    result = seam_interpolate.interpolate_seam_with_overburden(
+        files, coords, "16-3煤", method="idw", grid_size=10
+    )
+    assert "error" not in result["thickness"]
+    assert result["overburden"]["borehole_count"] == 3
+    assert sorted(reads) == ["B1.csv", "B2.csv", "B3.csv", "B4.csv", "B5.csv"]
+
+    # Later requests are served from the seam index without re-reading.
+    reads.clear()
+    compare = seam_interpolate.compare_interpolation_methods_for_seam(files, coords, "16-3煤", grid_size=10)
+    assert set(compare["results"]) == {"kriging", "idw", "linear", "nearest"}
+    assert coal_seam_parser.get_all_coal_seams(files)["unique_seams"] == 1
+    assert reads == []
+
+
+def test_seam_index_refreshes_changed_files_only(seam_files, monkeypatch):
+    files, coords = seam_files
+    before = coal_seam_parser.get_all_coal_seams(files)
+    assert before["seams"][0]["thickness_values"] == [2.0, 2.5, 3.5, 1.0]
+
+    reads = []
+    original = seam_index.read_borehole_csv
+
+    def counting_read(path):
+        reads.append(path.name)
+        return original(path)
+
+    monkeypatch.setattr(seam_index, "read_borehole_csv", counting_read)
+    _write_borehole(files[3], "1,泥岩,2.0,12\n2,15-4煤,0.8,\n3,16-3煤,4.0,\n")
+
+    after = coal_seam_parser.get_all_coal_seams(files)
+    assert reads == ["B4.csv"]
+    assert [seam["name"] for seam in after["seams"]] == ["15-4煤", "16-3煤"]
+    assert after["seams"][1]["thickness_values"] == [2.0, 2.5, 3.5, 4.0, 1.0]
+
+    b4 = coal_seam_parser.get_overburden_lithology(files, coords, "16-3煤")["boreholes"][3]
+    assert [layer["name"] for layer in b4["layers"]] == ["15-4煤", "泥岩", "16-3煤"]
+    assert b4["seam_top_depth"] == pytest.approx(2.8)
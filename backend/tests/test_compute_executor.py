@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services import compute_executor
+from app.services.compute_executor import ComputeSaturated, compute_stats, run_compute
+
+
+def test_run_compute_runs_off_the_event_loop():
+    async def _main():
+        loop_thread = threading.get_ident()
+        worker_thread = await run_compute(threading.get_ident)
+        return loop_thread, worker_thread, await run_compute(divmod, 17, 5)
+
+    loop_thread, worker_thread, result = asyncio.run(_main())
+    assert worker_thread != loop_thread
+    assert result == (3, 2)
+    assert compute_stats()["inflight"] == 0
+
+
+def test_run_compute_rejects_when_endpoint_or_queue_is_saturated(monkeypatch):
+    monkeypatch.setenv("COMPUTE_RETRY_AFTER_S", "7")
+    gate = threading.Event()
+
+    async def _main():
+        first = asyncio.ensure_future(run_compute(gate.wait, 5, endpoint="demo.heavy", limit=1))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ComputeSaturated) as endpoint_full:
+            await run_compute(gate.wait, 5, endpoint="demo.heavy", limit=1)
+        assert compute_stats()["endpoints"] == {"demo.heavy": 1}
+
+        monkeypatch.setenv("COMPUTE_MAX_QUEUE", "1")
+        with pytest.raises(ComputeSaturated):
+            await run_compute(sum, [1, 2])
+        monkeypatch.delenv("COMPUTE_MAX_QUEUE")
+
+        # Environment override raises the endpoint cap.
+        monkeypatch.setenv("COMPUTE_LIMIT_DEMO_HEAVY", "2")
+        second = asyncio.ensure_future(run_compute(gate.wait, 5, endpoint="demo.heavy", limit=1))
+        await asyncio.sleep(0.05)
+        gate.set()
+        await asyncio.gather(first, second)
+        return endpoint_full.value
+
+    error = asyncio.run(_main())
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "7"
+    assert compute_stats() == {"inflight": 0, "queue_limit": 32, "endpoints": {}}
+
+
+def test_compute_executor_process_mode(monkeypatch):
+    compute_executor.shutdown_compute_executor()
+    monkeypatch.setenv("COMPUTE_EXECUTOR", "process")
+    monkeypatch.setenv("COMPUTE_MAX_WORKERS", "1")
+    try:
+        assert asyncio.run(run_compute(pow, 3, 4)) == 81
+        assert isinstance(compute_executor.get_compute_executor(), compute_executor.ProcessPoolExecutor)
+    finally:
+        compute_executor.shutdown_compute_executor()
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from app.services.csv_loader import analyze_csv_file, read_csv_with_info
+
+
+def test_read_csv_with_info_detects_gbk_semicolon(tmp_path):
+    path = tmp_path / "gbk.csv"
+    path.write_bytes("名称;厚度\n泥岩;5.5\n砂岩;3.25\n".encode("gbk"))
+
+    df, info = read_csv_with_info(path)
+    assert list(df.columns) == ["名称", "厚度"]
+    assert df["厚度"].tolist() == [5.5, 3.25]
+    assert info["delimiter"] == ";"
+    assert info["engine"] == "c"
+
+    # The successful attempt is reused for an unchanged file.
+    again, info_again = read_csv_with_info(path)
+    assert again.equals(df)
+    assert info_again["encoding"] == info["encoding"]
+
+
+def test_read_csv_with_info_strips_utf8_bom(tmp_path):
+    path = tmp_path / "bom.csv"
+    path.write_bytes("﻿name,value\na,1\n".encode("utf-8"))
+
+    df, _ = read_csv_with_info(path)
+    assert list(df.columns) == ["name", "value"]
+    assert analyze_csv_file(path)["delimiter"] == ","
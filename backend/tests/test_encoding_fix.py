@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+import os
+import stat
+
+from app.services import encoding_fix
+from app.services.encoding_fix import MANIFEST_NAME, normalize_csv_encodings
+
+
+def _dataset(tmp_path):
+    clean = tmp_path / "clean.csv"
+    clean.write_bytes("名称,厚度\n泥岩,5.5\n".encode("utf-8"))
+    gbk = tmp_path / "gbk.csv"
+    gbk.write_bytes("名称,厚度\n砂岩,3.25\n".encode("gbk"))
+    bom = tmp_path / "bom.csv"
+    bom.write_bytes("名称;厚度\n煤;2\n".encode("utf-8-sig"))
+    return [bom, clean, gbk]
+
+
+def test_only_unclean_files_are_rewritten_and_reruns_are_noops(tmp_path, monkeypatch):
+    files = _dataset(tmp_path)
+    os.utime(files[1], ns=(1_000_000_000, 1_000_000_000))
+    clean_mtime = files[1].stat().st_mtime_ns
+
+    results = normalize_csv_encodings(files, max_workers=2)
+    assert [(r["file"], r["status"], r["changed"]) for r in results] == [
+        ("bom.csv", "ok", True),
+        ("clean.csv", "clean", False),
+        ("gbk.csv", "ok", True),
+    ]
+    assert files[1].stat().st_mtime_ns == clean_mtime
+    assert files[0].read_bytes() == "名称,厚度\n煤,2\n".encode("utf-8")
+    assert files[2].read_bytes().decode("utf-8") == "名称,厚度\n砂岩,3.25\n"
+    assert not [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text(encoding="utf-8"))["files"]
+    assert sorted(manifest) == ["bom.csv", "clean.csv", "gbk.csv"]
+
+    # Second run: every file matches the manifest and nothing is read or parsed.
+    monkeypatch.setattr(encoding_fix, "read_csv_with_info", None)
+    mtimes = [p.stat().st_mtime_ns for p in files]
+    again = normalize_csv_encodings(files)
+    assert {r["status"] for r in again} == {"clean"}
+    assert not any(r["changed"] for r in again)
+    # Skipped files report the analysis recorded when they were normalized.
+    assert [r["after"] for r in again] == [r["after"] for r in results]
+    assert all(r["before"] == r["after"] for r in again)
+    assert [p.stat().st_mtime_ns for p in files] == mtimes
+
+
+def test_rewritten_files_keep_their_permissions(tmp_path):
+    files = _dataset(tmp_path)
+    for path, mode in zip(files, (0o644, 0o640, 0o664)):
+        path.chmod(mode)
+    results = normalize_csv_encodings(files)
+    assert [r["changed"] for r in results] == [True, False, True]
+    assert [stat.S_IMODE(p.stat().st_mode) for p in files] == [0o644, 0o640, 0o664]
+
+
+def test_changed_file_is_renormalized(tmp_path):
+    files = _dataset(tmp_path)
+    normalize_csv_encodings(files)
+
+    files[1].write_bytes("名称,厚度\n泥岩,6.0\n".encode("gbk"))
+    result = encoding_fix.fix_csv_encoding(files[1])
+    assert (result["status"], result["changed"]) == ("ok", True)
+    assert result["before"]["encoding"] != "utf-8"
+    assert files[1].read_bytes().decode("utf-8") == "名称,厚度\n泥岩,6.0\n"
+    manifest = encoding_fix.load_manifest(tmp_path)
+    assert manifest["clean.csv"]["size"] == files[1].stat().st_size
+
+
+def test_empty_file_fails_and_is_not_recorded(tmp_path):
+    empty = tmp_path / "empty.csv"
+    empty.write_bytes(b"")
+
+    result = encoding_fix.fix_csv_encoding(empty)
+    assert (result["status"], result["changed"]) == ("failed", False)
+    assert result["error"]
+    assert empty.read_bytes() == b""
+    assert encoding_fix.load_manifest(tmp_path) == {}
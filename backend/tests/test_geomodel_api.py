@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import os
+import threading
 import time
 from pathlib import Path
 
 from fastapi.testclient import TestClient
+import pytest
 
 from app.main import app
+from app.schemas.geomodel import GeomodelJobCreate, GeomodelJobStatus
+from app.services.geomodel_service import GeomodelService
 
 
 client = TestClient(app)
@@ -108,3 +113,113 @@ def test_geomodel_job_invalid_method_returns_422(tmp_path, monkeypatch):
 def test_geomodel_job_not_found():
     resp = client.get("/api/geomodel/jobs/not_exists")
     assert resp.status_code == 404
+
+
+def test_geomodel_repeated_request_reuses_completed_job(tmp_path, monkeypatch):
+    _write_geomodel_dataset(tmp_path)
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    payload = {"method": "hybrid", "resolution": 25.0, "output_formats": ["summary", "vtk"]}
+
+    first = client.post("/api/geomodel/jobs", json=payload).json()
+    assert _wait_until_completed(first["job_id"])["status"] == "completed"
+
+    again = client.post("/api/geomodel/jobs", json={**payload, "output_formats": ["VTK", "summary"], "priority": 5})
+    assert again.status_code == 200
+    assert again.json()["job_id"] == first["job_id"]
+    assert again.json()["status"] == "completed"
+
+    # Touching an input file changes the input signature, so the job reruns.
+    bh = tmp_path / "BH01.csv"
+    os.utime(bh, (bh.stat().st_atime, bh.stat().st_mtime + 10))
+    rerun = client.post("/api/geomodel/jobs", json=payload).json()
+    assert rerun["job_id"] != first["job_id"]
+    assert _wait_until_completed(rerun["job_id"])["status"] == "completed"
+
+
+def test_geomodel_service_priorities_cancellation_and_gc(tmp_path, monkeypatch):
+    _write_geomodel_dataset(tmp_path)
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    service = GeomodelService(max_workers=1, runs_budget_bytes=0)
+
+    gate = threading.Event()
+    started = threading.Event()
+    order = []
+    original = service._build_job_artifacts
+
+    def _build(job):
+        order.append(job.request.resolution)
+        if job.request.resolution == 10.0:
+            started.set()
+            gate.wait(5)
+        return original(job)
+
+    monkeypatch.setattr(service, "_build_job_artifacts", _build)
+
+    blocker = service.create_job(GeomodelJobCreate(resolution=10.0))
+    assert started.wait(5)
+    low = service.create_job(GeomodelJobCreate(resolution=30.0, priority=-1))
+    high = service.create_job(GeomodelJobCreate(resolution=40.0, priority=3))
+    dropped = service.create_job(GeomodelJobCreate(resolution=50.0))
+
+    cancelled = service.cancel_job(dropped.job_id)
+    assert cancelled.status == GeomodelJobStatus.cancelled
+    gate.set()
+    service._queue.join()
+
+    # The cancelled job never ran; the high-priority job overtook the low one.
+    assert order == [10.0, 40.0, 30.0]
+    # With a zero budget every finished run folder is pruned and forgotten.
+    assert not any((tmp_path / "_geomodel_runs").iterdir())
+    for job in (blocker, low, high):
+        with pytest.raises(KeyError):
+            service.get_job(job.job_id)
+
+
+def test_geomodel_artifact_download_supports_range_and_gzip(tmp_path, monkeypatch):
+    _write_geomodel_dataset(tmp_path)
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    job_id = client.post(
+        "/api/geomodel/jobs",
+        json={"method": "thickness", "resolution": 15.0, "output_formats": ["summary", "vtk", "vtp"]},
+    ).json()["job_id"]
+    assert _wait_until_completed(job_id)["status"] == "completed"
+    url = f"/api/geomodel/jobs/{job_id}/artifacts/summary.json"
+    full = (tmp_path / "_geomodel_runs" / job_id / "summary.json").read_bytes()
+    monkeypatch.setattr("app.services.file_transfer.GZIP_MIN_BYTES", 64)
+
+    gz = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert gz.status_code == 200
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gz.content == full  # httpx decodes transparently
+
+    plain = client.get(url, headers={"Accept-Encoding": "*, gzip;q=0"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] != gz.headers["etag"]
+    assert plain.headers["vary"] == gz.headers["vary"] == "Accept-Encoding"
+
+    part = client.get(url, headers={"Range": "bytes=10-29", "Accept-Encoding": "gzip"})
+    assert part.status_code == 206
+    assert part.headers["content-range"] == f"bytes 10-29/{len(full)}"
+    assert "content-encoding" not in part.headers
+    assert part.headers["vary"] == "Accept-Encoding"
+    assert part.content == full[10:30]
+
+    # Ranges address the identity bytes, so only the identity ETag validates If-Range.
+    for validator, status in ((plain.headers["etag"], 206), (gz.headers["etag"], 200)):
+        resumed = client.get(url, headers={"Range": "bytes=10-29", "If-Range": validator, "Accept-Encoding": "identity"})
+        assert resumed.status_code == status
+
+    tail = client.get(url, headers={"Range": "bytes=-5"})
+    assert tail.status_code == 206
+    assert tail.content == full[-5:]
+
+    bad = client.get(url, headers={"Range": f"bytes={len(full)}-"})
+    assert bad.status_code == 416
+
+    # An invalid range (last < first) is ignored rather than unsatisfiable.
+    invalid = client.get(url, headers={"Range": "bytes=5-3"})
+    assert invalid.status_code == 200
+    assert invalid.content == full
+
+    vtk = client.get(f"/api/geomodel/jobs/{job_id}/artifacts/model.vtk")
+    assert vtk.content.splitlines()[2] == b"BINARY"
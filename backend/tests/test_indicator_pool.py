@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from app.services import indicator_pool
+from app.services.mpi_calculator import PointData, RockLayer
+from app.services.mpi_new_algorithm import calc_all_indicators_new
+
+
+def _points(count: int = 3):
+    return [
+        PointData(
+            x=float(i),
+            y=0.0,
+            borehole=f"bh_{i}",
+            burial_depth=400.0 + 50 * i,
+            strata=[
+                RockLayer(thickness=8.0 + i, name="砂岩", density=2600.0, elastic_modulus=20.0, tensile_strength=3.0),
+                RockLayer(thickness=4.0, name="煤层", density=1400.0, elastic_modulus=5.0, tensile_strength=0.8),
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def test_evaluate_points_pool_matches_sequential_order(monkeypatch):
+    monkeypatch.setenv("INDICATOR_MAX_WORKERS", "2")
+    monkeypatch.setattr(indicator_pool, "MIN_PARALLEL_POINTS", 2)
+    points = _points()
+    try:
+        pooled = list(indicator_pool.evaluate_points(points, max_workers=2))
+    finally:
+        indicator_pool.shutdown_indicator_pool()
+
+    expected = [calc_all_indicators_new(point=p, microseismic_events=[]) for p in points]
+    assert [r["mpi"] for r in pooled] == [r["mpi"] for r in expected]
+    assert [r["diagnostics"] for r in pooled] == [r["diagnostics"] for r in expected]
+
+
+def test_evaluate_points_respects_time_budget():
+    with pytest.raises(TimeoutError):
+        list(indicator_pool.evaluate_points(_points(), max_workers=1, time_budget_s=1e-9))
+
+
+def test_overlapping_requests_share_the_pool(monkeypatch):
+    monkeypatch.setenv("INDICATOR_MAX_WORKERS", "3")
+    monkeypatch.setattr(indicator_pool, "MIN_PARALLEL_POINTS", 2)
+    points = _points(4)
+    expected = [calc_all_indicators_new(point=p, microseismic_events=[])["mpi"] for p in points]
+    start = threading.Barrier(2)
+    results = {}
+
+    def run(max_workers: int) -> None:
+        start.wait()
+        try:
+            results[max_workers] = [r["mpi"] for r in indicator_pool.evaluate_points(points, max_workers=max_workers)]
+        except Exception as exc:  # pragma: no cover - reported below
+            results[max_workers] = exc
+
+    try:
+        pool, size = indicator_pool._get_pool()
+        # A request asking for more workers than the pool has is clamped, not resized.
+        threads = [threading.Thread(target=run, args=(n,)) for n in (2, 64)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert indicator_pool._get_pool() == (pool, size) and size == 3
+    finally:
+        indicator_pool.shutdown_indicator_pool()
+
+    assert results == {2: expected, 64: expected}
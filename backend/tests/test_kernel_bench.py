@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services import kernel_bench
+from app.services.perf_baseline import evaluate_reports
+
+
+def test_quick_preset_reports_evaluate_against_thresholds():
+    report = kernel_bench.run_kernel_benchmarks(
+        preset="quick", kernels=["idw_interpolate", "read_csv_robust"], repeats=2, warmup=0
+    )
+    names = [item["name"] for item in report["scenarios"]]
+    assert names == ["kernel_idw_interpolate_p50_g20", "kernel_read_csv_robust_rows500"]
+    for item in report["scenarios"]:
+        assert item["error_buckets"] == {}
+        assert item["summary"]["success_count"] == 2
+        assert item["summary"]["items_per_sec"] > 0
+
+    thresholds = {
+        "scenarios": {name: {"success_rate": {"min": 1.0}, "latency_ms.p95": {"max": 60_000.0}} for name in names}
+    }
+    assert evaluate_reports([report], thresholds)["all_passed"] is True
+
+
+def test_kernel_errors_are_bucketed():
+    def setup():
+        def fail():
+            raise RuntimeError("kernel exploded")
+
+        return fail, None
+
+    case = kernel_bench.KernelCase("broken", {"n": 1}, 1, setup)
+    result = kernel_bench.run_case(case, repeats=3, warmup=0)
+    assert result["summary"]["success_count"] == 0
+    assert result["error_buckets"] == {"RuntimeError: kernel exploded": 3}
+
+
+def test_unknown_kernel_is_rejected():
+    with pytest.raises(ValueError):
+        kernel_bench.build_cases("quick", ["nope"])
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import random
+import threading
+
+import pytest
+
+from app.services.perf_baseline import evaluate_reports
+from app.services.perf_load import LatencyHistogram, MixEntry, parse_mix, poisson_arrivals, run_open_loop
+
+
+def test_histogram_percentiles_have_bounded_relative_error():
+    hist = LatencyHistogram()
+    for value in range(1, 1001):
+        hist.record(float(value))
+    s = hist.summary()
+    assert s["min"] == 1.0 and s["max"] == 1000.0
+    assert s["avg"] == pytest.approx(500.5)
+    for pct, exact in ((50, 500.0), (95, 950.0), (99, 990.0)):
+        assert s[f"p{pct}"] == pytest.approx(exact, rel=0.011)
+
+    other = LatencyHistogram()
+    other.record(5000.0)
+    hist.merge(other)
+    assert hist.count == 1001 and hist.percentile(100) == 5000.0
+
+
+def test_poisson_arrivals_and_mix_parsing():
+    arrivals = poisson_arrivals(200.0, 10.0, random.Random(1))
+    assert len(arrivals) == pytest.approx(2000, rel=0.1)
+    assert arrivals == sorted(arrivals) and arrivals[-1] < 10.0
+
+    assert parse_mix([], ["a", "b"]) == {"a": 1.0, "b": 1.0}
+    assert parse_mix(["a=3", "b"], ["a", "b"]) == {"a": 3.0, "b": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix(["c=1"], ["a", "b"])
+
+
+def test_open_loop_charges_queueing_to_latency():
+    gate = threading.Event()
+    calls = []
+
+    def slow():
+        # The first request stalls the only worker; later arrivals queue behind it.
+        if not calls:
+            calls.append(1)
+            gate.wait(0.4)
+        return True, 200, ""
+
+    def failing():
+        return False, 503, "busy"
+
+    reports = run_open_loop(
+        [MixEntry("slow", 3.0, slow), MixEntry("failing", 1.0, failing)],
+        rps=40.0,
+        duration_s=0.5,
+        max_inflight=1,
+        seed=3,
+    )
+    by_name = {item["name"]: item for item in reports}
+    assert list(by_name) == ["slow", "failing", "mix_total"]
+
+    slow_summary = by_name["slow"]["summary"]
+    assert slow_summary["success_rate"] == 1.0
+    assert slow_summary["target_rps"] == pytest.approx(30.0)
+    # Coordinated-omission correction: queued requests report the stall, the
+    # service time of the same requests does not.
+    assert slow_summary["latency_ms"]["p50"] > 100.0
+    assert slow_summary["service_latency_ms"]["p50"] < 50.0
+
+    failing_report = by_name["failing"]
+    assert failing_report["summary"]["success_rate"] == 0.0
+    assert list(failing_report["error_buckets"]) == ["503:busy"]
+
+    total = by_name["mix_total"]["summary"]
+    assert total["total_requests"] == slow_summary["total_requests"] + failing_report["summary"]["total_requests"]
+
+    thresholds = {"scenarios": {"slow": {"success_rate": {"min": 0.99}, "latency_ms.p95": {"max": 10_000.0}}}}
+    assert evaluate_reports([{"scenarios": reports}], thresholds)["all_passed"] is True
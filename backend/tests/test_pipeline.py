@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.services import pipeline
+from app.services.coords_loader import load_borehole_coords
+from app.services.interpolate import interpolate_field
+from app.services.pressure_index import compute_borehole_index, interpolate_index
+
+
+def _write_dataset(base_dir) -> None:
+    (base_dir / "zuobiao.csv").write_text(
+        "钻孔名,坐标x,坐标y\nBH01,100,100\nBH02,200,120\nBH03,120,240\nBH04,260,260\n",
+        encoding="utf-8",
+    )
+    rows = {
+        "BH01": "1,细砂岩,10,20,2.5,3.0\n2,16-3煤,3.5,,,\n3,泥岩,8,12,,1.5\n",
+        "BH02": "1,细砂岩,12,,2.6,3.2\n2,16-3煤,3.2,,,\n3,泥岩,7,10,2.4,\n",
+        "BH03": "1,细砂岩,11,22,,2.8\n2,16-3煤,3.8,,,\n3,泥岩,9,11,2.3,1.4\n",
+        "BH04": "1,细砂岩,9,18,2.5,\n2,泥岩,6,,2.2,1.6\n",
+        "BH05": "1,砾岩,4,30,2.7,4.0\n",  # no coordinates: only feeds the lithology averages
+    }
+    for name, body in rows.items():
+        (base_dir / f"{name}.csv").write_text(
+            "序号,名称,厚度/m,弹性模量/Gpa,容重/kN*m-3,抗拉强度/MPa\n" + body, encoding="utf-8"
+        )
+
+
+@pytest.mark.parametrize("method", ["idw", "linear"])
+def test_pipeline_matches_separate_services_and_parses_once(tmp_path, monkeypatch, method):
+    _write_dataset(tmp_path)
+    reads = []
+    original = pipeline.read_borehole_csv
+
+    def counting_read(path):
+        reads.append(path.name)
+        return original(path)
+
+    monkeypatch.setattr(pipeline, "read_borehole_csv", counting_read)
+    result = pipeline.run_pipeline(tmp_path, "elastic_modulus", method, 12, fix_encoding=False)
+    assert sorted(reads) == ["BH01.csv", "BH02.csv", "BH03.csv", "BH04.csv", "BH05.csv"]
+
+    assert result["shared_operator"] is True
+    assert list(result["timings_ms"]) == [
+        "fix_encoding", "corpus", "lithology_averages", "filled", "field_values", "index_values", "interpolate"
+    ]
+
+    coords = load_borehole_coords(tmp_path / "zuobiao.csv")
+    files = sorted(p for p in tmp_path.glob("*.csv") if p.name != "zuobiao.csv")
+    field = interpolate_field(files, coords, "elastic_modulus", method, 12)
+    base = compute_borehole_index(files, coords)
+    grid = interpolate_index(base["items"], method, 12)
+
+    assert result["interpolation"]["missing_coords"] == ["BH05"] == field["missing_coords"]
+    assert np.allclose(result["interpolation"]["values"], field["values"])
+    assert result["index"]["base"] == base
+    assert np.allclose(result["index"]["grid"]["values"], grid["values"])
+
+
+def test_run_stages_orders_by_dependencies_and_rejects_cycles():
+    calls = []
+
+    def stage(name):
+        def run(ctx):
+            calls.append(name)
+            return name.upper()
+
+        return run
+
+    results, timings = pipeline.run_stages(
+        [pipeline.Stage("b", stage("b"), ("a",)), pipeline.Stage("a", stage("a"), ("x",))], {"x": 1}
+    )
+    assert calls == ["a", "b"] and results["b"] == "B" and set(timings) == {"a", "b"}
+
+    with pytest.raises(ValueError, match="cyclic"):
+        pipeline.run_stages([pipeline.Stage("a", stage("a"), ("b",)), pipeline.Stage("b", stage("b"), ("a",))], {})
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from io import BytesIO
+import json
 from pathlib import Path
 from zipfile import ZipFile
 
@@ -392,3 +393,47 @@ def test_research_template_e2e_with_two_datasets(tmp_path, monkeypatch):
             assert suite["template_name"] == template_name
             assert len(suite["runs"]) >= 2
             assert "comparison_conclusion" in suite
+
+
+def test_research_leaderboard_reads_index_and_filters(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    exp_dir = research_routes.get_research_paths().experiments_dir
+    for exp_id, model, dataset, auc in (
+        ("exp_a", "baseline", "ds1", 0.61),
+        ("exp_b", "rk_enhanced", "ds1", 0.77),
+        ("exp_c", "rk_enhanced", "ds2", 0.70),
+    ):
+        (exp_dir / exp_id).mkdir()
+        (exp_dir / exp_id / "result.json").write_text(
+            json.dumps(
+                {
+                    "exp_id": exp_id,
+                    "dataset_id": dataset,
+                    "split_id": "split_1",
+                    "spec": {"experiment_name": exp_id, "model_type": model},
+                    "metrics": {"auc": auc},
+                    "ci95": {"auc": [auc - 0.1, auc + 0.1]},
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    # Experiments written before the index existed are picked up on first query.
+    resp = client.get("/api/research/leaderboard/experiments", params={"metric": "auc"})
+    assert resp.status_code == 200
+    assert [row["exp_id"] for row in resp.json()["rows"]] == ["exp_b", "exp_c", "exp_a"]
+
+    filtered = client.get(
+        "/api/research/leaderboard/experiments",
+        params={"metric": "auc", "dataset_id": "ds1", "model_type": "rk_enhanced"},
+    ).json()
+    assert [row["exp_id"] for row in filtered["rows"]] == ["exp_b"]
+
+    # Result files are no longer read per request; only the index is.
+    (exp_dir / "exp_a" / "result.json").unlink()
+    assert client.get("/api/research/leaderboard/experiments").json()["total_runs"] == 3
+
+    rebuild = client.post("/api/research/leaderboard/rebuild-index")
+    assert rebuild.status_code == 200
+    assert rebuild.json()["indexed"] == 2
+    assert client.get("/api/research/leaderboard/experiments").json()["total_runs"] == 2
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from sklearn.metrics import average_precision_score, f1_score, roc_auc_score
+
+from app.services.experiment_runner import run_experiment_suite
+from app.services.research_manager import (
+    _bootstrap_ci,
+    _bootstrap_metric_rows,
+    create_split_manifest,
+    register_dataset_manifest,
+)
+
+
+def test_bootstrap_metric_rows_match_sklearn_with_ties():
+    rng = np.random.default_rng(7)
+    y_true = rng.integers(0, 2, size=(20, 30)).astype(bool)
+    y_prob = np.round(rng.random((20, 30)), 1)
+    y_true[0] = True  # single-class row falls back to 0.5
+
+    rows = _bootstrap_metric_rows(y_true, y_prob)
+
+    for b in range(len(y_true)):
+        yt = y_true[b].astype(int)
+        yp = y_prob[b]
+        two_class = len(np.unique(yt)) > 1
+        assert rows["auc"][b] == pytest.approx(roc_auc_score(yt, yp) if two_class else 0.5)
+        assert rows["pr_auc"][b] == pytest.approx(average_precision_score(yt, yp) if two_class else 0.5)
+        assert rows["f1"][b] == pytest.approx(f1_score(yt, (yp >= 0.5).astype(int), zero_division=0))
+        assert rows["brier"][b] == pytest.approx(np.mean((yp - yt) ** 2))
+
+
+def test_bootstrap_ci_is_seeded_and_chunk_independent(monkeypatch):
+    rng = np.random.default_rng(3)
+    y_true = rng.integers(0, 2, size=50)
+    y_prob = rng.random(50)
+
+    ci = _bootstrap_ci(y_true, y_prob, seed=11, n_bootstrap=300)
+    assert set(ci) == {"auc", "pr_auc", "brier", "f1", "mae", "rmse"}
+    assert all(lo <= hi for lo, hi in ci.values())
+
+    monkeypatch.setattr("app.services.research_manager._BOOTSTRAP_CHUNK_CELLS", 50 * 7)
+    assert _bootstrap_ci(y_true, y_prob, seed=11, n_bootstrap=300) == ci
+
+
+def _register_demo_dataset(base_dir, dataset_id="suite_demo"):
+    rows = ["sample_id,borehole_name,elastic_modulus,friction_angle,cohesion,thickness,label"]
+    for i in range(24):
+        rows.append(f"{i},BH{i % 6:02d},{12 + i % 9},{24 + i % 7},{1.5 + (i % 5) * 0.4},{5 + i % 4},{i % 2}")
+    (base_dir / f"{dataset_id}.csv").write_text("\n".join(rows) + "\n", encoding="utf-8")
+    manifest = register_dataset_manifest(dataset_id, {"label_column": "label", "positive_values": [1]})
+    split = create_split_manifest(
+        dataset_id,
+        strategy="borehole_block",
+        train_ratio=0.5,
+        val_ratio=0.25,
+        test_ratio=0.25,
+        seed=5,
+        borehole_column="borehole_name",
+    )
+    return manifest["dataset_version"], split["split_id"]
+
+
+def test_experiment_suite_pool_matches_sequential(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    version, split_id = _register_demo_dataset(tmp_path)
+
+    sequential = run_experiment_suite("rk_vs_kriging", "suite_demo", version, split_id, seed=9, max_workers=1)
+    pooled = run_experiment_suite("rk_vs_kriging", "suite_demo", version, split_id, seed=9, max_workers=2)
+
+    assert [run["seed"] for run in pooled["runs"]] == [9, 10]
+    for a, b in zip(sequential["runs"], pooled["runs"]):
+        assert a["experiment_name"] == b["experiment_name"]
+        assert a["metrics"] == b["metrics"]
+        assert a["exp_id"] != b["exp_id"]
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services.rock_params_db import RockParamsDatabase
+
+
+@pytest.fixture()
+def db(tmp_path):
+    path = tmp_path / "汇总表.csv"
+    path.write_text(
+        "矿名,岩性,密度（kg*m3）,内聚力（MPa）\n"
+        "A矿,泥岩,2400,2.0\n"
+        "A矿,碳质泥岩,2200,\n"
+        "B矿,泥岩,2600,4.0\n"
+        "B矿,玄武岩,2900,9.0\n",
+        encoding="utf-8",
+    )
+    return RockParamsDatabase(path)
+
+
+def test_params_by_lithology_uses_precomputed_synonym_groups(db):
+    plain = db.get_params_by_lithology("泥岩", use_synonyms=False)
+    assert plain["count"] == 2
+    assert plain["density"] == pytest.approx(2500.0)
+    assert plain["poisson_ratio"] is None
+
+    grouped = db.get_params_by_lithology("碳质泥岩")
+    assert grouped["count"] == 3
+    assert grouped["density"] == pytest.approx(2400.0)
+    assert grouped["cohesion"] == pytest.approx(3.0)
+
+    assert db.get_params_by_lithology("花岗岩") == {}
+    assert len(db.get_by_lithology("泥岩")) == 3
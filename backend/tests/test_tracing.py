@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services import tracing
+from app.services.compute_executor import run_compute
+from app.services.tracing import Trace, TracedJSONResponse, TracingMiddleware, span, traced
+
+
+def _app() -> FastAPI:
+    app = FastAPI(default_response_class=TracedJSONResponse)
+    app.add_middleware(TracingMiddleware)
+
+    @traced("parse")
+    def parse(n: int) -> list:
+        with span("parse"):  # nested span of the same stage is not double counted
+            time.sleep(0.01)
+        return list(range(n))
+
+    @app.get("/items/{n}")
+    def items(n: int) -> dict:
+        return {"items": parse(n)}
+
+    @app.get("/slow")
+    async def slow() -> dict:
+        await run_compute(traced("score")(time.sleep), 0.05)
+        return {"ok": True}
+
+    @app.get("/metrics")
+    def metrics():
+        from fastapi import Response
+
+        return Response(tracing.render_prometheus(), media_type="text/plain")
+
+    return app
+
+
+def test_span_is_noop_outside_a_request_and_guards_nesting():
+    with span("parse"):
+        pass  # no trace: nothing to record
+
+    trace = Trace()
+    token = tracing._trace.set(trace)
+    try:
+        with span("parse"):
+            with span("parse"):
+                time.sleep(0.01)
+            with span("render"):
+                pass
+    finally:
+        tracing._trace.reset(token)
+    assert set(trace.stages) == {"parse", "render"}
+    assert 0.01 <= trace.stages["parse"] < 0.05
+
+
+def test_pool_threads_leave_the_trace_when_their_span_exits():
+    trace = Trace()
+    token = tracing._trace.set(trace)
+    try:
+        context = contextvars.copy_context()
+    finally:
+        tracing._trace.reset(token)
+
+    def work() -> tuple:
+        with span("score"):
+            with span("render"):
+                inside = trace.active_threads()
+        return threading.get_ident(), inside
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        ident, inside = pool.submit(context.run, work).result()
+    assert inside == [ident]
+    # The shared worker may now serve another request; it is no longer sampled for this one.
+    assert trace.active_threads() == []
+
+
+def test_middleware_sets_server_timing_and_route_histograms():
+    tracing.reset_metrics()
+    client = TestClient(_app())
+
+    resp = client.get("/items/3")
+    assert resp.json() == {"items": [0, 1, 2]}
+    timing = resp.headers["server-timing"]
+    names = [part.split(";")[0] for part in timing.split(", ")]
+    assert names == ["parse", "serialize", "total"]
+
+    # Work handed to the compute executor is attributed to the request.
+    assert "score;dur=" in client.get("/slow").headers["server-timing"]
+
+    text = client.get("/metrics").text
+    assert 'backend_requests_total{method="GET",route="/items/{n}",status="200"} 1' in text
+    assert 'backend_stage_duration_seconds_count{method="GET",route="/items/{n}",stage="parse"} 1' in text
+    assert 'backend_stage_duration_seconds_count{method="GET",route="/slow",stage="score"} 1' in text
+    assert 'backend_request_duration_seconds_bucket{method="GET",route="/slow",le="+Inf"} 1' in text
+
+
+def test_slow_requests_dump_a_sampled_profile(tmp_path, monkeypatch):
+    monkeypatch.setenv("TRACE_PROFILE_SLOW_MS", "35")
+    monkeypatch.setenv("TRACE_PROFILE_INTERVAL_MS", "1")
+    monkeypatch.setenv("TRACE_PROFILE_DIR", str(tmp_path))
+    client = TestClient(_app())
+
+    client.get("/items/1")
+    assert list(tmp_path.iterdir()) == []
+
+    client.get("/slow")
+    dumps = list(tmp_path.glob("*_GET_slow_*ms.folded"))
+    assert len(dumps) == 1
+    assert "wrapper (tracing.py:" in dumps[0].read_text(encoding="utf-8")
+
+
+def test_tracing_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("TRACING", "0")
+    resp = TestClient(_app()).get("/items/1")
+    assert "server-timing" not in resp.headers
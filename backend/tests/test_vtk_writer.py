@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import base64
+import re
+from typing import Tuple
+import zlib
+
+import numpy as np
+import pytest
+
+from app.services import vtk_writer
+from app.services.vtk_writer import write_legacy_polydata, write_vtp_polydata
+
+
+def _b64_prefix(data: bytes, nbytes: int) -> Tuple[bytes, bytes]:
+    """Decode the first nbytes of a base64 stream; returns (decoded, remaining stream)."""
+    chars = ((nbytes + 2) // 3) * 4
+    return base64.b64decode(data[:chars])[:nbytes], data[chars:]
+
+
+def _decode_appended(blob: bytes, offset: int, dtype: str, compressed: bool, b64: bool) -> np.ndarray:
+    data = blob[offset:]
+    if not compressed:
+        if b64:
+            nbytes = int(np.frombuffer(_b64_prefix(data, 8)[0], "<u8")[0])
+            return np.frombuffer(_b64_prefix(data, 8 + nbytes)[0][8:], dtype)
+        nbytes = int(np.frombuffer(data[:8], "<u8")[0])
+        return np.frombuffer(data[8 : 8 + nbytes], dtype)
+
+    # Compressed: [nblocks, block_size, last_size, *compressed_sizes] then the blocks.
+    nblocks = int(np.frombuffer(_b64_prefix(data, 8)[0] if b64 else data[:8], "<u8")[0])
+    head_len = (3 + nblocks) * 8
+    if b64:
+        header, rest = _b64_prefix(data, head_len)
+    else:
+        header, rest = data[:head_len], data[head_len:]
+    sizes = np.frombuffer(header, "<u8")[3:].astype(int)
+    body = _b64_prefix(rest, int(sizes.sum()))[0] if b64 else rest
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    raw = b"".join(zlib.decompress(body[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:]))
+    return np.frombuffer(raw, dtype)
+
+
+@pytest.mark.parametrize("encoding", ["raw", "base64"])
+@pytest.mark.parametrize("compress", [True, False])
+def test_vtp_appended_arrays_round_trip(tmp_path, monkeypatch, encoding, compress):
+    monkeypatch.setattr(vtk_writer, "VTP_BLOCK_SIZE", 64)  # force several compressed blocks
+    rng = np.random.default_rng(1)
+    points = rng.random((50, 3)).astype(np.float32)
+    thickness = rng.random(50).astype(np.float32)
+    path = tmp_path / "layer.vtp"
+
+    write_vtp_polydata(path, points, {"thickness": thickness}, encoding=encoding, compress=compress)
+
+    content = path.read_bytes()
+    head, _, appended = content.partition(b"\n   _")
+    text = head.decode("utf-8")
+    assert ('compressor="vtkZLibDataCompressor"' in text) == compress
+    assert f'<AppendedData encoding="{encoding}">' in text
+    offsets = {name: int(off) for name, off in re.findall(r'Name="(\w+)"[^>]*offset="(\d+)"', text)}
+    decode = lambda name, dtype: _decode_appended(appended, offsets[name], dtype, compress, encoding == "base64")
+
+    np.testing.assert_array_equal(decode("thickness", "<f4"), thickness)
+    np.testing.assert_array_equal(decode("Points", "<f4").reshape(-1, 3), points)
+    np.testing.assert_array_equal(decode("connectivity", "<i4"), np.arange(50))
+    np.testing.assert_array_equal(decode("offsets", "<i4"), np.arange(1, 51))
+
+
+def test_legacy_vtk_binary_and_ascii(tmp_path):
+    points = np.array([[100.0, 100.0, 0.0], [200.0, 120.0, 0.0]])
+    values = np.array([21.5, 22.2])
+
+    binary_path = tmp_path / "model.vtk"
+    write_legacy_polydata(binary_path, points, {"total_thickness": values})
+    blob = binary_path.read_bytes()
+    assert blob.splitlines()[2] == b"BINARY"
+    start = blob.index(b"POINTS 2 float\n") + len(b"POINTS 2 float\n")
+    np.testing.assert_array_equal(np.frombuffer(blob[start : start + 24], ">f4").reshape(2, 3), points)
+    scalars = blob.index(b"LOOKUP_TABLE default\n") + len(b"LOOKUP_TABLE default\n")
+    np.testing.assert_allclose(np.frombuffer(blob[scalars : scalars + 8], ">f4"), values, rtol=1e-6)
+
+    ascii_path = tmp_path / "model_ascii.vtk"
+    write_legacy_polydata(ascii_path, points, binary=False)
+    lines = ascii_path.read_text(encoding="ascii").splitlines()
+    assert lines[2] == "ASCII"
+    assert lines[5] == "100.000000 100.000000 0.000000"
+    assert lines[7:9] == ["VERTICES 2 4", "1 0"]
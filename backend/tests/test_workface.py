@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.workface import compute_workface_adjusted_grid, workface_label_map
+from app.services.workface_raster import points_in_polygon
+from app.services.workface_parser import parse_workface_file
+
+client = TestClient(app)
+
+BOUNDS = {"min_x": 0.0, "max_x": 10.0, "min_y": 0.0, "max_y": 4.0}
+
+
+def test_axis_bands_match_the_per_cell_rule():
+    grid = np.ones((5, 11))
+    result = compute_workface_adjusted_grid(grid, BOUNDS, axis="x", count=3, mode="decrease", decay=0.1)
+    # x = 0..10: ratio * 3 floors to 0 for x < 10/3, 1 below 20/3, 2 after; x = max clamps to 2.
+    assert result["face_map"][0].tolist() == [0, 0, 0, 0, 1, 1, 1, 2, 2, 2, 2]
+    assert (result["face_map"] == result["face_map"][0]).all()
+    assert result["adjusted"][3].tolist() == [1.0] * 4 + [0.9] * 3 + [0.8] * 4
+
+    by_row = compute_workface_adjusted_grid(grid, BOUNDS, axis="y", count=2, direction="descending", mode="increase")
+    assert by_row["face_map"][:, 0].tolist() == [1, 1, 0, 0, 0]
+    assert by_row["adjusted"][0, 0] == 1.08 and by_row["adjusted"][4, 10] == 1.0
+
+
+def test_polygon_workfaces_label_cells_by_containment():
+    triangle = [[0, 0], [4, 0], [0, 4]]
+    x, y = np.meshgrid(np.arange(5.0), np.arange(5.0))
+    inside = points_in_polygon(x + 0.5, y + 0.5, triangle)
+    assert inside.sum() == 10  # cell centres on or below the hypotenuse x + y = 4
+
+    faces = parse_workface_file(
+        json.dumps([
+            {"name": "W1", "points": triangle},
+            {"name": "W2", "bounds": {"min_x": 6, "max_x": 9, "min_y": 1, "max_y": 3}},
+        ]),
+        "faces.json",
+    )
+    labels = workface_label_map(faces, BOUNDS, 5, 11)
+    # Boundaries are inclusive: the vertices (4, 0) and (0, 4) and the rect's max edges are inside.
+    assert labels[0, :6].tolist() == [0, 0, 0, 0, 0, -1]
+    assert labels[2, 5:11].tolist() == [-1, 1, 1, 1, 1, -1]
+    assert labels[3, 6:10].tolist() == [1, 1, 1, 1]
+    assert labels[4].tolist() == [0] + [-1] * 10
+
+    result = compute_workface_adjusted_grid(np.full((5, 11), 2.0), BOUNDS, workfaces=faces, decay=0.25)
+    assert result["axis"] == "polygon" and result["count"] == 2
+    assert np.array_equal(result["face_map"], labels)
+    assert result["adjusted"][2, 9] == 1.5 and result["adjusted"][0, 0] == 2.0 and result["adjusted"][4, 6] == 2.0
+
+
+def test_index_workfaces_route_accepts_polygons(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    (tmp_path / "zuobiao.csv").write_text(
+        "钻孔名,坐标x,坐标y\nBH01,100,100\nBH02,200,120\nBH03,120,240\nBH04,220,230\n", encoding="utf-8"
+    )
+    for i, name in enumerate(["BH01", "BH02", "BH03", "BH04"]):
+        (tmp_path / f"{name}.csv").write_text(
+            "序号,名称,厚度/m,弹性模量/Gpa,容重/kN*m-3,抗拉强度/MPa\n"
+            f"1,细砂岩,{10 + i},{20 + i},2.5,3.0\n2,泥岩,8,12,2.4,1.5\n",
+            encoding="utf-8",
+        )
+    faces = json.dumps([{"name": "W1", "points": [[90, 90], [160, 90], [90, 180]]}])
+
+    resp = client.get("/pressure/index/workfaces", params={"grid_size": 12, "workfaces": faces})
+    assert resp.status_code == 200
+    body = resp.json()["workfaces"]
+    face_map = np.array(body["face_map"])
+    assert body["axis"] == "polygon" and face_map.shape == (12, 12)
+    assert (face_map == 0).any() and (face_map == -1).any()
+
+    summary = client.get("/summary/index-workfaces", params={"grid_size": 12, "workfaces": faces}).json()
+    assert summary["grid"]["max"] >= summary["grid"]["min"]
+    assert [face["face"] for face in summary["faces"]] == [0]
+    assert summary["faces"][0]["cells"] == int((face_map == 0).sum())
+    assert client.get("/pressure/index/workfaces", params={"workfaces": "[1, 2"}).status_code == 400
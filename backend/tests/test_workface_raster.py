@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.workface_raster import face_statistics, grid_axes, points_in_polygon, polygon_mask, rasterize_polygons
+
+client = TestClient(app)
+
+BOUNDS = {"min_x": 0.0, "max_x": 10.0, "min_y": 0.0, "max_y": 7.0}
+
+
+def test_scanline_mask_matches_the_even_odd_point_test():
+    rng = np.random.default_rng(7)
+    xs, ys = grid_axes(BOUNDS, 36, 51)
+    gx, gy = np.meshgrid(xs, ys)
+    for k in range(60):
+        polygon = rng.uniform(-1, 11, size=(int(rng.integers(3, 10)), 2))
+        if k % 2:
+            # Vertices and edges on grid lines exercise the boundary rule.
+            polygon = np.round(polygon * 5) / 5
+        assert np.array_equal(polygon_mask(polygon, xs, ys), points_in_polygon(gx, gy, polygon))
+
+
+def test_label_maps_are_cached_and_later_faces_win():
+    square = [[1, 1], [6, 1], [6, 5], [1, 5]]
+    inner = [[3, 2], [5, 2], [5, 4], [3, 4]]
+    labels = rasterize_polygons([square, inner], BOUNDS, 8, 11)
+    assert rasterize_polygons([square, inner], BOUNDS, 8, 11) is labels
+    assert not labels.flags.writeable
+    assert labels[3, 4] == 1 and labels[1, 1] == 0 and labels[0, 0] == -1
+    # Listed first, the inner face is painted over entirely.
+    assert not (rasterize_polygons([inner, square], BOUNDS, 8, 11) == 0).any()
+    assert rasterize_polygons([square, inner], BOUNDS, 15, 21) is not labels
+
+
+def test_face_statistics_match_numpy_per_face():
+    rng = np.random.default_rng(3)
+    labels = rng.integers(-1, 5, size=(20, 30))
+    labels[labels == 3] = -1  # face 3 is empty
+    grid = rng.normal(size=(20, 30))
+    grid[0, :4] = np.nan
+
+    stats = face_statistics(grid, labels, 5, percentiles=(25, 50, 95))
+    assert stats[3] == {"face": 3, "cells": 0, **{key: None for key in ("min", "max", "mean", "std", "p25", "p50", "p95")}}
+    for k in (0, 1, 2, 4):
+        v = grid[(labels == k) & np.isfinite(grid)]
+        item = stats[k]
+        assert item["cells"] == v.size
+        assert item["min"] == v.min() and item["max"] == v.max()
+        assert np.allclose(
+            [item["mean"], item["std"], item["p25"], item["p50"], item["p95"]],
+            [v.mean(), v.std(), *np.percentile(v, [25, 50, 95])],
+        )
+
+
+def test_workface_stats_route():
+    grid = np.arange(8 * 11, dtype=float).reshape(8, 11).tolist()
+    grid[0][0] = None
+    payload = {
+        "grid": grid,
+        "bounds": BOUNDS,
+        "workfaces": [
+            {"name": "W1", "points": [[0, 0], [4, 0], [4, 3], [0, 3]]},
+            {"name": "W2", "bounds": {"min_x": 6, "max_x": 9, "min_y": 4, "max_y": 6}},
+        ],
+        "percentiles": [50],
+    }
+    resp = client.post("/api/mpi/workfaces/stats", json=payload)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [face["name"] for face in body["faces"]] == ["W1", "W2"]
+    # Inclusive edges: x in [0, 4] and y in [0, 3] hold 5 x 4 cell centres, one of them null.
+    assert body["faces"][0]["cells"] == 5 * 4 - 1 and body["faces"][0]["min"] == 1.0
+    assert set(body["faces"][1]) >= {"p50", "mean"}
+    assert client.post("/api/mpi/workfaces/stats", json={**payload, "workfaces": []}).status_code == 400
+    assert client.post("/api/mpi/workfaces/stats", json={**payload, "grid": [[1, 2], [3]]}).status_code == 400
+    flipped = {**BOUNDS, "min_x": BOUNDS["max_x"], "max_x": BOUNDS["min_x"]}
+    assert client.post("/api/mpi/workfaces/stats", json={**payload, "bounds": flipped}).status_code == 400
+
+
+def test_rect_faces_tiling_the_grid_leave_no_cell_outside():
+    # Float axes (0.1 + k * 0.1) put cell centres within rounding of the shared edges.
+    bounds = {"min_x": 0.1, "max_x": 0.7, "min_y": 0.3, "max_y": 0.9}
+    grid = np.ones((7, 7)).tolist()
+    faces = [
+        {"name": "W1", "bounds": {"min_x": 0.1, "max_x": 0.4, "min_y": 0.3, "max_y": 0.9}},
+        {"name": "W2", "bounds": {"min_x": 0.4, "max_x": 0.7, "min_y": 0.3, "max_y": 0.6}},
+        {"name": "W3", "bounds": {"min_x": 0.4, "max_x": 0.7, "min_y": 0.6, "max_y": 0.9}},
+    ]
+    resp = client.post("/api/mpi/workfaces/stats", json={"grid": grid, "bounds": bounds, "workfaces": faces})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["outside_cells"] == 0
+    # Shared edges belong to the later face: W1 keeps x 0.1..0.3, W2 y 0.3..0.5 of x 0.4..0.7.
+    assert [face["cells"] for face in body["faces"]] == [3 * 7, 4 * 3, 4 * 4]
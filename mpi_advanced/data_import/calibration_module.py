@@ -7,10 +7,12 @@
 3. 坐标系统校准
 4. 灵敏度校准
 5. 漂移补偿
+6. 整表批量校准（按传感器编码展开为数组）
 """
 
 import numpy as np
-from typing import Dict, Any, Optional, List, Tuple
+import pandas as pd
+from typing import Dict, Any, Optional, List, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -47,6 +49,46 @@ class SensorCalibration:
     notes: str = ""
 
 
+@dataclass
+class CompiledCalibration:
+    """
+    按传感器整数编码展开的标定参数
+
+    第 i 行对应 sensor_ids[i]；最后一行为未登记传感器使用的恒等标定。
+    频响增益预先插值到所有传感器频点的并集上，网格内线性插值与逐点
+    np.interp 结果一致。
+    """
+    sensor_ids: List[str]
+    position_offset: np.ndarray   # (k+1, 3)
+    time_offset_ns: np.ndarray    # (k+1,)
+    drift_ms_per_day: np.ndarray  # (k+1,) 无标定日期的传感器为0
+    calibration_ns: np.ndarray    # (k+1,) 标定日期 (datetime64[ns] 的整数表示)
+    sensitivity: np.ndarray       # (k+1,)
+    freq_grid: np.ndarray         # (g,)
+    gain_table: np.ndarray        # (k+1, g) 无频响的传感器为1
+
+    def encode(self, sensor_ids: Union[pd.Series, np.ndarray, List[str]]) -> np.ndarray:
+        """传感器ID -> 整数编码；未登记的传感器映射到恒等行"""
+        codes = pd.Index(self.sensor_ids).get_indexer(pd.Index(sensor_ids))
+        codes[codes < 0] = len(self.sensor_ids)
+        return codes
+
+    def frequency_gain(self, codes: np.ndarray, frequency: np.ndarray) -> np.ndarray:
+        """按编码和频率在预计算网格上取增益；频率缺失时增益为1"""
+        frequency = np.asarray(frequency, dtype=float)
+        grid = self.freq_grid
+        if grid.size == 0:
+            return np.ones(len(codes))
+        if grid.size == 1:
+            gain = self.gain_table[codes, 0]
+        else:
+            f = np.clip(np.nan_to_num(frequency, nan=grid[0]), grid[0], grid[-1])
+            left = np.clip(np.searchsorted(grid, f, side='right') - 1, 0, grid.size - 2)
+            t = (f - grid[left]) / (grid[left + 1] - grid[left])
+            gain = self.gain_table[codes, left] * (1.0 - t) + self.gain_table[codes, left + 1] * t
+        return np.where(np.isnan(frequency), 1.0, gain)
+
+
 class CalibrationModule:
     """
     校准模块
@@ -165,10 +207,105 @@ class CalibrationModule:
 
         return np.interp(frequency, freqs, gains)
 
+    def compile(self) -> CompiledCalibration:
+        """
+        将当前标定编译为按传感器编码索引的数组
+
+        传感器标定可能被外部直接修改，因此每次批量校准前重新编译；
+        开销只与传感器数量有关。
+        """
+        sensor_ids = list(self.sensors)
+        sensors = [self.sensors[sensor_id] for sensor_id in sensor_ids]
+        n = len(sensors)
+        position_offset = np.zeros((n + 1, 3))
+        time_offset_ns = np.zeros(n + 1, dtype=np.int64)
+        drift = np.zeros(n + 1)
+        calibration_ns = np.zeros(n + 1, dtype=np.int64)
+        sensitivity = np.ones(n + 1)
+
+        responses = {}
+        for i, sensor in enumerate(sensors):
+            position_offset[i] = sensor.position
+            time_offset_ns[i] = pd.Timedelta(sensor.time_offset).value
+            sensitivity[i] = sensor.sensitivity
+            if sensor.calibration_date and sensor.time_drift_rate != 0:
+                drift[i] = sensor.time_drift_rate
+                calibration_ns[i] = pd.Timestamp(sensor.calibration_date).value
+            if sensor.frequency_response:
+                # JSON加载后的频点键为字符串
+                response = {float(f): float(g) for f, g in sensor.frequency_response.items()}
+                freqs = np.array(sorted(response))
+                responses[i] = (freqs, np.array([response[f] for f in freqs]))
+
+        freq_grid = np.unique(np.concatenate([f for f, _ in responses.values()])) \
+            if responses else np.zeros(0)
+        gain_table = np.ones((n + 1, freq_grid.size))
+        for i, (freqs, gains) in responses.items():
+            gain_table[i] = np.interp(freq_grid, freqs, gains)
+
+        return CompiledCalibration(
+            sensor_ids=sensor_ids,
+            position_offset=position_offset,
+            time_offset_ns=time_offset_ns,
+            drift_ms_per_day=drift,
+            calibration_ns=calibration_ns,
+            sensitivity=sensitivity,
+            freq_grid=freq_grid,
+            gain_table=gain_table
+        )
+
+    def calibrate_catalog(self,
+                          events: pd.DataFrame,
+                          compiled: Optional[CompiledCalibration] = None) -> pd.DataFrame:
+        """
+        整表校准事件目录
+
+        一次遍历完成位置、时间与振幅校准，结果与逐条调用
+        calibrate_position / calibrate_time / calibrate_amplitude 一致。
+
+        Args:
+            events: 事件表，需包含 sensor_id 列；按存在情况处理
+                    x/y/z、timestamp、amplitude（可选 frequency）列
+            compiled: 预编译的标定（多张表复用同一套标定时传入）
+
+        Returns:
+            校准后的事件表副本
+        """
+        compiled = compiled or self.compile()
+        result = events.copy()
+        codes = compiled.encode(result['sensor_id'])
+
+        for axis, col in enumerate(('x', 'y', 'z')):
+            if col in result.columns:
+                result[col] = result[col].to_numpy(dtype=float) + compiled.position_offset[codes, axis]
+
+        if 'timestamp' in result.columns:
+            raw = pd.to_datetime(result['timestamp']).to_numpy('datetime64[ns]')
+            # NaT 的整数表示是哨兵值，不能参与运算，校准后原样保留
+            nat = np.isnat(raw)
+            raw_ns = np.where(nat, 0, raw.astype(np.int64))
+            elapsed_s = (raw_ns - compiled.calibration_ns[codes]) / 1e9
+            # 与 timedelta(milliseconds=...) 一致，漂移修正按微秒取整
+            drift_us = np.round(compiled.drift_ms_per_day[codes] * elapsed_s / 86400 * 1000)
+            shift_ns = compiled.time_offset_ns[codes] - drift_us.astype(np.int64) * 1000
+            calibrated = (raw_ns + shift_ns).astype('datetime64[ns]')
+            calibrated[nat] = np.datetime64('NaT')
+            result['timestamp'] = calibrated
+
+        if 'amplitude' in result.columns:
+            amplitude = result['amplitude'].to_numpy(dtype=float) / compiled.sensitivity[codes]
+            if 'frequency' in result.columns:
+                amplitude = amplitude / compiled.frequency_gain(
+                    codes, result['frequency'].to_numpy(dtype=float)
+                )
+            result['amplitude'] = amplitude
+
+        return result
+
     def perform_time_sync(self,
                          reference_sensor: str,
                          target_sensors: List[str],
-                         events: List[Dict[str, Any]]) -> Dict[str, timedelta]:
+                         events: Union[List[Dict[str, Any]], pd.DataFrame]) -> Dict[str, timedelta]:
         """
         执行时间同步
 
@@ -177,38 +314,40 @@ class CalibrationModule:
         Args:
             reference_sensor: 参考传感器ID
             target_sensors: 目标传感器ID列表
-            events: 共同事件列表
+            events: 共同事件列表（或含 event_id/sensor_id/timestamp 列的事件表）
 
         Returns:
             各传感器的时间偏移
         """
         time_offsets = {}
 
-        ref_events = {e['event_id']: e for e in events
-                     if e.get('sensor_id') == reference_sensor}
+        table = events if isinstance(events, pd.DataFrame) else pd.DataFrame(events)
+        if table.empty or 'sensor_id' not in table.columns:
+            return time_offsets
 
-        for sensor_id in target_sensors:
-            sensor_events = [e for e in events if e.get('sensor_id') == sensor_id]
+        # 同一事件在参考传感器上重复出现时以最后一条为准
+        ref_times = table[table['sensor_id'] == reference_sensor] \
+            .drop_duplicates('event_id', keep='last') \
+            .set_index('event_id')['timestamp']
+        targets = table[table['sensor_id'].isin(target_sensors)]
+        paired = targets.assign(ref_time=targets['event_id'].map(ref_times)).dropna(subset=['ref_time'])
+        if paired.empty:
+            return time_offsets
 
-            if not sensor_events:
+        diffs_us = (pd.to_datetime(paired['ref_time']) - pd.to_datetime(paired['timestamp'])) \
+            // pd.Timedelta(microseconds=1)
+        grouped = diffs_us.groupby(paired['sensor_id']).agg(['sum', 'count'])
+
+        for sensor_id in target_sensors:
+            if sensor_id not in grouped.index:
                 continue
+            total_us, count = grouped.loc[sensor_id]
+            avg_offset = timedelta(microseconds=int(total_us)) / int(count)
+            time_offsets[sensor_id] = avg_offset
 
-            # 计算平均时间差
-            time_diffs = []
-            for event in sensor_events:
-                event_id = event.get('event_id')
-                if event_id in ref_events:
-                    ref_time = ref_events[event_id]['timestamp']
-                    target_time = event['timestamp']
-                    time_diffs.append(ref_time - target_time)
-
-            if time_diffs:
-                avg_offset = sum(time_diffs, timedelta(0)) / len(time_diffs)
-                time_offsets[sensor_id] = avg_offset
-
-                # 更新传感器标定
-                if sensor_id in self.sensors:
-                    self.sensors[sensor_id].time_offset = avg_offset
+            # 更新传感器标定
+            if sensor_id in self.sensors:
+                self.sensors[sensor_id].time_offset = avg_offset
 
         return time_offsets
 
@@ -4,9 +4,11 @@
 处理微震监测系统的特定数据格式
 """
 
+import csv
+import io
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Union
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass
@@ -37,6 +39,279 @@ class MicroseismicConfig:
     max_rms: float = 0.5
 
 
+# SEISAN简化目录格式的列顺序：年 月 日 时分 秒 X Y Z 震级（多余列忽略）
+SEISAN_FIELDS = ('year', 'month', 'day', 'hhmm', 'second', 'x', 'y', 'z', 'magnitude')
+_SEISAN_INT_FIELDS = ('year', 'month', 'day')
+_SEISAN_FLOAT_FIELDS = ('second', 'x', 'y', 'z', 'magnitude')
+
+
+# 字节分类表：0 非法字符, 1 空白, 2 数字, 3 小数点, 4 正号, 5 负号
+_BYTE_CLASS = np.zeros(256, dtype=np.uint8)
+_BYTE_CLASS[[0x20, 0x09]] = 1
+_BYTE_CLASS[0x30:0x3A] = 2
+_BYTE_CLASS[0x2E] = 3
+_BYTE_CLASS[0x2B] = 4
+_BYTE_CLASS[0x2D] = 5
+
+_IS_BLANK = np.zeros(256, dtype=bool)
+_IS_BLANK[[0x20, 0x09, 0x0A, 0x0B, 0x0C, 0x0D]] = True
+
+
+def _fixed_width_numbers(chars: np.ndarray, classes: np.ndarray,
+                         allow_fraction: bool = True) -> Optional[np.ndarray]:
+    """
+    在转置后的定宽字节块 (w, n) 上逐列解析十进制数
+
+    只接受 [空白][符号]数字[.数字][空白] 形式；出现指数、内部空格等写法时返回None。
+    尾数按整数累加后一次除以10的幂，结果与 float(str) 的正确舍入一致。
+    """
+    width, n_rows = chars.shape
+    if width > 15:
+        return None
+    mantissa = np.zeros(n_rows, dtype=np.int64)
+    frac_digits = np.zeros(n_rows, dtype=np.int64)
+    started = np.zeros(n_rows, dtype=bool)
+    ended = np.zeros(n_rows, dtype=bool)
+    seen_dot = np.zeros(n_rows, dtype=bool)
+    has_digit = np.zeros(n_rows, dtype=bool)
+    negative = np.zeros(n_rows, dtype=bool)
+    bad = np.zeros(n_rows, dtype=bool)
+
+    for k in range(width):
+        cls = classes[k]
+        blank = cls == 1
+        digit = cls == 2
+        dot = cls == 3
+        bad |= (cls == 0) | (ended & ~blank) | (started & (cls >= 4)) | (dot & seen_dot)
+        ended |= started & blank
+        started |= ~blank
+        mantissa = np.where(digit, mantissa * 10 + (chars[k] - 0x30), mantissa)
+        frac_digits += digit & seen_dot
+        seen_dot |= dot
+        has_digit |= digit
+        negative |= cls == 5
+
+    if (bad | ~has_digit).any() or (seen_dot.any() and not allow_fraction):
+        return None
+    values = mantissa / np.power(10.0, frac_digits)
+    return np.where(negative, -values, values)
+
+
+def _drop_comment_lines(body: bytes) -> Tuple[bytes, np.ndarray]:
+    """
+    去掉空行与注释行（去除首尾空白后以#开头，与逐行解析的跳过规则一致）
+
+    Returns:
+        (剩余数据行内容, 各数据行在源文件中的行号(从1开始))
+    """
+    buf = np.frombuffer(body + b'\n', dtype=np.uint8)
+    ends = np.flatnonzero(buf == 0x0A)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    heads = buf[starts]
+    if not (_IS_BLANK[heads] | (heads == 0x23)).any():
+        return body, np.arange(1, starts.size + 1)
+    # 每行第一个非空白字节的位置；越过行尾说明是空行
+    filled = np.flatnonzero(~_IS_BLANK[buf])
+    filled = np.append(filled, buf.size)
+    first = filled[np.searchsorted(filled, starts)]
+    keep = (first < ends) & (buf[np.minimum(first, buf.size - 1)] != 0x23)
+    line_numbers = np.flatnonzero(keep) + 1
+    if keep.all():
+        return body, line_numbers
+    kept = buf[np.repeat(keep, ends - starts + 1)].tobytes()
+    return kept[:-1], line_numbers
+
+
+def _seisan_columns_fixed_width(body: bytes) -> Optional[Dict[str, np.ndarray]]:
+    """
+    定宽快速路径：所有行等长且分隔列对齐时，直接在字节矩阵上按列切片解析
+
+    输入须已去掉空行与注释行。不满足条件（列不对齐、数值写法无法识别）时
+    返回None，由通用的分词路径处理并逐行标记错误。
+    """
+    if not body:
+        return None
+
+    buf = np.frombuffer(body + b'\n', dtype=np.uint8)
+    width = body.find(b'\n')
+    width = len(body) if width < 0 else width
+    n_rows, remainder = divmod(buf.size, width + 1)
+    if width == 0 or remainder or not (buf[width::width + 1] == 0x0A).all():
+        return None
+    # 转置为 (列, 行)，使逐列运算访问连续内存
+    chars = np.ascontiguousarray(buf.reshape(n_rows, width + 1)[:, :width].T)
+    classes = _BYTE_CLASS[chars]
+
+    blank_cols = (classes == 1).all(axis=1)
+    edges = np.flatnonzero(np.diff(np.concatenate(([True], blank_cols, [True])).astype(np.int8)))
+    spans = list(zip(edges[0::2], edges[1::2]))
+    if len(spans) < len(SEISAN_FIELDS):
+        return None
+
+    columns: Dict[str, np.ndarray] = {}
+    for name, (start, stop) in zip(SEISAN_FIELDS, spans):
+        if name == 'hhmm':
+            # 与逐行解析一致：时分字段必须是紧凑的4位数字
+            if stop - start != 4 or not (classes[start:stop] == 2).all():
+                return None
+            hhmm = _fixed_width_numbers(chars[start:stop], classes[start:stop], allow_fraction=False)
+            columns['hour'] = np.floor_divide(hhmm, 100)
+            columns['minute'] = np.mod(hhmm, 100)
+            continue
+        values = _fixed_width_numbers(
+            chars[start:stop], classes[start:stop],
+            allow_fraction=name not in _SEISAN_INT_FIELDS
+        )
+        if values is None:
+            return None
+        columns[name] = values
+    return columns
+
+
+def _numeric_column(column: pd.Series, integer: bool = False) -> np.ndarray:
+    """C引擎已推断为数值的列直接取用，混有非数值词元的列用 to_numeric 置为NaN"""
+    if column.dtype == object:
+        column = pd.to_numeric(column, errors='coerce')
+    values = column.to_numpy(np.float64)
+    if integer:
+        with np.errstate(invalid='ignore'):
+            values = np.where(values == np.floor(values), values, np.nan)
+    return values
+
+
+def _split_hhmm(tokens: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    时分词元拆为 (时, 分)：前两位为时、其余为分，与 int(t[:2]), int(t[2:]) 一致
+
+    词元按定宽字节矩阵逐列解码，只接受纯数字；其余写法得到NaN。
+    """
+    n = len(tokens)
+    hour = np.full(n, np.nan)
+    minute = np.full(n, np.nan)
+    present = tokens.notna().to_numpy()
+    try:
+        raw = tokens[present].to_numpy(dtype='S')
+    except UnicodeEncodeError:
+        return hour, minute
+    width = raw.dtype.itemsize
+    if raw.size == 0 or width < 3:
+        return hour, minute
+    chars = np.frombuffer(raw.tobytes(), dtype=np.uint8).reshape(-1, width)
+    length = (chars != 0).sum(axis=1)
+    digits = chars.astype(np.int64) - 0x30
+    in_token = np.arange(width) < length[:, None]
+    ok = ((digits >= 0) & (digits <= 9) | ~in_token).all(axis=1) & (length >= 3) & (length <= 12)
+    value = np.zeros(len(chars), dtype=np.int64)
+    for k in range(2, min(width, 12)):
+        value = np.where(k < length, value * 10 + digits[:, k], value)
+    hour[present] = np.where(ok, digits[:, 0] * 10 + digits[:, 1], np.nan)
+    minute[present] = np.where(ok, value, np.nan)
+    return hour, minute
+
+
+def _seisan_columns_tokenized(text: str) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    通用路径：C引擎按空白分词并直接解析数值，行号与输入行一一对应
+
+    Returns:
+        (各字段数组, 数据行掩码)；输入不含空行与注释行，字段不足的行对应值为NaN
+    """
+    options = dict(
+        sep=r'\s+', header=None, names=range(len(SEISAN_FIELDS)),
+        dtype={SEISAN_FIELDS.index('hhmm'): str}, engine='c',
+        skip_blank_lines=False, quoting=csv.QUOTE_NONE
+    )
+    try:
+        # usecols截掉多余的尾列
+        frame = pd.read_csv(io.StringIO(text), usecols=range(len(SEISAN_FIELDS)), **options)
+    except pd.errors.ParserError:
+        # 没有任何一行字段数足够时usecols会报错；此时不存在多余列，缺失列补NaN
+        frame = pd.read_csv(io.StringIO(text), index_col=False, **options)
+    frame.columns = list(SEISAN_FIELDS)
+    is_data = np.ones(len(frame), dtype=bool)
+
+    columns = {name: _numeric_column(frame[name], integer=True) for name in _SEISAN_INT_FIELDS}
+    for name in _SEISAN_FLOAT_FIELDS:
+        columns[name] = _numeric_column(frame[name])
+    columns['hour'], columns['minute'] = _split_hhmm(frame['hhmm'])
+    return columns, is_data
+
+
+def _assemble_timestamps(year: np.ndarray, month: np.ndarray, day: np.ndarray,
+                         hour: np.ndarray, minute: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    由年/月/日/时/分/秒数组一次性拼装 datetime64[ns]
+
+    秒向零截断（与 datetime(..., int(second)) 一致）；越界分量或不存在的日期
+    （如2月30日）得到 NaT。
+    """
+    second = np.trunc(second)
+    with np.errstate(invalid='ignore'):
+        ok = (
+            (year >= 1678) & (year <= 2261) & (month >= 1) & (month <= 12) &
+            (day >= 1) & (day <= 31) & (hour >= 0) & (hour <= 23) &
+            (minute >= 0) & (minute <= 59) & (second >= 0) & (second <= 59)
+        )
+
+    def part(values: np.ndarray, filler: int) -> np.ndarray:
+        return np.where(ok, values, filler).astype(np.int64)
+
+    month_start = ((part(year, 1970) - 1970) * 12 + part(month, 1) - 1).astype('datetime64[M]')
+    date = month_start.astype('datetime64[D]') + (part(day, 1) - 1).astype('timedelta64[D]')
+    ok &= date.astype('datetime64[M]') == month_start
+
+    seconds = part(hour, 0) * 3600 + part(minute, 0) * 60 + part(second, 0)
+    stamps = date.astype('datetime64[ns]') + seconds.astype('timedelta64[s]')
+    stamps[~ok] = np.datetime64('NaT')
+    return stamps
+
+
+def parse_seisan_catalog(raw: Union[bytes, str]) -> Tuple[pd.DataFrame, np.ndarray, str]:
+    """
+    批量解析SEISAN目录
+
+    整个文件一次性完成列提取与时间拼装，格式错误的行只记入掩码而不抛异常。
+    时间戳与逐行解析保持一致（秒向零截断）。
+
+    Args:
+        raw: 文件内容（bytes按UTF-8解码）
+
+    Returns:
+        (事件表, 错误行号数组(从1开始), 使用的解析路径 'fixed_width'|'tokenized')
+    """
+    data = raw.encode('utf-8') if isinstance(raw, str) else raw
+    body, line_numbers = _drop_comment_lines(data.replace(b'\r\n', b'\n').rstrip(b'\n'))
+    columns = _seisan_columns_fixed_width(body)
+    if columns is not None:
+        parser = 'fixed_width'
+        is_data = np.ones(len(columns['year']), dtype=bool)
+    elif not line_numbers.size:
+        parser = 'tokenized'
+        columns = {name: np.empty(0) for name in ('year', 'month', 'day', 'hour', 'minute') + _SEISAN_FLOAT_FIELDS}
+        is_data = np.zeros(0, dtype=bool)
+    else:
+        parser = 'tokenized'
+        columns, is_data = _seisan_columns_tokenized(body.decode('utf-8'))
+
+    timestamps = _assemble_timestamps(
+        columns['year'], columns['month'], columns['day'],
+        columns['hour'], columns['minute'], columns['second']
+    )
+    valid = is_data & ~np.isnat(timestamps)
+    for name in ('x', 'y', 'z', 'magnitude'):
+        valid &= ~np.isnan(columns[name])
+
+    events = pd.DataFrame({
+        'timestamp': timestamps[valid],
+        'x': columns['x'][valid],
+        'y': columns['y'][valid],
+        'z': columns['z'][valid],
+        'magnitude': columns['magnitude'][valid],
+    })
+    error_lines = line_numbers[is_data & ~valid]
+    return events, error_lines, parser
+
+
 class MicroseismicImporter:
     """
     微震数据导入器
@@ -138,28 +413,21 @@ class MicroseismicImporter:
         SEISAN格式示例：
         2025 02 01 1234 12.5 45.6 1234.5 2.5
         (年月日 时分 秒 X Y Z 震级)
-        """
-        events = []
-        errors = []
 
+        整个文件通过 parse_seisan_catalog 批量解析；
+        逐行解析 _parse_seisan_line 保留用于单条记录。
+        """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    try:
-                        event = self._parse_seisan_line(line)
-                        if event:
-                            events.append(event)
-                    except Exception as e:
-                        errors.append(f"行 {line_num}: {e}")
-
-            df = pd.DataFrame(events)
+            events, error_lines, parser = parse_seisan_catalog(Path(filepath).read_bytes())
+            errors = [f"行 {line_num}: 格式错误" for line_num in error_lines]
 
             return ImportResult(
                 success=len(events) > 0,
-                data=df if len(events) > 0 else None,
+                data=events if len(events) > 0 else None,
                 record_count=len(events),
                 error_count=len(errors),
-                errors=errors
+                errors=errors,
+                metadata={'parser': parser}
             )
 
         except Exception as e:
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def _data_import(name: str):
+    """
+    Import a data_import submodule without running the package __init__,
+    which imports importer modules that are not part of this tree.
+    """
+    package = "mpi_advanced.data_import"
+    if package not in sys.modules:
+        try:
+            importlib.import_module(package)
+        except ImportError:
+            stub = types.ModuleType(package)
+            stub.__path__ = [str(Path(__file__).resolve().parents[1] / "data_import")]
+            sys.modules[package] = stub
+    return importlib.import_module(f"{package}.{name}")
+
+
+microseismic_importer = _data_import("microseismic_importer")
+
+
+def _parse_per_line(text: str):
+    importer = microseismic_importer.MicroseismicImporter()
+    events, errors = [], []
+    for line_num, line in enumerate(text.split("\n"), 1):
+        try:
+            event = importer._parse_seisan_line(line)
+        except ValueError:
+            errors.append(line_num)
+            continue
+        if event is not None:
+            events.append(event)
+    return pd.DataFrame(events, columns=["timestamp", "x", "y", "z", "magnitude"]), errors
+
+
+def _assert_same_as_per_line(text: str, parser: str) -> None:
+    events, error_lines, used = microseismic_importer.parse_seisan_catalog(text.encode("utf-8"))
+    expected, expected_errors = _parse_per_line(text)
+    assert used == parser
+    assert error_lines.tolist() == expected_errors
+    assert (events["timestamp"].to_numpy() == pd.to_datetime(expected["timestamp"]).to_numpy()).all()
+    for column in ("x", "y", "z", "magnitude"):
+        assert np.array_equal(events[column].to_numpy(), expected[column].to_numpy(dtype=float))
+
+
+def test_seisan_catalog_matches_the_per_line_parser():
+    rng = np.random.default_rng(5)
+    rows = [
+        f"{2020 + k % 5} {rng.integers(1, 13):2d} {rng.integers(1, 29):2d} "
+        f"{rng.integers(0, 24):02d}{rng.integers(0, 60):02d} {rng.uniform(0, 59.99):5.2f} "
+        f"{rng.uniform(-900, 900):8.2f} {rng.uniform(0, 999):7.2f} {rng.uniform(0, 500):6.1f} {rng.uniform(-1, 3):5.2f}"
+        for k in range(200)
+    ]
+    fixed = "\n".join(rows)
+    _assert_same_as_per_line(fixed, "fixed_width")
+    # Comment and blank lines are dropped first, so an aligned file keeps the fast path.
+    _assert_same_as_per_line("# year mo dy hhmm sec x y z ml\n" + "\n".join(rows[:50]) + "\n\n  # end\n", "fixed_width")
+
+    tokenized = "\n".join(" ".join(row.split()) for row in rows)
+    _assert_same_as_per_line(tokenized, "tokenized")
+
+    malformed = "\n".join([
+        "# catalog",
+        "2025 2 1 1234 12.5 45.6 1234.5 2.5 1.2",
+        "2025 2 30 1234 12.5 45.6 1234.5 2.5 1.2",   # no such date
+        "2025 2 1 2460 1.0 1 2 3 0.5",               # minute out of range
+        "2025 2 1 123 1.9 1 2 3 0.5",                # short hhmm: hour 12, minute 3
+        "2025 2 1 12a4 1.0 1 2 3 0.5",
+        "2025 x 1 1234 1.0 1 2 3 0.5",
+        "2025 2 1 1234 1.0 1 2 3",                   # missing magnitude
+        "",
+        "   ",
+        "2025 12 31 2359 59.999 -1.5 +2 3e2 -0.25 trailing columns",
+        "1999 1 1 0000 0 0 0 0 0",
+    ])
+    _assert_same_as_per_line(malformed, "tokenized")
+
+
+def test_seisan_catalog_with_only_short_rows_reports_every_row():
+    short = "2024 01 15 1030 45.2 1000.0 2000.0 -500.0\n2024 01 16 1130 12.0 1001.0 2001.0 -501.0"
+    _assert_same_as_per_line(short, "tokenized")
+    _assert_same_as_per_line("# header\n2024 1\n\n2024", "tokenized")
+
+
+def test_seisan_nan_fields_are_errors():
+    text = "2025 2 1 1234 12.5 45.6 1234.5 2.5 1.2\n2025 2 1 1234 12.5 nan 1234.5 2.5 1.2\n"
+    events, error_lines, _ = microseismic_importer.parse_seisan_catalog(text)
+    assert len(events) == 1 and error_lines.tolist() == [2]
+
+
+calibration_module = _data_import("calibration_module")
+
+
+def _calibration():
+    from datetime import datetime, timedelta
+
+    module = calibration_module.CalibrationModule()
+    module.add_sensor(calibration_module.SensorCalibration(
+        sensor_id="S1", sensor_type="microseismic", position=np.array([1.0, -2.0, 0.5]),
+        time_offset=timedelta(milliseconds=12.5), time_drift_rate=3.7,
+        calibration_date=datetime(2025, 1, 1), sensitivity=2.0,
+        frequency_response={10.0: 0.8, 50.0: 1.0, 200.0: 0.6},
+    ))
+    module.add_sensor(calibration_module.SensorCalibration(
+        sensor_id="S2", sensor_type="microseismic", time_offset=timedelta(seconds=-1.25),
+        time_drift_rate=-0.9, calibration_date=datetime(2025, 3, 15, 6), sensitivity=0.5,
+        frequency_response={"5": 1.2, "80": 0.9},
+    ))
+    # Offset only: drift without a calibration date is not applied.
+    module.add_sensor(calibration_module.SensorCalibration(
+        sensor_id="S3", sensor_type="stress", time_offset=timedelta(microseconds=7), time_drift_rate=5.0,
+    ))
+    return module
+
+
+def test_calibrate_catalog_matches_per_event_calibration():
+    rng = np.random.default_rng(11)
+    n = 300
+    sensors = rng.choice(["S1", "S2", "S3", "UNKNOWN"], size=n)
+    # Events before and after each sensor's calibration date, so drift changes sign.
+    timestamps = pd.Timestamp("2024-10-01") + pd.to_timedelta(rng.uniform(0, 300 * 86400, n), unit="s")
+    timestamps = pd.Series(timestamps.floor("us"))
+    timestamps[[3, 77]] = pd.NaT
+    frequency = rng.uniform(1, 250, n)
+    frequency[5] = np.nan
+    events = pd.DataFrame({
+        "sensor_id": sensors,
+        "timestamp": timestamps,
+        "x": rng.normal(size=n), "y": rng.normal(size=n), "z": rng.normal(size=n),
+        "amplitude": rng.uniform(0.1, 10, n),
+        "frequency": frequency,
+    })
+    module = _calibration()
+    result = module.calibrate_catalog(events)
+
+    assert result["timestamp"].isna().tolist() == events["timestamp"].isna().tolist()
+    for i, row in events.iterrows():
+        out = result.loc[i]
+        if pd.isna(row["timestamp"]):
+            assert pd.isna(out["timestamp"])
+        else:
+            expected = module.calibrate_time(row["timestamp"].to_pydatetime(), row["sensor_id"])
+            assert out["timestamp"] == pd.Timestamp(expected)
+        freq = None if np.isnan(row["frequency"]) else row["frequency"]
+        assert np.isclose(out["amplitude"], module.calibrate_amplitude(row["amplitude"], row["sensor_id"], freq))
+        position = module.calibrate_position(row[["x", "y", "z"]].to_numpy(dtype=float), row["sensor_id"])
+        assert np.allclose(out[["x", "y", "z"]].to_numpy(dtype=float), position)
@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 import argparse
+import http.client
 import json
+import queue
 import sys
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -10,7 +12,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.error import HTTPError, URLError
-from urllib.parse import quote
+from urllib.parse import quote, urlencode, urlsplit
 from urllib.request import Request, urlopen
 
 
@@ -19,6 +21,7 @@ BACKEND_ROOT = REPO_ROOT / "backend"
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
+from app.services.perf_load import MixEntry, parse_mix, run_open_loop  # noqa: E402
 from app.services.perf_stats import summarize_latencies  # noqa: E402
 
 
@@ -29,6 +32,10 @@ class Transport:
     def get(self, path: str) -> Tuple[bool, int, str]:
         raise NotImplementedError
 
+    def post(self, path: str) -> Tuple[bool, int, str]:
+        """POST without a body (query-parameter endpoints)."""
+        raise NotImplementedError
+
 
 class UrllibTransport(Transport):
     def __init__(self, base_url: str, timeout_sec: float) -> None:
@@ -58,7 +65,12 @@ class UrllibTransport(Transport):
             return False, 0, f"{type(exc).__name__}: {exc}"
 
     def get(self, path: str) -> Tuple[bool, int, str]:
-        req = Request(url=self._url(path), method="GET")
+        return self._send(Request(url=self._url(path), method="GET"))
+
+    def post(self, path: str) -> Tuple[bool, int, str]:
+        return self._send(Request(url=self._url(path), data=b"", method="POST"))
+
+    def _send(self, req: Request) -> Tuple[bool, int, str]:
         try:
             with urlopen(req, timeout=self.timeout_sec) as resp:
                 status = int(getattr(resp, "status", 200))
@@ -71,6 +83,67 @@ class UrllibTransport(Transport):
             return False, 0, f"{type(exc).__name__}: {exc}"
 
 
+class PooledHttpTransport(Transport):
+    """Keep-alive HTTP/1.1 connections shared by the worker threads."""
+
+    def __init__(self, base_url: str, timeout_sec: float, pool_size: int) -> None:
+        parts = urlsplit(base_url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.timeout_sec = timeout_sec
+        self.pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=max(1, pool_size))
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout_sec)
+
+    def _request(self, method: str, path: str, body: Optional[bytes], headers: Dict[str, str]) -> Tuple[bool, int, str]:
+        try:
+            conn, reused = self.pool.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self._connect(), False
+        try:
+            try:
+                conn.request(method, self.prefix + path, body=body, headers=headers)
+                resp = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionError):
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection; retry once on a fresh one.
+                conn.close()
+                conn = self._connect()
+                conn.request(method, self.prefix + path, body=body, headers=headers)
+                resp = conn.getresponse()
+            raw = resp.read()
+            status = int(resp.status)
+        except Exception as exc:
+            conn.close()
+            return False, 0, f"{type(exc).__name__}: {exc}"
+
+        if resp.will_close:
+            conn.close()
+        else:
+            try:
+                self.pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+        if 200 <= status < 300:
+            return True, status, ""
+        return False, status, raw.decode("utf-8", errors="ignore")[:280]
+
+    def post_json(self, path: str, payload: Dict[str, Any]) -> Tuple[bool, int, str]:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        return self._request("POST", path, data, {"Content-Type": "application/json"})
+
+    def get(self, path: str) -> Tuple[bool, int, str]:
+        return self._request("GET", path, None, {})
+
+    def post(self, path: str) -> Tuple[bool, int, str]:
+        return self._request("POST", path, b"", {"Content-Length": "0"})
+
+
 class TestClientTransport(Transport):
     def __init__(self) -> None:
         from fastapi.testclient import TestClient
@@ -94,8 +167,14 @@ class TestClientTransport(Transport):
             return False, 0, f"{type(exc).__name__}: {exc}"
 
     def get(self, path: str) -> Tuple[bool, int, str]:
+        return self._call(self.client.get, path)
+
+    def post(self, path: str) -> Tuple[bool, int, str]:
+        return self._call(self.client.post, path)
+
+    def _call(self, method: Callable[..., Any], path: str) -> Tuple[bool, int, str]:
         try:
-            resp = self.client.get(path)
+            resp = method(path)
             ok = 200 <= resp.status_code < 300
             if ok:
                 return True, resp.status_code, ""
@@ -255,12 +334,33 @@ def print_summary(result: ScenarioResult) -> None:
             max=l["max"],
         )
     )
+    if "service_latency_ms" in s:
+        sl = s["service_latency_ms"]
+        print(
+            "  open-loop: target_rps={target:.2f} service p50={p50:.2f} p99={p99:.2f} (latency above is from scheduled send)".format(
+                target=s["target_rps"],
+                p50=sl["p50"],
+                p99=sl["p99"],
+            )
+        )
     if result.error_buckets:
         print("  errors:")
         for key, count in sorted(result.error_buckets.items(), key=lambda x: x[1], reverse=True)[:5]:
             print(f"    - {key} x {count}")
 
 
+SCENARIOS = [
+    "mpi_interpolate_large_grid",
+    "mpi_interpolate_geo_large_grid",
+    "geomodel_status_poll",
+    "geomodel_artifact_download",
+    "seam_contour_images",
+    "spatial_overview",
+    "pipeline_run",
+]
+DEFAULT_SCENARIOS = SCENARIOS[:4]
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Run backend performance baselines for MPI and Geomodel APIs.")
     p.add_argument("--base-url", default="http://127.0.0.1:8001", help="Backend base URL for HTTP mode.")
@@ -275,87 +375,144 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--artifact-name", default="quality_report.json", help="Artifact file name for download scenario.")
     p.add_argument("--disable-geo", action="store_true", help="Skip /api/mpi/interpolate-geo scenario.")
     p.add_argument("--disable-geomodel", action="store_true", help="Skip Geomodel status/download scenarios.")
+    p.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        default=None,
+        help="Scenarios to run (default: the MPI and Geomodel scenarios).",
+    )
+    p.add_argument("--seam-name", default="16-3煤", help="Seam for the seam and spatial overview scenarios.")
+    p.add_argument("--seam-grid-size", type=int, default=60, help="Grid size for seam contour images.")
+    p.add_argument("--pipeline-grid-size", type=int, default=40, help="Grid size for pipeline runs.")
+    p.add_argument(
+        "--mode",
+        default="closed",
+        choices=["closed", "open"],
+        help="closed: fixed request count per scenario, one scenario at a time; "
+        "open: Poisson arrivals at --rps over a weighted scenario mix, run concurrently.",
+    )
+    p.add_argument("--rps", type=float, default=5.0, help="Target arrival rate (open mode).")
+    p.add_argument("--duration", type=float, default=30.0, help="Seconds of offered load (open mode).")
+    p.add_argument(
+        "--mix",
+        nargs="+",
+        default=None,
+        metavar="NAME=WEIGHT",
+        help="Weighted scenario mix for open mode, e.g. seam_contour_images=3 spatial_overview=1 "
+        "(default: the selected scenarios, equally weighted).",
+    )
+    p.add_argument("--max-inflight", type=int, default=64, help="Concurrent requests cap (open mode).")
+    p.add_argument("--seed", type=int, default=0, help="Random seed for arrivals and mix picks (open mode).")
+    p.add_argument("--no-keepalive", action="store_true", help="Open a new connection per request (HTTP mode).")
     p.add_argument("--output-json", default="", help="Optional path to write JSON report.")
     return p
 
 
-def main() -> int:
-    args = build_parser().parse_args()
-    transport: Transport
-    if args.inprocess:
-        transport = TestClientTransport()
-    else:
-        transport = UrllibTransport(base_url=args.base_url, timeout_sec=args.timeout)
-
-    points = build_points(max(args.points, 4))
+def build_scenarios(args: argparse.Namespace, transport: Transport, points: List[Dict[str, Any]]) -> Dict[str, Callable[[], Tuple[bool, int, str]]]:
     common_payload = {
         "points": points,
         "resolution": int(args.resolution),
         "method": args.method,
     }
     geo_payload = dict(common_payload)
-    if args.geomodel_job_id.strip():
-        geo_payload["geomodel_job_id"] = args.geomodel_job_id.strip()
-
-    scenarios: List[Tuple[str, Callable[[], Tuple[bool, int, str]]]] = []
-    scenarios.append(
-        (
-            "mpi_interpolate_large_grid",
-            lambda: transport.post_json("/api/mpi/interpolate", common_payload),
-        )
+    job_id = args.geomodel_job_id.strip()
+    if job_id:
+        geo_payload["geomodel_job_id"] = job_id
+
+    selected = list(args.scenarios or DEFAULT_SCENARIOS)
+    if args.mode == "open" and args.mix:
+        selected = list(parse_mix(args.mix, SCENARIOS))  # rejects unknown names up front
+    if args.disable_geo and "mpi_interpolate_geo_large_grid" in selected:
+        selected.remove("mpi_interpolate_geo_large_grid")
+    geomodel = ["geomodel_status_poll", "geomodel_artifact_download"]
+    if args.disable_geomodel or not job_id:
+        if not args.disable_geomodel and any(name in selected for name in geomodel):
+            print("[info] skipped geomodel scenarios: missing --geomodel-job-id")
+        selected = [name for name in selected if name not in geomodel]
+
+    seam_query = urlencode({"seam_name": args.seam_name, "method": args.method, "grid_size": args.seam_grid_size})
+    overview_query = urlencode({"seam_name": args.seam_name, "resolution": 50, "method": args.method})
+    # fix_encoding stays off: repeated pipeline runs must not rewrite the dataset.
+    pipeline_query = urlencode(
+        {"method": args.method, "grid_size": args.pipeline_grid_size, "fix_encoding": "false"}
     )
-    if not args.disable_geo:
-        scenarios.append(
-            (
-                "mpi_interpolate_geo_large_grid",
-                lambda: transport.post_json("/api/mpi/interpolate-geo", geo_payload),
+    factories: Dict[str, Callable[[], Tuple[bool, int, str]]] = {
+        "mpi_interpolate_large_grid": lambda: transport.post_json("/api/mpi/interpolate", common_payload),
+        "mpi_interpolate_geo_large_grid": lambda: transport.post_json("/api/mpi/interpolate-geo", geo_payload),
+        "geomodel_status_poll": lambda: transport.get(f"/api/geomodel/jobs/{quote(job_id, safe='')}"),
+        "geomodel_artifact_download": lambda: transport.get(
+            "/api/geomodel/jobs/{job}/artifacts/{name}".format(
+                job=quote(job_id, safe=""),
+                name=quote(args.artifact_name, safe=""),
             )
-        )
+        ),
+        "seam_contour_images": lambda: transport.get(f"/seams/contour-images?{seam_query}"),
+        "spatial_overview": lambda: transport.get(f"/api/algorithm-validation/spatial-overview?{overview_query}"),
+        "pipeline_run": lambda: transport.post(f"/pipeline/run?{pipeline_query}"),
+    }
+    return {name: factories[name] for name in selected}
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    transport: Transport
+    if args.inprocess:
+        transport = TestClientTransport()
+    elif args.no_keepalive:
+        transport = UrllibTransport(base_url=args.base_url, timeout_sec=args.timeout)
+    else:
+        pool_size = args.max_inflight if args.mode == "open" else args.concurrency
+        transport = PooledHttpTransport(base_url=args.base_url, timeout_sec=args.timeout, pool_size=pool_size)
 
+    points = build_points(max(args.points, 4))
+    scenarios = build_scenarios(args, transport, points)
     job_id = args.geomodel_job_id.strip()
-    if not args.disable_geomodel and job_id:
-        scenarios.append(
-            (
-                "geomodel_status_poll",
-                lambda: transport.get(f"/api/geomodel/jobs/{quote(job_id, safe='')}"),
-            )
-        )
-        scenarios.append(
-            (
-                "geomodel_artifact_download",
-                lambda: transport.get(
-                    "/api/geomodel/jobs/{job}/artifacts/{name}".format(
-                        job=quote(job_id, safe=""),
-                        name=quote(args.artifact_name, safe=""),
-                    )
-                ),
-            )
-        )
-    elif not args.disable_geomodel:
-        print("[info] skipped geomodel scenarios: missing --geomodel-job-id")
 
     results: List[ScenarioResult] = []
+    weights: Dict[str, float] = {}
     print("== Backend Performance Baseline ==")
-    print(
-        "mode={mode} requests={req} concurrency={cc} points={pts} resolution={res} method={method}".format(
-            mode="inprocess" if args.inprocess else f"http({args.base_url})",
-            req=args.requests,
-            cc=args.concurrency,
-            pts=len(points),
-            res=args.resolution,
-            method=args.method,
+    mode = "inprocess" if args.inprocess else f"http({args.base_url})"
+    if args.mode == "open":
+        # Mix entries whose scenario build_scenarios skipped (already reported) are dropped.
+        mix = [spec for spec in args.mix or [] if spec.partition("=")[0].strip() in scenarios]
+        if args.mix and not mix:
+            print("[info] skipped open-loop run: no scenario in --mix is available")
+            return 0
+        weights = parse_mix(mix, list(scenarios))
+        print(
+            "mode={mode} load=open rps={rps} duration={dur}s max_inflight={mi} mix={mix}".format(
+                mode=mode, rps=args.rps, dur=args.duration, mi=args.max_inflight, mix=weights
+            )
         )
-    )
-
-    for name, fn in scenarios:
-        results.append(
-            run_scenario(
-                name=name,
-                request_fn=fn,
-                total_requests=args.requests,
-                concurrency=args.concurrency,
+        reports = run_open_loop(
+            [MixEntry(name, weight, scenarios[name]) for name, weight in weights.items()],
+            rps=args.rps,
+            duration_s=args.duration,
+            max_inflight=args.max_inflight,
+            seed=args.seed,
+        )
+        results = [ScenarioResult(r["name"], r["summary"], r["error_buckets"]) for r in reports]
+    else:
+        print(
+            "mode={mode} requests={req} concurrency={cc} points={pts} resolution={res} method={method}".format(
+                mode=mode,
+                req=args.requests,
+                cc=args.concurrency,
+                pts=len(points),
+                res=args.resolution,
+                method=args.method,
             )
         )
+        for name, fn in scenarios.items():
+            results.append(
+                run_scenario(
+                    name=name,
+                    request_fn=fn,
+                    total_requests=args.requests,
+                    concurrency=args.concurrency,
+                )
+            )
 
     for result in results:
         print_summary(result)
@@ -364,6 +521,7 @@ def main() -> int:
         payload = {
             "meta": {
                 "mode": "inprocess" if args.inprocess else "http",
+                "load": args.mode,
                 "base_url": args.base_url,
                 "requests": args.requests,
                 "concurrency": args.concurrency,
@@ -383,6 +541,16 @@ def main() -> int:
                 for r in results
             ],
         }
+        if args.mode == "open":
+            payload["meta"].update(
+                {
+                    "rps": args.rps,
+                    "duration_s": args.duration,
+                    "max_inflight": args.max_inflight,
+                    "seed": args.seed,
+                    "mix": weights,
+                }
+            )
         out_path = Path(args.output_json).resolve()
         out_path.parent.mkdir(parents=True, exist_ok=True)
         out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = REPO_ROOT / "backend"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.services.kernel_bench import KERNELS, PRESETS, run_kernel_benchmarks  # noqa: E402
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Run microbenchmarks for the backend computational kernels.")
+    p.add_argument("--preset", default="default", choices=sorted(PRESETS), help="Size preset.")
+    p.add_argument("--kernels", nargs="+", choices=KERNELS, default=None, help="Subset of kernels to run.")
+    p.add_argument("--repeats", type=int, default=5, help="Timed calls per case.")
+    p.add_argument("--warmup", type=int, default=1, help="Untimed calls per case before timing.")
+    p.add_argument("--output-json", default="", help="Optional path to write JSON report.")
+    return p
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    s = result["summary"]
+    l = s["latency_ms"]
+    flag = "ok" if not result["error_buckets"] else "ERROR"
+    print(
+        "[{flag}] {name}: p50={p50:.2f}ms p95={p95:.2f}ms max={max:.2f}ms items/s={ips:.0f}".format(
+            flag=flag,
+            name=result["name"],
+            p50=l["p50"],
+            p95=l["p95"],
+            max=l["max"],
+            ips=s["items_per_sec"],
+        )
+    )
+    for key, count in result["error_buckets"].items():
+        print(f"    - {key} x {count}")
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    print(f"== Kernel Benchmarks == preset={args.preset} repeats={args.repeats} warmup={args.warmup}")
+    report = run_kernel_benchmarks(
+        preset=args.preset,
+        kernels=args.kernels,
+        repeats=args.repeats,
+        warmup=args.warmup,
+        on_result=print_result,
+    )
+
+    if args.output_json:
+        out_path = Path(args.output_json).resolve()
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n[report] wrote json: {out_path}")
+
+    failed = [item["name"] for item in report["scenarios"] if item["error_buckets"]]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = REPO_ROOT / "backend"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        description="Rebuild the research experiment index (index.jsonl) from existing result.json files."
+    )
+    p.add_argument("--data-dir", default="", help="Override DATA_DIR (defaults to the backend data directory).")
+    return p
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    if args.data_dir:
+        os.environ["DATA_DIR"] = str(Path(args.data_dir).resolve())
+
+    from app.services.experiment_index import index_path, rebuild_experiment_index
+    from app.services.research_manager import get_research_paths
+
+    experiments_dir = get_research_paths().experiments_dir
+    count = rebuild_experiment_index(experiments_dir)
+    print(f"indexed {count} experiments -> {index_path(experiments_dir)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())